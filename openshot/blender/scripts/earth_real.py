@@ -303,5 +303,10 @@ if params["start_frame"] == params["end_frame"]:
 	bpy.context.scene.frame_start = params["end_frame"]
 	bpy.context.scene.frame_end = params["end_frame"]
 
+# Only render part of the animation (when OpenShot splits a render across several Blender processes)
+if "worker_start_frame" in params:
+	bpy.context.scene.frame_start = params["worker_start_frame"]
+	bpy.context.scene.frame_end = params["worker_end_frame"]
+
 # Render the current animation to the params["output_path"] folder
 bpy.ops.render.render(animation=params["animation"])
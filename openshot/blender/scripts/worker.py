@@ -0,0 +1,84 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+
+# Import Blender's python API.  This only works when the script is being
+# run from the context of Blender.  Blender contains it's own version of Python
+# with this library pre-installed.
+import bpy
+import sys
+
+# Blender writes its render output (i.e. Saved:) with C stdio, which is buffered when
+# stdout is a pipe.  It must be flushed before each reply, so OpenShot sees it in order.
+try:
+	import ctypes
+	libc = ctypes.CDLL(None)
+except:
+	libc = None
+
+# Debug Info:
+# ./blender -b test.blend -P worker.py
+# -b = background mode
+# -P = run a Python script within the context of the project file
+#
+# This script keeps Blender running, so OpenShot can render many preview frames
+# without paying Blender's startup cost for each one.  OpenShot sends 1 request per
+# line on stdin:
+#
+#	RENDER<tab>/path/to/template.blend<tab>/path/to/injected/script.py
+#	QUIT
+#
+# Blender's normal output (i.e. Fra: and Saved: lines) is written to stdout, followed
+# by OPENSHOT_DONE (or OPENSHOT_ERROR) when the request is finished.
+
+def reply(message):
+	""" Send a message to OpenShot """
+	sys.stdout.flush()
+	if libc:
+		libc.fflush(None)
+	sys.stdout.write(message + "\n")
+	sys.stdout.flush()
+
+# the .blend loaded on the command line is untouched, until the 1st request runs
+is_modified = False
+reply("OPENSHOT_READY")
+
+while True:
+	line = sys.stdin.readline()
+	if not line or line.strip() == "QUIT":
+		break
+
+	try:
+		command, blend_file_path, script_path = line.rstrip("\n").split("\t")
+
+		# The template scripts add objects to the scene, so re-open the original .blend
+		# (this is much faster than starting a new Blender process)
+		if is_modified or bpy.data.filepath != blend_file_path:
+			bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+		is_modified = True
+
+		# run the template script (with the params injected by OpenShot)
+		script_file = open(script_path)
+		script_body = script_file.read()
+		script_file.close()
+		exec(compile(script_body, script_path, "exec"), {"__name__" : "__main__"})
+
+		reply("OPENSHOT_DONE")
+
+	except Exception as ex:
+		reply("OPENSHOT_ERROR %s" % str(ex).replace("\n", " "))
@@ -0,0 +1,155 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2010  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, time, struct, zlib, threading, Queue
+import cPickle as pickle
+
+# the journal of a project is stored next to the project file
+JOURNAL_EXTENSION = ".journal"
+
+# the header of each journal record: the time of the edit, and the length of the record
+RECORD_HEADER = "<dI"
+
+# the extension of the temporary file of a snapshot (which is different from the one used by
+# save_project, so a snapshot and a manual save never write the same file)
+SNAPSHOT_EXTENSION = ".autosave.tmp"
+
+
+def get_journal_path(file_path):
+	""" Get the path of the journal of a project file """
+	return file_path + JOURNAL_EXTENSION
+
+
+def write_file(file_path, data):
+	""" Write a file to a temporary file, flush it to the disk, and rename it into place (so the
+	file is either the old one or the new one, even if OpenShot or the computer crashes) """
+
+	tmp_path = file_path + SNAPSHOT_EXTENSION
+	f = open(tmp_path, "wb")
+	try:
+		f.write(data)
+		f.flush()
+		os.fsync(f.fileno())
+	finally:
+		f.close()
+	os.rename(tmp_path, file_path)
+
+
+def read_journal(file_path):
+	""" Read the journal of a project file.  Returns a list of (time, description, state data) tuples,
+	oldest first.  A partial record at the end (i.e. a crash while appending it) is ignored. """
+
+	records = []
+	journal_path = get_journal_path(file_path)
+	if not os.path.exists(journal_path):
+		return records
+
+	header_size = struct.calcsize(RECORD_HEADER)
+	f = open(journal_path, "rb")
+	try:
+		while True:
+			header = f.read(header_size)
+			if len(header) < header_size:
+				break
+			(edit_time, length) = struct.unpack(RECORD_HEADER, header)
+			data = f.read(length)
+			if len(data) < length:
+				break
+			try:
+				(description, state_data) = pickle.loads(zlib.decompress(data))
+			except Exception:
+				break
+			records.append((edit_time, description, state_data))
+	finally:
+		f.close()
+
+	return records
+
+
+class autosave_writer(threading.Thread):
+	""" This thread writes the autosave snapshots and the journal of a project, so the GTK thread only
+	has to take a snapshot of the project (i.e. the same pickled state used by the undo history).  The
+	jobs are written in the order they are requested. """
+
+	def __init__(self):
+		threading.Thread.__init__(self)
+		self.setDaemon(True)
+		self.jobs = Queue.Queue()
+
+	def save_snapshot(self, file_path, state_data):
+		""" Write a full snapshot of the project (which makes the journal obsolete) """
+		self.jobs.put(("snapshot", file_path, state_data))
+
+	def append_journal(self, file_path, description, state_data):
+		""" Append an edit to the journal of a project """
+		self.jobs.put(("journal", file_path, (time.time(), description, state_data)))
+
+	def clear_journal(self, file_path):
+		""" Remove the journal of a project (i.e. after the project is saved) """
+		self.jobs.put(("clear", file_path, None))
+
+	def stop(self):
+		""" Stop the thread (after the pending jobs are written) """
+		self.jobs.put(None)
+
+	def flush(self):
+		""" Wait until the pending jobs are written (i.e. before the project is saved, so an older
+		snapshot is never renamed over the saved project) """
+		if self.isAlive():
+			self.jobs.join()
+
+	def run(self):
+		while True:
+			job = self.jobs.get()
+			if job == None:
+				self.jobs.task_done()
+				break
+
+			(action, file_path, data) = job
+			try:
+				if action == "snapshot":
+					write_file(file_path, data)
+					self.remove_journal(file_path)
+					print "project autosaved! - %s" % file_path
+				elif action == "journal":
+					self.write_record(file_path, data)
+				elif action == "clear":
+					self.remove_journal(file_path)
+			except (IOError, OSError), ex:
+				print "Failed to autosave %s: %s" % (file_path, ex)
+			self.jobs.task_done()
+
+	def write_record(self, file_path, record):
+		""" Append a record to the journal, and flush it to the disk """
+
+		(edit_time, description, state_data) = record
+		data = zlib.compress(pickle.dumps((description, state_data), pickle.HIGHEST_PROTOCOL))
+
+		f = open(get_journal_path(file_path), "ab")
+		try:
+			f.write(struct.pack(RECORD_HEADER, edit_time, len(data)))
+			f.write(data)
+			f.flush()
+			os.fsync(f.fileno())
+		finally:
+			f.close()
+
+	def remove_journal(self, file_path):
+		journal_path = get_journal_path(file_path)
+		if os.path.exists(journal_path):
+			os.remove(journal_path)
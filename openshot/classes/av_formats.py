@@ -21,11 +21,22 @@
 #
 #	   Can be used to determine which formats/codecs are installed	   
 
+import os, threading
+import cPickle as pickle
+import gobject
+
 try:
 	import mlt
 except ImportError:
 	print "*** ERROR: MLT Python bindings failed to import ***"
 
+# the version of the capability cache file (increment this when its contents change)
+CACHE_VERSION = 1
+
+# the folders where frei0r looks for its plugins (besides the folders in $FREI0R_PATH)
+FREI0R_DIRS = ["/usr/lib/frei0r-1", "/usr/lib64/frei0r-1", "/usr/local/lib/frei0r-1",
+			   os.path.join(os.path.expanduser("~"), ".frei0r-1", "lib")]
+
 # init the foreign language
 from language import Language_Init
 
@@ -96,10 +107,14 @@ class formats:
 		return filters_raw
 	
 	
-	def has_frei0r_installed(self):
-		""" Determine if frei0r effects are installed and configured with libmlt. """
+	def has_frei0r_installed(self, filters=None):
+		""" Determine if frei0r effects are installed and configured with libmlt.  The list
+		of filters can be passed in (so it's not requested twice). """
 		
-		for filter in self.get_filters():
+		if filters == None:
+			filters = self.get_filters()
+		
+		for filter in filters:
 			if filter.startswith("frei0r"):
 				return True
 			
@@ -299,4 +314,165 @@ class formats:
 
 		# sort list
 		formats_raw.sort()
-		return formats_raw
\ No newline at end of file
+		return formats_raw
+
+
+def get_mlt_version():
+	""" Get the version of MLT (if the python bindings can tell) """
+	try:
+		return mlt.mlt_version_get_string()
+	except:
+		return "unknown"
+
+
+def get_plugin_dirs():
+	""" Get the folders which contain the plugins of MLT (and frei0r) """
+	
+	dirs = []
+	try:
+		dirs.append(mlt.Factory.directory())
+	except:
+		pass
+	if os.environ.get("MLT_REPOSITORY"):
+		dirs.append(os.environ["MLT_REPOSITORY"])
+	for frei0r_dir in os.environ.get("FREI0R_PATH", "").split(":") + FREI0R_DIRS:
+		if frei0r_dir and frei0r_dir not in dirs:
+			dirs.append(frei0r_dir)
+	return dirs
+
+
+def get_dir_mtime(folder):
+	""" Get the time of the newest change of a folder, or of the files in it (0 if it doesn't exist) """
+	
+	if not os.path.isdir(folder):
+		return 0
+	mtime = os.path.getmtime(folder)
+	for file_name in os.listdir(folder):
+		try:
+			mtime = max(mtime, os.path.getmtime(os.path.join(folder, file_name)))
+		except OSError:
+			pass
+	return mtime
+
+
+class capabilities:
+	""" The formats, codecs, and filters of MLT, cached on disk.  The cache is keyed by the version of
+	MLT and the modified times of the plugin folders, so MLT is only queried again (i.e. 'melt -query')
+	when something is installed or removed. """
+	
+	def __init__(self, melt_command="melt", cache_path=None):
+		self.melt_command = melt_command
+		self.cache_path = cache_path
+		self.key = None
+		self.is_stale = True
+		
+		self.vcodecs = []
+		self.acodecs = []
+		self.vformats = []
+		self.filters = []
+		self.has_frei0r_installed = False
+		self.index = {}
+		
+	def get_key(self):
+		""" Get the key of the current MLT installation """
+		
+		if self.key == None:
+			# init mlt (so the plugin folder can be found)
+			mlt.Factory().init()
+			mtimes = ["%s=%s" % (folder, get_dir_mtime(folder)) for folder in get_plugin_dirs()]
+			self.key = "|".join([get_mlt_version(), self.melt_command] + mtimes)
+		return self.key
+		
+	def load(self):
+		""" Load the cache file.  Returns True if it was loaded (even if it's stale, in which
+		case is_stale is True, and detect() should be called). """
+		
+		if not self.cache_path or not os.path.exists(self.cache_path):
+			return False
+		
+		try:
+			f = open(self.cache_path, "rb")
+			try:
+				cache = pickle.load(f)
+			finally:
+				f.close()
+		except Exception, ex:
+			print "Failed to load the capability cache: %s" % ex
+			return False
+		
+		if cache.get("version") != CACHE_VERSION:
+			return False
+		
+		self.set_lists(cache["vcodecs"], cache["acodecs"], cache["vformats"], cache["filters"])
+		self.is_stale = cache["key"] != self.get_key()
+		return True
+		
+	def detect(self):
+		""" Ask MLT for the formats, codecs, and filters, and save them to the cache file """
+		
+		# get the key first (in case something is installed while detecting)
+		key = self.get_key()
+		
+		mlt_formats = formats(self.melt_command)
+		self.set_lists(mlt_formats.get_vcodecs(), mlt_formats.get_acodecs(), mlt_formats.get_formats(), mlt_formats.get_filters())
+		self.is_stale = False
+		
+		if self.cache_path:
+			self.save(key)
+			
+	def detect_in_background(self, callback):
+		""" Detect the formats, codecs, and filters with a thread, and call the callback
+		(on the GTK thread) when done.  The current lists can be used until then. """
+		
+		updated = capabilities(self.melt_command, self.cache_path)
+		
+		def detect_thread():
+			updated.detect()
+			gobject.idle_add(callback, updated)
+		
+		t = threading.Thread(target=detect_thread)
+		t.setDaemon(True)
+		t.start()
+		
+	def save(self, key):
+		""" Save the lists to the cache file (and rename it, so a partial file is never read) """
+		
+		cache = {"version" : CACHE_VERSION, "key" : key, "vcodecs" : self.vcodecs, "acodecs" : self.acodecs,
+				 "vformats" : self.vformats, "filters" : self.filters}
+		
+		try:
+			tmp_path = self.cache_path + ".tmp"
+			f = open(tmp_path, "wb")
+			pickle.dump(cache, f, pickle.HIGHEST_PROTOCOL)
+			f.close()
+			os.rename(tmp_path, self.cache_path)
+		except (IOError, OSError), ex:
+			print "Failed to save the capability cache: %s" % ex
+			
+	def set_lists(self, vcodecs, acodecs, vformats, filters):
+		""" Set the lists, and index them (for has_vcodec, has_filter, etc...) """
+		
+		self.vcodecs = vcodecs
+		self.acodecs = acodecs
+		self.vformats = vformats
+		self.filters = filters
+		self.index = {"vcodec" : set(vcodecs), "acodec" : set(acodecs), "format" : set(vformats), "filter" : set(filters)}
+		
+		#check for frei0r effect library
+		self.has_frei0r_installed = False
+		for filter in filters:
+			if filter.startswith("frei0r"):
+				self.has_frei0r_installed = True
+				break
+		
+	def has_vcodec(self, name):
+		return name in self.index.get("vcodec", ())
+	
+	def has_acodec(self, name):
+		return name in self.index.get("acodec", ())
+	
+	def has_format(self, name):
+		return name in self.index.get("format", ())
+	
+	def has_filter(self, name):
+		return name in self.index.get("filter", ())
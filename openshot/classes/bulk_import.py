@@ -0,0 +1,264 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, threading, Queue
+import gobject
+from classes import messagebox, thumbnail
+
+try:
+	import mlt
+except ImportError:
+	print "*** ERROR: MLT Python bindings failed to import ***"
+
+# the number of threads used to inspect files (and generate thumbnails)
+PROBE_THREADS = 4
+
+# how often (in milliseconds) the finished files are added to the project
+FLUSH_INTERVAL = 250
+
+# file extensions which are always inspected
+MEDIA_EXTENSIONS = set(["3g2", "3gp", "aac", "ac3", "aif", "aiff", "amr", "ape", "asf", "au", "avi", "bmp", "caf",
+						"dpx", "dv", "exr", "f4v", "flac", "flv", "gif", "j2k", "jp2", "jpeg", "jpg", "m2t", "m2ts",
+						"m2v", "m4a", "m4v", "mka", "mkv", "mod", "mov", "mp2", "mp3", "mp4", "mpeg", "mpg", "mts",
+						"mxf", "nut", "ogg", "oga", "ogv", "opus", "pbm", "pgm", "png", "pnm", "ppm", "psd", "rm",
+						"rmvb", "svg", "tga", "tif", "tiff", "ts", "vob", "wav", "webm", "webp", "wma", "wmv", "wv",
+						"xcf", "y4m"])
+
+# file extensions which are never media (so they are not inspected by MLT)
+NON_MEDIA_EXTENSIONS = set(["7z", "bak", "blend", "bz2", "cfg", "csv", "db", "dll", "doc", "docx", "exe", "gz",
+							"htm", "html", "ini", "iso", "js", "json", "log", "md", "nfo", "odp", "ods", "odt",
+							"osp", "pdf", "ppt", "pptx", "py", "rar", "rtf", "sh", "so", "srt", "sub", "tar",
+							"torrent", "txt", "xls", "xlsx", "xml", "xz", "zip"])
+
+# the first bytes of common media files (for files with an unknown extension)
+MAGIC_BYTES = [(0, "RIFF"), (0, "OggS"), (0, "fLaC"), (0, "ID3"), (0, "\x1a\x45\xdf\xa3"),
+			   (0, "\x00\x00\x01\xba"), (0, "\x00\x00\x01\xb3"), (0, "FLV"),
+			   (0, "\x30\x26\xb2\x75"), (0, "\x89PNG"), (0, "\xff\xd8\xff"), (0, "GIF8"),
+			   (0, "II*\x00"), (0, "MM\x00*"), (0, "FORM"), (0, "\xff\xfb"),
+			   (0, "\xff\xf3"), (0, "\xff\xf1"), (0, "\xff\xf9"), (4, "ftyp"), (4, "moov"),
+			   (4, "mdat"), (4, "wide")]
+
+# the size of an MPEG transport stream packet (each packet starts with the 0x47 sync byte)
+TS_PACKET_SIZE = 188
+
+
+def is_media_file(file_path):
+	""" Check the extension (and if needed, the first bytes) of a file, so files which are clearly
+	not media (i.e. text files, documents, etc...) are never inspected by MLT.  Any other file is
+	inspected (since MLT can import many formats which are not listed here). """
+
+	extension = os.path.splitext(file_path)[1].replace(".", "").lower()
+	if extension in MEDIA_EXTENSIONS:
+		return True
+	if extension in NON_MEDIA_EXTENSIONS:
+		return False
+
+	try:
+		f = open(file_path, "rb")
+		header = f.read(512)
+		f.close()
+	except IOError:
+		return False
+
+	for offset, magic in MAGIC_BYTES:
+		if header[offset:offset + len(magic)] == magic:
+			return True
+
+	# MPEG transport streams (the sync byte of the first 2 packets, since 1 byte matches too many files)
+	if header[:1] == "\x47" and header[TS_PACKET_SIZE:TS_PACKET_SIZE + 1] == "\x47":
+		return True
+
+	# skip text files (and empty files), and let MLT inspect the rest
+	return not is_text(header)
+
+
+def is_text(data):
+	""" Check if the first bytes of a file look like text (no NUL bytes, and valid UTF-8) """
+
+	if not data or "\x00" in data:
+		return bool(not data)
+	try:
+		# (the last character can be cut in half)
+		data[:-4].decode("utf-8")
+		return True
+	except UnicodeDecodeError:
+		return False
+
+
+class import_thumbnailer(thumbnail.thumbnailer):
+	""" A thumbnailer used by a single import thread (the thumbnailer keeps the file being
+	inspected in its attributes, so each thread needs its own) """
+
+	def __init__(self, project):
+		thumbnail.thumbnailer.__init__(self)
+		self.set_project(project)
+		self.profile = mlt.Profile("quarter_ntsc")
+
+	def show_warning(self, title, message):
+		""" Messageboxes can only be shown by the GTK thread """
+		gobject.idle_add(messagebox.show, title, message)
+
+
+class bulk_import(threading.Thread):
+	""" This class imports all the files and folders of a drag n drop action (or a batch of files),
+	using a few threads to inspect the files.  The files are added to the project (and the tree)
+	as they are inspected, and the import can be cancelled. """
+
+	def __init__(self, project, paths, recursive=True, progress_callback=None, finished_callback=None, detect_scenes=False):
+		""" Constructor (this must be called by the GTK thread) """
+		threading.Thread.__init__(self)
+
+		self.project = project
+		self.paths = paths
+		self.recursive = recursive
+		self.detect_scenes = detect_scenes
+		self.progress_callback = progress_callback
+		self.finished_callback = finished_callback
+
+		self.cancelled = False
+		self.scanning = True
+		self.results = Queue.Queue()
+		self.total_files = 0
+		self.processed_files = 0
+
+		# The totals (same as OpenShotFolder.AddFile)
+		self.ok_files = 0
+		self.broken_files = 0
+		self.duplicate_files = 0
+		self.folders = 0
+
+		# get the paths of the files already in the project (i.e. dupe check)
+		self.existing_files = set()
+		for item in self.project.project_folder.items:
+			if hasattr(item, "file_type") and item.file_type not in ("image sequence", "sequence"):
+				self.existing_files.add(os.path.realpath(item.name))
+
+	def cancel(self):
+		""" Stop inspecting files (the files already inspected are still imported) """
+		self.cancelled = True
+
+	def start(self):
+		""" Start the import thread, and add the finished files to the project every few milliseconds """
+		threading.Thread.start(self)
+		gobject.timeout_add(FLUSH_INTERVAL, self.flush)
+
+	def find_files(self):
+		""" Get the list of media files to inspect """
+
+		file_paths = []
+		for path in self.paths:
+			if os.path.isdir(path):
+				self.folders += 1
+				if self.recursive:
+					for dir_path, dir_names, file_names in os.walk(path):
+						dir_names.sort()
+						for file_name in sorted(file_names):
+							file_paths.append(os.path.join(dir_path, file_name))
+				else:
+					for file_name in sorted(os.listdir(path)):
+						file_paths.append(os.path.join(path, file_name))
+			else:
+				file_paths.append(path)
+
+		jobs = []
+		for file_path in file_paths:
+			if self.cancelled:
+				break
+			if not os.path.isfile(file_path):
+				continue
+
+			# don't add a file that is already in the project (or in this drop)
+			real_path = os.path.realpath(file_path)
+			if real_path in self.existing_files:
+				self.duplicate_files += 1
+				continue
+			self.existing_files.add(real_path)
+
+			if is_media_file(file_path):
+				jobs.append(file_path)
+			else:
+				self.broken_files += 1
+
+		return jobs
+
+	def run(self):
+		""" Find the files, and inspect them with a few threads """
+
+		jobs = Queue.Queue()
+		for file_path in self.find_files():
+			jobs.put(file_path)
+		self.total_files = jobs.qsize()
+		self.scanning = False
+
+		def probe_worker():
+			thumbnailer = import_thumbnailer(self.project)
+			while not self.cancelled:
+				try:
+					file_path = jobs.get_nowait()
+				except Queue.Empty:
+					return
+				self.results.put((file_path, thumbnailer.GetFile(file_path, detect_scenes=self.detect_scenes)))
+
+		# re-init the mlt factory (before the threads use it)
+		mlt.Factory.init()
+
+		threads = []
+		for i in range(min(PROBE_THREADS, self.total_files)):
+			t = threading.Thread(target=probe_worker)
+			t.start()
+			threads.append(t)
+		for t in threads:
+			t.join()
+
+	def flush(self):
+		""" Add the inspected files to the project (this runs on the GTK thread) """
+
+		new_files = 0
+		while True:
+			try:
+				file_path, newFile = self.results.get_nowait()
+			except Queue.Empty:
+				break
+
+			self.processed_files += 1
+			if newFile:
+				self.ok_files += 1
+				new_files += 1
+				self.project.project_folder.items.append(newFile)
+			else:
+				self.broken_files += 1
+
+		# refresh the tree (once per batch of files)
+		if new_files:
+			self.project.form.refresh_files()
+
+		if self.progress_callback:
+			self.progress_callback(self)
+
+		if self.isAlive() or not self.results.empty():
+			# keep checking for files
+			return True
+
+		# mark project as modified (only 1 undo / redo history entry)
+		if self.ok_files:
+			_ = self.project.translate
+			self.project.set_project_modified(is_modified=True, refresh_xml=False, type=_("Added files"))
+
+		if self.finished_callback:
+			self.finished_callback(self)
+		return False
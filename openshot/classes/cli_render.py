@@ -19,7 +19,7 @@
 import os, sys, locale, threading
 
 import xml.dom.minidom as xml
-from classes import profiles, open_project, video, project
+from classes import profiles, open_project, video, project, render_stats
 import cPickle as pickle
 
 # init the foreign language
@@ -139,6 +139,13 @@ class Bot():
 							default="128 kb/s",
 							help=_("set video bitrate in format 'number kb/s'"))
 
+			parser.add_option("-j",
+							"--json-progress",
+							action="store_true",
+							dest="JsonProgress",
+							default=False,
+							help=_("print render progress and statistics as JSON lines"))
+
 
 			def error(message):
 				'''Prints an error message, the help message and quits'''
@@ -211,16 +218,20 @@ class Bot():
 			self.render_options["ac"] = options.Channels
 			self.render_options["ab"] = convert_to_bytes(options.AudioBitRate)
 			
+			# print progress as JSON lines (instead of a progress bar)
+			self.json_progress = options.JsonProgress
+			
 			# Print rendering options to terminal
-			print "\n"	
-			print _("rendering options:")
-			print _("container type:")+" "+str(self.render_options["f"])
-			print _("video codec:")+" "+str(self.render_options["vcodec"])
-			print _("video bitrate:")+" "+str(self.render_options["b"])+"\n"
-			print _("audio codec:")+" "+str(self.render_options["acodec"])
-			print _("audio sample rate:")+" "+str(self.render_options["ar"])
-			print _("channels:")+" "+str(self.render_options["ac"])
-			print _("audio bitrate:")+" "+str(self.render_options["ab"])+"\n"			
+			if not self.json_progress:
+				print "\n"	
+				print _("rendering options:")
+				print _("container type:")+" "+str(self.render_options["f"])
+				print _("video codec:")+" "+str(self.render_options["vcodec"])
+				print _("video bitrate:")+" "+str(self.render_options["b"])+"\n"
+				print _("audio codec:")+" "+str(self.render_options["acodec"])
+				print _("audio sample rate:")+" "+str(self.render_options["ar"])
+				print _("channels:")+" "+str(self.render_options["ac"])
+				print _("audio bitrate:")+" "+str(self.render_options["ab"])+"\n"			
 			
 			# get the complete path to the new file
 			self.folder1 = self.render_options["folder"]
@@ -237,7 +248,8 @@ class Bot():
 		
 		# generates xml file
 		self.current_project.GenerateXML(os.path.join(self.USER_DIR, "sequence.mlt"))
-		print _("generating XML file for rendering")	
+		if not self.json_progress:
+			print _("generating XML file for rendering")	
 		self.fps = self.current_project.fps()
 		#threading.Thread.__init__(self)
 		self.profile = profiles.mlt_profiles(self.current_project).get_profile(self.current_project.project_type)
@@ -276,7 +288,8 @@ class Bot():
 		export_path = "%s.%s" % (os.path.join(out_folder, out_file), self.render_options["f"])
 
 		# RENDER MOVIE
-		print _("Starting rendering to ") + str(export_path)
+		if not self.json_progress:
+			print _("Starting rendering to ") + str(export_path)
 		self.c = mlt.Consumer( self.profile, "avformat", export_path)
 
 		# set some RENDER specific options
@@ -317,24 +330,42 @@ class Bot():
 		# init the render percentage
 		self.fraction_complete = 0.0
 		self.render_interrupted = False
+		
+		# init the render statistics (fps, ETA, CPU, bitrate)
+		self.render_stats = render_stats.render_stats(export_path, self.fps, self.p.get_length(), self.render_options)
+		self.render_stats.start()
 
 		while self.c.is_stopped() == False:
 			# update Export Dialog Progress Bar
 			self.fraction_complete = (float(self.p.position()) / float(self.p.get_length() - 1))
-			progress(50, int(self.fraction_complete*100))
+			stats = self.render_stats.sample(self.p.position(), self.c)
+			if self.json_progress:
+				print self.render_stats.to_json(stats)
+				sys.stdout.flush()
+			else:
+				progress(50, int(self.fraction_complete*100))
 			# wait 1/5 of a second
 			try:
 				time.sleep( 0.2 )
 			except KeyboardInterrupt:
-				print "\n"
-				print _("program interrupted by user")
+				if not self.json_progress:
+					print "\n"
+					print _("program interrupted by user")
 				self.render_interrupted = True
 				self.c.stop()
 		
 		if self.render_interrupted == False:
-			progress(50, 100)
-			print "\n"
-			print _("project file correctly rendered")
+			# save the render statistics next to the exported file
+			summary = self.render_stats.finish()
+			self.render_stats.save()
+			
+			if self.json_progress:
+				print self.render_stats.to_json(summary)
+				sys.stdout.flush()
+			else:
+				progress(50, 100)
+				print "\n"
+				print _("project file correctly rendered")
 			
 		# clear all the MLT objects
 		self.c.stop()
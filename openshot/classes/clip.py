@@ -22,6 +22,7 @@ import xml.dom.minidom as xml
 import gtk, goocanvas
 import re
 from classes.keyframe import keyframe
+from classes import waveform
 
 ########################################################################
 class clip:
@@ -88,14 +89,14 @@ class clip:
 		# end_time = 25.0
 		# position_on_track = 3.0
 
-	def update_thumbnail(self):
+	def update_thumbnail(self, thumbnailer=None):
 		"""Updates the thumbnail of the clip to make it reflect the first frame.
 		   Creates a new thumbnail if there is none, gives it a new thumbnail path
-		   if it is empty."""
+		   if it is empty.  A background thread passes its own thumbnailer."""
 
 		# Initialize variables
 		project = self.parent.parent.project
-		thumbnailer = project.thumbnailer
+		thumbnailer = thumbnailer or project.thumbnailer
 		fps = self.file_object.fps
 		start_frame = int(float(fps) * self.start_time)
 		file_type = self.file_object.file_type
@@ -163,7 +164,7 @@ class clip:
 
 	def has_audio(self):
 		""" Determine if this clip has an audio track """
-		if self.file_object.file_type in ["video", "audio"]:
+		if self.file_object.file_type in ["video", "audio", "sequence"]:
 			return True
 		else:
 			return False
@@ -176,7 +177,7 @@ class clip:
 		_ = self.parent.parent.project.translate
 
 		# Get list of effects
-		my_effects = self.parent.parent.project.form.effect_list
+		my_effects = self.parent.parent.project.form.get_effect_list()
 
 		# Look up default params
 		for my_effect in my_effects:
@@ -287,6 +288,13 @@ class clip:
 		self.RenderClip()
 
 
+	def get_render_signature(self):
+		"""Get a tuple of everything that changes how this clip is drawn on the timeline.  The
+		sequence compares it with the last render, to only re-render the clips that changed."""
+		return (id(self), self.name, self.color, self.position_on_track, self.start_time, self.end_time, 
+				self.play_video, self.play_audio, tuple([my_effect.unique_id for my_effect in self.effects]), self.thumb_location, self.parent.unique_id, self.parent.y_top)
+
+
 	def GeneratePreviewXML(self, file_name, preview_mode="trimming"):
 		import track, files
 
@@ -427,7 +435,7 @@ class clip:
 
 		# hide video (if needed)
 		if self.play_video == False or self.parent.play_video == False:
-			if self.file_object.file_type == "video":
+			if self.file_object.file_type in ("video", "sequence"):
 				# hide video of this producer
 				producer.setAttribute("video_index", "-1")
 			elif self.file_object.file_type == "image" or self.file_object.file_type == "image sequence":
@@ -444,6 +452,10 @@ class clip:
 
 		# add the FRAMEBUFFER (IF NEEDED) to the producer node
 		resource_name = self.file_object.name
+		
+		# nested sequences use the (cached) MLT XML of the sequence
+		if self.file_object.file_type == "sequence":
+			resource_name = project.get_sequence_resource(self.file_object.sequence_id)
 
 		if self.get_speed() != 1.0 or self.reversed:
 			# create frame buffer to speed up or down the video
@@ -981,7 +993,7 @@ class clip:
 	def get_affine_effect(self):
 
 		# Get list of effects
-		my_effects = self.parent.parent.project.form.effect_list
+		my_effects = self.parent.parent.project.form.get_effect_list()
 
 		# Look up default params
 		for my_effect in my_effects:
@@ -1242,6 +1254,8 @@ class clip:
 				# hide the left, right, and middle, text, and thumbnail items (if any)
 				if has_regular_images:
 					self.get_canvas_child(item, "middle").set_properties(visibility = 1)
+					if self.get_canvas_child(item, "waveform"):
+						self.get_canvas_child(item, "waveform").set_properties(visibility = 1)
 					self.get_canvas_child(item, "left").set_properties(visibility = 1)
 					self.get_canvas_child(item, "right").set_properties(visibility = 1)
 					self.get_canvas_child(item, "thumbnail").set_properties(visibility = 1)
@@ -1315,6 +1329,12 @@ class clip:
 				pixbuf_x = pixbuf_x + pixbuf_width
 
 
+			# ///////////////////////////////////////////////////////
+			# Add WAVEFORM to Group (audio files only)
+			# ///////////////////////////////////////////////////////
+			self.RenderWaveform(GroupClip, x, y, total_pixel_length, imgTrack_Left_Height)
+
+
 
 			# ///////////////////////////////////////////////////////
 			# Add LEFT Image to Group
@@ -1533,6 +1553,49 @@ class clip:
 
 
 
+	def RenderWaveform(self, GroupClip, x, y, width, height):
+		"""Draw the audio peaks of the visible part of the file (between the start and end time of
+		this clip) over the middle of the clip.  If the peak file does not exist yet, it is created
+		in the background, and the clip is re-drawn when it's ready."""
+
+		# remove the old waveform (if any)
+		old_waveform = self.get_canvas_child(GroupClip, "waveform")
+		if old_waveform:
+			GroupClip.remove_child(GroupClip.find_child(old_waveform))
+
+		if self.file_object.file_type != "audio":
+			return
+
+		peak_path = waveform.get_peak_path(self.file_object)
+		if not os.path.exists(peak_path):
+			self.parent.parent.project.form.peak_extractor.request(self.file_object)
+			return
+
+		peaks = waveform.read_peaks(peak_path, self.start_time, self.end_time, width)
+		if not peaks:
+			return
+
+		# draw 1 vertical line per pixel (from the min to the max peak)
+		middle = y + (height / 2.0)
+		amplitude = (height / 2.0) * 0.8
+		pixel_width = float(width) / len(peaks)
+		path_data = []
+		for index, (minimum, maximum) in enumerate(peaks):
+			line_x = x + (index * pixel_width)
+			path_data.append("M %.1f %.1f L %.1f %.1f" % (line_x, middle - (maximum * amplitude) + 0.5, line_x, middle - (minimum * amplitude) - 0.5))
+
+		path = goocanvas.Path (parent = GroupClip,
+							   data = " ".join(path_data),
+							   line_width = 1.0,
+							   stroke_color_rgba = waveform.WAVEFORM_COLOR)
+		path.set_data ("id", "waveform")
+
+		# keep the waveform just above the middle images
+		path.lower(None)
+		self.get_canvas_child(GroupClip, "middle").lower(None)
+
+
+
 	def get_canvas_child(self, group, requested_child_id):
 		"""this method loops though the children objects of this group looking 
 		for the item with a specfic id."""
@@ -1942,32 +2005,7 @@ class clip:
 
 		# Create the 2nd clip object
 		SecondClip = self.parent.AddClip(self.name, self.color, seconds_for_x, new_start_time, new_end_time, self.file_object, record_to_history = None)
-		SecondClip.max_length = self.max_length
-		SecondClip.fill = self.fill
-		SecondClip.distort = self.distort
-		SecondClip.composite = self.composite
-		SecondClip.speed = self.speed
-		SecondClip.play_video = self.play_video
-		SecondClip.play_audio = self.play_audio
-		SecondClip.halign = self.halign
-		SecondClip.valign = self.valign
-		SecondClip.reversed = self.reversed
-		SecondClip.volume = self.volume
-		SecondClip.audio_fade_in = self.audio_fade_in
-		SecondClip.audio_fade_out = self.audio_fade_out
-		SecondClip.audio_fade_in_amount = self.audio_fade_in_amount
-		SecondClip.audio_fade_out_amount = self.audio_fade_out_amount
-		SecondClip.video_fade_in = self.video_fade_in
-		SecondClip.video_fade_out = self.video_fade_out
-		SecondClip.video_fade_in_amount = self.video_fade_in_amount
-		SecondClip.video_fade_out_amount = self.video_fade_out_amount
-
-		# copy original properties
-		SecondClip.keyframes = copy.deepcopy(self.keyframes)
-
-		#copy original effects
-		SecondClip.effects = self.effects
-		SecondClip.effects = copy.copy(self.effects)
+		self.copy_properties(SecondClip)
 
 		# render new clip
 		SecondClip.RenderClip()
@@ -1976,14 +2014,135 @@ class clip:
 		self.parent.reorder_clips()
 
 		# raise play-head above clips
-		if self.parent.parent.project.sequences[0].play_head:
-			self.parent.parent.project.sequences[0].play_head.raise_(None)
-			self.parent.parent.project.sequences[0].play_head_line.raise_(None)
+		if self.parent.parent.play_head:
+			self.parent.parent.play_head.raise_(None)
+			self.parent.parent.play_head_line.raise_(None)
 
 		# mark project as modified
 		self.parent.parent.project.set_project_modified(is_modified=True, refresh_xml=True, type = _("Sliced clip"))
 
 
+	def copy_properties(self, other_clip):
+		"""Copy the properties, keyframes, and effects of this clip to another clip (i.e. when a clip is divided)"""
+		other_clip.max_length = self.max_length
+		other_clip.fill = self.fill
+		other_clip.distort = self.distort
+		other_clip.composite = self.composite
+		other_clip.speed = self.speed
+		other_clip.play_video = self.play_video
+		other_clip.play_audio = self.play_audio
+		other_clip.halign = self.halign
+		other_clip.valign = self.valign
+		other_clip.reversed = self.reversed
+		other_clip.volume = self.volume
+		other_clip.audio_fade_in = self.audio_fade_in
+		other_clip.audio_fade_out = self.audio_fade_out
+		other_clip.audio_fade_in_amount = self.audio_fade_in_amount
+		other_clip.audio_fade_out_amount = self.audio_fade_out_amount
+		other_clip.video_fade_in = self.video_fade_in
+		other_clip.video_fade_out = self.video_fade_out
+		other_clip.video_fade_in_amount = self.video_fade_in_amount
+		other_clip.video_fade_out_amount = self.video_fade_out_amount
+
+		# copy original properties
+		other_clip.keyframes = copy.deepcopy(self.keyframes)
+
+		#copy original effects
+		other_clip.effects = copy.copy(self.effects)
+
+
+	def remove_silences(self, silences):
+		"""Split this clip at the silences (a list of (start time, end time) tuples of the file), remove
+		the silent parts, and shift the clips and transitions after it to close the gaps.  Returns the
+		number of seconds removed (or None if the whole clip is silent, which is not changed)."""
+
+		# the start / end times of a clip are in sped up time (and reversed clips are mirrored
+		# around the max length), so convert the silences from file time to clip time
+		speed = self.get_speed()
+		if self.reversed:
+			silences = [(self.max_length - end / speed, self.max_length - start / speed) for (start, end) in silences]
+		else:
+			silences = [(start / speed, end / speed) for (start, end) in silences]
+
+		# find the parts of the clip to keep
+		scenes = []
+		current_time = self.start_time
+		for (silence_start, silence_end) in sorted(silences):
+			if silence_end <= current_time or silence_start >= self.end_time:
+				continue
+			if silence_start > current_time:
+				scenes.append((current_time, silence_start))
+			current_time = max(current_time, silence_end)
+		if current_time < self.end_time:
+			scenes.append((current_time, self.end_time))
+
+		# the whole clip is silent
+		if not scenes:
+			return None
+
+		# nothing to remove
+		removed_length = self.length() - sum([end - start for (start, end) in scenes])
+		if removed_length <= 0.0:
+			return 0.0
+
+		clip_position = self.position_on_track
+		clip_start_time = self.start_time
+		end_of_clip = self.position_on_track + self.length()
+		audio_fade_out = self.audio_fade_out
+		video_fade_out = self.video_fade_out
+
+		# this clip becomes the 1st part, and a new clip is added (right after it) for each other part
+		new_clips = [self]
+		position = self.position_on_track + (scenes[0][1] - scenes[0][0])
+		for (start_time, end_time) in scenes[1:]:
+			new_clip = self.parent.AddClip(self.name, self.color, position, start_time, end_time, self.file_object, record_to_history = None)
+			self.copy_properties(new_clip)
+			new_clip.audio_fade_in = False
+			new_clip.video_fade_in = False
+			new_clips.append(new_clip)
+			position += end_time - start_time
+		self.start_time = scenes[0][0]
+		self.end_time = scenes[0][1]
+
+		# only fade out the last part
+		for part in new_clips[:-1]:
+			part.audio_fade_out = False
+			part.video_fade_out = False
+		new_clips[-1].audio_fade_out = audio_fade_out
+		new_clips[-1].video_fade_out = video_fade_out
+
+		# shift the clips and transitions after this clip (to close the gaps)
+		for other_clip in self.parent.clips:
+			if other_clip not in new_clips and other_clip.position_on_track >= end_of_clip - 0.001:
+				other_clip.position_on_track -= removed_length
+
+		def get_new_position(position):
+			# the position on the track of a time, once the silences are removed
+			if position <= clip_position:
+				return position
+			if position >= end_of_clip - 0.001:
+				return position - removed_length
+			file_time = clip_start_time + (position - clip_position)
+			return clip_position + sum([max(0.0, min(file_time, end) - start) for (start, end) in scenes])
+
+		# move (and shorten) the transitions over this clip, and remove the ones which were only over silences
+		for tran in list(self.parent.transitions):
+			if tran.position_on_track + tran.length <= clip_position:
+				continue
+			new_start = get_new_position(tran.position_on_track)
+			new_end = get_new_position(tran.position_on_track + tran.length)
+			if new_end - new_start < 0.001:
+				self.parent.transitions.remove(tran)
+			else:
+				tran.position_on_track = new_start
+				tran.length = new_end - new_start
+
+		# re-order clip objects on track (since they might be out of order now)
+		self.parent.reorder_clips()
+
+		return removed_length
+
+
 	def get_snap_difference(self, clip_object, canvas_item):
 		"""Determine the number of pixels to shift this clip to snap to it's 
 		closest neighbor clip (if any)"""
@@ -0,0 +1,320 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, re, shutil, threading, Queue, tarfile
+import cPickle as pickle
+import gobject
+from classes import files, profiles, save_project
+
+try:
+	import mlt
+except ImportError:
+	print "*** ERROR: MLT Python bindings failed to import ***"
+
+# the number of threads used to copy (and transcode) the media
+COPY_THREADS = 4
+
+# the time (in seconds) kept before and after the used part of a trimmed file
+HANDLE_LENGTH = 2.0
+
+# a file is only trimmed if the used part (with handles) is less than this part of the file
+TRIM_RATIO = 0.5
+
+
+def get_sequence_frames(file_path):
+	""" Get the paths of the frames of an image sequence (i.e. /path/title_%04d.png) """
+
+	(dir_name, file_name) = os.path.split(file_path)
+	match = re.search(r"%0?\d*d", file_name)
+	if not match or not os.path.isdir(dir_name):
+		return []
+
+	pattern = re.compile(re.escape(file_name[:match.start()]) + r"\d+" + re.escape(file_name[match.end():]) + "$")
+	return [os.path.join(dir_name, name) for name in sorted(os.listdir(dir_name)) if pattern.match(name)]
+
+
+def get_used_clips(project):
+	""" Get the clips of each file (in all the sequences), by the unique id of the file """
+
+	used_clips = {}
+	for sequence in project.sequences:
+		for track in sequence.tracks:
+			for clip in track.clips:
+				used_clips.setdefault(clip.file_object.unique_id, []).append(clip)
+	return used_clips
+
+
+def transcode(profile, source_path, target_path, first_frame, last_frame, audio_only=False):
+	""" Render a range of frames of a media file to a new file (through MLT).  The format and codecs
+	are chosen by the extension of the target file.  Returns True if the file was created. """
+
+	producer = mlt.Producer(profile, '%s' % source_path)
+	if producer.is_valid() == False:
+		return False
+	producer = producer.cut(first_frame, last_frame)
+
+	consumer = mlt.Consumer(profile, "avformat", target_path)
+	consumer.set("real_time", 0)
+	consumer.set("qscale", 1)
+	if audio_only:
+		consumer.set("vn", 1)
+		consumer.set("video_off", 1)
+	consumer.connect(producer)
+	consumer.run()
+
+	return os.path.exists(target_path)
+
+
+class consolidator(threading.Thread):
+	""" This class copies a project, and every file it uses (media, image sequences, titles, Blender
+	animations and transition lumas) to a new folder, so the project can be moved to another computer.
+	Long media can be trimmed to the parts used by the clips.  The files are copied with a few threads,
+	and the project file saved in the folder uses the new paths (the open project is not changed). """
+
+	def __init__(self, project, folder, trim=False, archive=False, progress_callback=None, finished_callback=None):
+		""" Constructor (this must be called by the GTK thread) """
+		threading.Thread.__init__(self)
+		self.setDaemon(True)
+
+		self.project = project
+		self.folder = folder
+		self.trim = trim
+		self.archive = archive
+		self.progress_callback = progress_callback
+		self.finished_callback = finished_callback
+
+		self.cancelled = False
+		self.missing_files = []
+		self.failed_files = []
+		self.processed_jobs = 0
+		self.archive_path = None
+		self.save_error = None
+		self.project_path = os.path.join(folder, project.name + ".osp")
+
+		# a copy of the project (which gets the new paths)
+		self.project_copy = pickle.loads(project.state.getvalue())
+		self.project_copy.folder = folder
+		self.project_copy.theme_settings = None
+
+		# the files to copy, and the target paths already used
+		self.jobs = []
+		self.target_paths = set()
+		self.add_jobs()
+
+	def cancel(self):
+		""" Stop copying files (after the current files) """
+		self.cancelled = True
+
+	def get_target_path(self, folder_name, file_name):
+		""" Get an unused path in a sub-folder of the target folder """
+
+		(base_name, ext) = os.path.splitext(file_name)
+		target_path = os.path.join(self.folder, folder_name, file_name)
+		index = 2
+		while target_path in self.target_paths:
+			target_path = os.path.join(self.folder, folder_name, "%s_%d%s" % (base_name, index, ext))
+			index += 1
+		self.target_paths.add(target_path)
+		return target_path
+
+	def add_jobs(self):
+		""" Decide where each file goes, and change the paths of the project copy """
+
+		used_clips = get_used_clips(self.project_copy)
+
+		for item in self.project_copy.project_folder.items:
+			if not isinstance(item, files.OpenShotFile) or item.file_type == "sequence":
+				continue
+
+			if "%" in item.name:
+				# image sequences (and Blender animations) get a folder of their own
+				frames = get_sequence_frames(item.name)
+				if not frames:
+					self.missing_files.append(item.name)
+					continue
+				(dir_name, file_name) = os.path.split(item.name)
+				target_folder = self.get_target_path("media", os.path.basename(dir_name))
+				for frame in frames:
+					self.jobs.append(("copy", frame, os.path.join(target_folder, os.path.basename(frame)), None))
+				item.name = os.path.join(target_folder, file_name)
+
+			elif not os.path.exists(item.name):
+				self.missing_files.append(item.name)
+				continue
+
+			else:
+				target_path = self.get_target_path("media", os.path.basename(item.name))
+				if self.trim and item.file_type in ("video", "audio") and item.unique_id in used_clips:
+					self.jobs.append(("trim", item.name, target_path, (item, used_clips[item.unique_id])))
+				else:
+					self.jobs.append(("copy", item.name, target_path, None))
+				item.name = target_path
+
+			if item.thumb_location:
+				item.thumb_location = os.path.join(self.folder, "thumbnail", os.path.basename(item.thumb_location))
+
+		# the thumbnails (and titles) of the project
+		for sequence in self.project_copy.sequences:
+			for track in sequence.tracks:
+				for clip in track.clips:
+					if clip.thumb_location:
+						clip.thumb_location = os.path.join(self.folder, "thumbnail", os.path.basename(clip.thumb_location))
+		self.jobs.append(("folder", os.path.join(self.project.folder, "thumbnail"), os.path.join(self.folder, "thumbnail"), None))
+
+		# the transition lumas (which can be different on the other computer)
+		lumas = {}
+		for sequence in self.project_copy.sequences:
+			for track in sequence.tracks:
+				for transition in track.transitions:
+					if not transition.resource or not os.path.exists(transition.resource):
+						continue
+					if transition.resource not in lumas:
+						lumas[transition.resource] = self.get_target_path("transitions", os.path.basename(transition.resource))
+						self.jobs.append(("copy", transition.resource, lumas[transition.resource], None))
+					transition.resource = lumas[transition.resource]
+
+	def run(self):
+		""" Copy the files (with a few threads), and save the project copy """
+
+		jobs = Queue.Queue()
+		for job in self.jobs:
+			jobs.put(job)
+
+		# re-init the mlt factory (before the threads use it)
+		if self.trim:
+			mlt.Factory.init()
+			self.profile = profiles.mlt_profiles(self.project).get_profile(self.project.project_type)
+
+		def copy_worker():
+			while not self.cancelled:
+				try:
+					job = jobs.get_nowait()
+				except Queue.Empty:
+					return
+				try:
+					self.do_job(job)
+				except Exception, ex:
+					print "Failed to consolidate %s: %s" % (job[1], ex)
+					self.failed_files.append(job[1])
+				self.processed_jobs += 1
+				if self.progress_callback:
+					gobject.idle_add(self.progress_callback, self)
+
+		threads = []
+		for i in range(min(COPY_THREADS, len(self.jobs))):
+			t = threading.Thread(target=copy_worker)
+			t.start()
+			threads.append(t)
+		for t in threads:
+			t.join()
+
+		try:
+			if not self.cancelled:
+				self.save()
+			elif os.path.exists(self.folder):
+				# don't leave a half copied project behind (this class created the folder)
+				shutil.rmtree(self.folder)
+		except (IOError, OSError, tarfile.TarError), ex:
+			# (i.e. the disk is full)
+			print "Failed to save the consolidated project %s: %s" % (self.project_path, ex)
+			self.save_error = str(ex)
+		finally:
+			# always close the progress window
+			if self.finished_callback:
+				gobject.idle_add(self.finished_callback, self)
+
+	def do_job(self, job):
+		""" Copy (or trim) 1 file, or sync 1 folder """
+
+		(job_type, source_path, target_path, data) = job
+		if job_type == "folder":
+			# (the manifest of the sync is not needed in the consolidated project)
+			save_project.copy_files(source_path, target_path, hard_link=False)
+			manifest_path = os.path.join(target_path, save_project.MANIFEST_NAME)
+			if os.path.exists(manifest_path):
+				os.remove(manifest_path)
+			return
+
+		if not os.path.exists(os.path.dirname(target_path)):
+			try:
+				os.makedirs(os.path.dirname(target_path))
+			except OSError:
+				# another thread created it
+				pass
+
+		if job_type == "trim" and self.trim_file(source_path, target_path, data[0], data[1]):
+			return
+		# (never a hard link, since titles are edited in place, and the copy must not change the original)
+		save_project.sync_file(source_path, target_path, hard_link=False)
+
+	def trim_file(self, source_path, target_path, file_object, clips):
+		""" Transcode the used part of a file (with handles), and move the clips to the new times.
+		Returns False if the file should be copied instead. """
+
+		# the in / out points of sped up (or reversed) clips are not times of the file, so those files are copied
+		if [clip for clip in clips if clip.get_speed() != 1.0 or clip.reversed]:
+			return False
+
+		fps = self.profile.fps()
+		start_time = max(0.0, min([clip.start_time for clip in clips]) - HANDLE_LENGTH)
+		end_time = min(file_object.length, max([clip.end_time for clip in clips]) + HANDLE_LENGTH)
+		if end_time - start_time >= file_object.length * TRIM_RATIO:
+			return False
+
+		first_frame = int(start_time * fps)
+		last_frame = int(round(end_time * fps))
+		if not transcode(self.profile, source_path, target_path, first_frame, last_frame, file_object.file_type == "audio"):
+			return False
+
+		# the file now starts at the first frame
+		offset = first_frame / fps
+		file_object.length = (last_frame - first_frame + 1) / fps
+		file_object.max_frames = last_frame - first_frame
+		file_object.fps = fps
+		file_object.videorate = (fps, 0)
+		file_object.scene_cuts = [time - offset for time in file_object.scene_cuts if offset <= time <= offset + file_object.length]
+		if file_object.silences:
+			file_object.silences = [(max(start - offset, 0.0), min(end - offset, file_object.length)) for (start, end) in file_object.silences if end > offset and start < offset + file_object.length]
+		(file_object.file_size, file_object.partial_hash) = (None, None)
+		for clip in clips:
+			clip.start_time -= offset
+			clip.end_time -= offset
+			clip.max_length = file_object.length / clip.get_speed()
+		return True
+
+	def save(self):
+		""" Save the project copy (and archive the folder, if needed) """
+
+		# the copy has new paths (and trimmed clips), so it can't use the cached XML of the original sequences
+		for sequence in self.project_copy.sequences:
+			sequence.set_modified()
+
+		if not os.path.exists(self.folder):
+			os.makedirs(self.folder)
+		myFile = file(self.project_path + ".tmp", "wb")
+		pickle.dump(self.project_copy, myFile, False)
+		myFile.close()
+		os.rename(self.project_path + ".tmp", self.project_path)
+
+		if self.archive:
+			# archive the folder (and remove it, since this class created it)
+			self.archive_path = self.folder + ".tar"
+			archive = tarfile.open(self.archive_path, "w")
+			archive.add(self.folder, os.path.basename(self.folder))
+			archive.close()
+			shutil.rmtree(self.folder)
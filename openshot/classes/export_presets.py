@@ -0,0 +1,135 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import xml.dom.minidom as xml
+from xml.parsers.expat import ExpatError
+
+# the catalog of this process (it's only parsed again when a preset folder or file changes)
+catalog = None
+
+
+def get_catalog(project):
+	""" Get the catalog of export presets (parsing the preset folders only if they have changed) """
+	global catalog
+
+	folders = [project.EXPORT_PRESETS_DIR, project.USER_EXPORT_PRESETS_DIR]
+	if catalog == None or catalog.get_key(folders) != catalog.key:
+		catalog = preset_catalog(folders)
+	return catalog
+
+
+class export_preset:
+	""" The settings of an export preset XML file """
+
+	def __init__(self, file_path):
+		self.file_path = file_path
+
+		xmldoc = xml.parse(file_path)
+		self.type = self.get_text(xmldoc, "type")
+		self.title = self.get_text(xmldoc, "title")
+		self.videoformat = self.get_text(xmldoc, "videoformat")
+		self.videocodec = self.get_text(xmldoc, "videocodec")
+		self.audiocodec = self.get_text(xmldoc, "audiocodec")
+		self.samplerate = self.get_text(xmldoc, "samplerate")
+		self.audiochannels = self.get_text(xmldoc, "audiochannels")
+		self.videobitrate = self.get_bitrates(xmldoc, "videobitrate")
+		self.audiobitrate = self.get_bitrates(xmldoc, "audiobitrate")
+
+		# the profiles of this preset (an empty list means all profiles)
+		self.profiles = []
+		for profile in xmldoc.getElementsByTagName("projectprofile"):
+			self.profiles.append(profile.childNodes[0].data)
+
+	def get_text(self, xmldoc, tag_name):
+		elements = xmldoc.getElementsByTagName(tag_name)
+		if elements and elements[0].childNodes:
+			return elements[0].childNodes[0].data
+		return ""
+
+	def get_bitrates(self, xmldoc, tag_name):
+		""" Get the low, med, and high bit rates (the last element wins, like the export dialog) """
+		bitrates = {"low" : "", "med" : "", "high" : ""}
+		for rate in xmldoc.getElementsByTagName(tag_name):
+			for quality in bitrates.keys():
+				if rate.hasAttribute(quality):
+					bitrates[quality] = rate.attributes[quality].value
+		return bitrates
+
+
+class preset_catalog:
+	""" All the export presets (built-in and user), parsed once, and indexed by type and title
+	(i.e. target). """
+
+	def __init__(self, folders):
+		self.folders = folders
+		self.key = self.get_key(folders)
+
+		self.presets = []
+		self.types = {}
+		self.titles = {}
+
+		for folder in folders:
+			if not os.path.isdir(folder):
+				continue
+			for file_name in sorted(os.listdir(folder)):
+				if not file_name.endswith(".xml"):
+					continue
+				try:
+					preset = export_preset(os.path.join(folder, file_name))
+				except (ExpatError, IOError), ex:
+					print "Failed to load export preset %s: %s" % (file_name, ex)
+					continue
+				self.add(preset)
+
+	def get_key(self, folders):
+		""" The modified times of the preset folders (which change when a preset is added or removed),
+		and of the preset files (which change when a preset is edited) """
+		key = []
+		for folder in folders:
+			if os.path.isdir(folder):
+				key.append(os.path.getmtime(folder))
+				for file_name in sorted(os.listdir(folder)):
+					if file_name.endswith(".xml"):
+						key.append((file_name, os.path.getmtime(os.path.join(folder, file_name))))
+			else:
+				key.append(None)
+		return key
+
+	def add(self, preset):
+		""" Add a preset to the indexes (a user preset with the same title replaces a built-in one) """
+
+		if preset.title in self.titles:
+			old_preset = self.titles[preset.title]
+			self.presets.remove(old_preset)
+			self.types[old_preset.type].remove(old_preset)
+
+		self.presets.append(preset)
+		self.types.setdefault(preset.type, []).append(preset)
+		self.titles[preset.title] = preset
+
+	def get_types(self):
+		""" Get the list of preset types (i.e. Web, Device, All Formats) """
+		return [type for type in self.types.keys() if self.types[type]]
+
+	def get_presets_by_type(self, type):
+		return self.types.get(type, [])
+
+	def get_preset(self, title):
+		""" Get a preset by its title (i.e. target), or None """
+		return self.titles.get(title)
@@ -41,7 +41,7 @@ class OpenShotFile:
 		self.name = ""			# short / friendly name of the file
 		self.length = 0.0		# length in seconds
 		self.videorate = (30,0)	# audio rate or video framerate
-		self.file_type = ""		# video, audio, image, image sequence
+		self.file_type = ""		# video, audio, image, image sequence, sequence
 		self.max_frames = 0.0
 		self.fps = 0.0
 		self.height = 0
@@ -58,6 +58,28 @@ class OpenShotFile:
 		self.audio_codec = ""
 		self.audio_frequency = ""
 		self.audio_channels = ""
+		self.scene_cuts = []		# the times (in seconds) of the detected scene cuts (if any)
+		self.silences = None		# the (start, end) times of the silent parts (None = not detected yet)
+		self.file_size = None		# the size and partial hash of the file (used to find it, if it's moved)
+		self.partial_hash = None
+		
+		
+	def __setstate__(self, state):
+		""" This method is called when an OpenShot project file is un-pickled (i.e. opened).  It can
+		    be used to update the structure of old file classes, to make old project files compatable with
+		    newer versions of OpenShot. """
+	
+		if 'scene_cuts' not in state:
+			state['scene_cuts'] = []
+		if 'silences' not in state:
+			state['silences'] = None
+		if 'file_size' not in state:
+			state['file_size'] = None
+		if 'partial_hash' not in state:
+			state['partial_hash'] = None
+
+		# update the state object with new schema changes
+		self.__dict__.update(state)
 		
 		
 	def get_thumbnail(self, width, height):
@@ -104,15 +126,15 @@ class OpenShotFile:
 		# resize thumbnail
 		return pbThumb.scale_simple(width, height, gtk.gdk.INTERP_BILINEAR)	
 		
-	def update_thumbnail(self):
+	def update_thumbnail(self, thumbnailer=None):
 	
-		# Initialize variables
+		# Initialize variables (a background thread passes its own thumbnailer)
 		project = self.project
-		thumbnailer = project.thumbnailer
+		thumbnailer = thumbnailer or project.thumbnailer
 		file_type = self.file_type
 		
-		# Audio files have a common thumbnail
-		if not file_type == "audio":	
+		# Audio files have a common thumbnail (and sequences have no thumbnail)
+		if file_type not in ("audio", "sequence"):	
 		
 			# Split the file name
 			(dir_name, file_name) = os.path.split(self.name)
@@ -186,6 +208,7 @@ class OpenShotFolder:
 		"""
 		
 		import urllib
+		from classes.bulk_import import is_media_file
 		
 		# get a reference to the language translate method
 		_ = self.project.translate
@@ -212,9 +235,13 @@ class OpenShotFolder:
 			for sub_file in os.listdir(file_name):
 				sub_file_path = os.path.join(file_name, sub_file)
 				
-				# only add files
+				# only add files (which might be media files)
 				if os.path.isfile(sub_file_path):
 					
+					if not is_media_file(sub_file_path):
+						broken_files += 1
+						continue
+					
 					# don't add a file that is already in the project (i.e. dupe check)
 					if self.file_exists_in_project(sub_file_path) == False:
 
@@ -272,6 +299,83 @@ class OpenShotFolder:
 		return (ok_files, broken_files, duplicate_files, folders)
 	
 	
+	def AddFiles(self, file_names):
+		"""Add many files to the current folder in a single operation (the project is only
+		scanned once for duplicates, and only 1 undo / redo history entry is created)"""
+		"""
+		Returns a tuple: 
+		(The number of files that could be successfully imported,
+		The number of files that could not be imported (wrong format),
+		The number of files already imported to the project)
+		"""
+		
+		# get a reference to the language translate method
+		_ = self.project.translate
+		
+		ok_files = 0
+		broken_files = 0
+		duplicate_files = 0
+		
+		# get the paths of the files already in the project (i.e. dupe check)
+		existing_files = set()
+		for item in self.items:
+			if isinstance(item, OpenShotFile) and item.file_type not in ("image sequence", "sequence"):
+				existing_files.add(os.path.realpath(item.name))
+		
+		for file_name in file_names:
+			real_path = os.path.realpath(file_name)
+			if real_path in existing_files:
+				duplicate_files += 1
+				continue
+			
+			# inspect the media file and generate it's thumbnail image (if any)
+			newFile = None
+			if os.path.isfile(file_name):
+				newFile = self.project.thumbnailer.GetFile(file_name)
+			
+			# add to internal item collection
+			if newFile:
+				ok_files += 1
+				self.items.append(newFile)
+				existing_files.add(real_path)
+			else:
+				broken_files += 1
+		
+		# mark project as modified
+		if ok_files:
+			self.project.set_project_modified(is_modified=True, refresh_xml=False, type=_("Added files"))
+		
+		return (ok_files, broken_files, duplicate_files)
+	
+	
+	def AddSequence(self, sequence):
+		"""Add a sequence to the project files, so it can be used as a clip in other sequences.  The
+		sequence is not copied, the clips reference the MLT XML of the sequence."""
+		
+		# get a reference to the language translate method
+		_ = self.project.translate
+		
+		# only add each sequence once
+		for item in self.items:
+			if isinstance(item, OpenShotFile) and item.file_type == "sequence" and item.sequence_id == sequence.unique_id:
+				return item
+		
+		newFile = OpenShotFile(self.project)
+		newFile.name = sequence.name
+		newFile.label = sequence.name
+		newFile.file_type = "sequence"
+		newFile.sequence_id = sequence.unique_id
+		newFile.fps = self.project.fps()
+		newFile.length = sequence.Calculate_Length()
+		newFile.max_frames = round(newFile.length * newFile.fps)
+		self.items.append(newFile)
+		
+		# mark project as modified
+		self.project.set_project_modified(is_modified=True, refresh_xml=False, type=_("Added sequence to project files"))
+		
+		return newFile
+	
+	
 	def GetImageSequenceDetails(self, file_path, session=None):
 		""" Determine if this image is part of an image sequence, and if so, return
 		the regular expression to match this image sequence, else return None. """
@@ -476,7 +580,7 @@ class OpenShotFolder:
 		for item in self.items:
 			
 			if isinstance(item, OpenShotFile):
-				if item.file_type != "image sequence":
+				if item.file_type not in ("image sequence", "sequence"):
 					try:
 						if os.path.samefile(file_name, item.name):
 							return True
@@ -531,14 +635,16 @@ class OpenShotFolder:
 		item = self.FindFile(filename)
 		if item:
 			
-			# find clips that have this file object
-			for track in self.project.sequences[0].tracks:
-				for clip in reversed(track.clips):
-					# does clip match file
-					if clip.file_object == item:
-						# delete clip and remove thumbnail
-						track.clips.remove(clip)
-						clip.remove_thumbnail()
+			# find clips that have this file object (in all sequences)
+			for sequence in self.project.sequences:
+				for track in sequence.tracks:
+					for clip in reversed(track.clips):
+						# does clip match file
+						if clip.file_object == item:
+							# delete clip and remove thumbnail
+							track.clips.remove(clip)
+							clip.remove_thumbnail()
+							sequence.set_modified()
 			
 			# remove from file collection
 			self.items.remove(item)
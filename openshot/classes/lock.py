@@ -16,7 +16,7 @@
 #	You should have received a copy of the GNU General Public License
 #	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
 
-import os, sys, threading, time, uuid
+import os, sys, threading, time, uuid, socket
 
 
 def check_directory_present(path, permissions = 0750):
@@ -108,8 +108,13 @@ def check_pid(path):
 
 			# loop through the remaining args
 			print "Adding files to the watch queue:"
+			import_paths = []
 			for arg in sys.argv[1:]:
 				
+				# ignore command line options (i.e. --profile-startup)
+				if arg.startswith("--"):
+					continue
+				
 				# a media file, add it to the project tree
 				# if the path isn't absolute, make it absolute
 				if not os.path.isabs(arg):
@@ -119,14 +124,18 @@ def check_pid(path):
 				if ".osp" not in arg:
 					# print the path of the media file
 					print arg
+					import_paths.append(arg)
 					
-					# create a import queue file for the primary instance of OpenShot
+					# increment counter
+					number_of_files += 1
+			
+			# send all the files to the primary instance of OpenShot at once (or
+			# create import queue files, if it is not listening yet)
+			if import_paths and not (is_running and send_to_queue(path, import_paths)):
+				for arg in import_paths:
 					fp=open(os.path.join(path, "queue", str(uuid.uuid1())), 'w')
 					fp.write(arg)
 					fp.close()
-					
-					# increment counter
-					number_of_files += 1
 				
 			# exit the program (if OpenShot is already running) and ARGV is passed in
 			if is_running and number_of_files:
@@ -140,20 +149,124 @@ def check_pid(path):
 
 
 
+def send_to_queue(path, import_paths):
+	""" Send a list of paths to the primary instance of OpenShot (using the queue socket).
+	Returns False if the primary instance is not listening. """
+	
+	if not hasattr(socket, "AF_UNIX"):
+		return False
+	
+	try:
+		client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		client.connect(os.path.join(path, "queue.sock"))
+		client.sendall("\n".join(import_paths))
+		client.close()
+		return True
+	except socket.error:
+		return False
+
+
+
 class queue_watcher ( threading.Thread ):
-	""" This class polls the /queue/ folder, looking for files to import into OpenShot.  When it finds
-	a text file, it should get the path out of the file, import the file, and then delete the file.  Only
-	1 instance of OpenShot should be polling this folder. """
+	""" This class waits for files to import into OpenShot.  Other instances of OpenShot send the paths
+	over a UNIX socket (~/.openshot/queue.sock), so this thread sleeps until something is sent.  Paths can
+	also be written to text files in the /queue/ folder, which are imported when the thread starts, when
+	something is sent, and (if the socket can't be used) by polling the folder.  Only 1 instance of OpenShot
+	should be watching the queue. """
 	
 	def set_form(self, main_form):
 		self.form = main_form
+		self.server = None
+		
+	def stop(self):
+		""" Stop this thread (and wake it up, if it's waiting for the socket) """
+		self.amAlive = False
+		if self.server:
+			send_to_queue(self.path, [])
+		
+	def read_queue_folder(self):
+		""" Get the paths in the queue files (and delete the files) """
+		
+		import_paths = []
+		for filename in os.listdir(self.queue_location):
+			# get full file path
+			full_filename = os.path.join(self.queue_location, filename)
+			
+			# read the content of the file
+			f = open(full_filename, 'r')
+			import_paths.append(f.read().strip())
+			f.close()
+			
+			# delete import file
+			os.remove(full_filename)
+		
+		return import_paths
+	
+	def queue_files(self, import_paths):
+		""" Import a batch of paths on the GTK thread (1 import, and 1 refresh) """
+		
+		import gobject
+		
+		if import_paths and self.form:
+			gobject.idle_add(self.import_files, import_paths)
+	
+	def import_files(self, import_paths):
+		""" Import a batch of paths (this runs on the GTK thread) """
+		
+		if self.form.project.project_folder:
+			# folders are imported 1 at a time, and all the files at once
+			file_paths = []
+			for import_path in import_paths:
+				if os.path.isdir(import_path):
+					self.form.project.project_folder.AddFile(import_path)
+				else:
+					file_paths.append(import_path)
+			if file_paths:
+				self.form.project.project_folder.AddFiles(file_paths)
+		
+		# refresh form
+		self.form.refresh()
+		return False
+	
+	def start_server(self):
+		""" Listen on the queue socket.  Returns False if this platform has no UNIX sockets. """
+		
+		if not hasattr(socket, "AF_UNIX"):
+			return False
+		
+		socket_path = os.path.join(self.path, "queue.sock")
+		try:
+			# remove the socket of an old instance (if any)
+			if os.path.exists(socket_path):
+				os.remove(socket_path)
+			
+			self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			self.server.bind(socket_path)
+			self.server.listen(5)
+			return True
+		
+		except (socket.error, OSError):
+			print "Failed to create the queue socket.  Polling the queue folder instead."
+			self.server = None
+			return False
+	
+	def read_client(self, client):
+		""" Read all the paths sent by another instance """
+		
+		data = []
+		while True:
+			chunk = client.recv(4096)
+			if not chunk:
+				break
+			data.append(chunk)
+		client.close()
+		
+		return [import_path for import_path in "".join(data).split("\n") if import_path.strip()]
 
 	def run ( self ):
 		""" This is the main method on this thread.  This method should not return anything, or the 
 		thread will no longer be active...  """
 		
-		import gobject
-
 		self.path = self.form.project.USER_DIR
 		self.queue_location = os.path.join(self.path, "queue")
 		pidPath = os.path.join(self.path, "pid.lock")
@@ -165,39 +278,36 @@ class queue_watcher ( threading.Thread ):
 		# only allow this thread to run if this instance of OpenShot is the primary instance.
 		# we can't have 2 instances both watching the /queue/ folder.
 		if os.getpid() == pid:
-
-			# this loop will continue as long as OpenShot is running
-			while self.amAlive:
-				needs_refresh = False
-
-				# check for files in the /queue/ folder
-				for filename in os.listdir(self.queue_location):
-					# get full file path
-					full_filename = os.path.join(self.queue_location, filename)
+			
+			# listen for other instances, and import the files queued before OpenShot started
+			has_server = self.start_server()
+			self.queue_files(self.read_queue_folder())
+			
+			if has_server:
+				# wait for other instances to send files (this thread sleeps until a connection)
+				while self.amAlive:
+					try:
+						client, address = self.server.accept()
+						import_paths = self.read_client(client)
+					except socket.error:
+						continue
 					
-					# read the content of the file
-					f = open(full_filename, 'r')
-					import_path = f.read().strip()
-					f.close()
-
-					# IMPORT FILE
-					if self.form.project.project_folder:
-						gobject.idle_add(self.form.project.project_folder.AddFile, import_path)
-					needs_refresh = True
-	
-					# delete import file
-					os.remove(full_filename)
+					# import the sent files, and any queue files (all in 1 batch)
+					if self.amAlive:
+						self.queue_files(import_paths + self.read_queue_folder())
+				
+				# remove the socket
+				self.server.close()
+				try:
+					os.remove(os.path.join(self.path, "queue.sock"))
+				except OSError:
+					pass
+			
+			else:
+				# this loop will continue as long as OpenShot is running
+				while self.amAlive:
+					# check for files in the /queue/ folder
+					self.queue_files(self.read_queue_folder())
 					
-				# refresh project files list (if needed)
-				if needs_refresh:
-					if self.form:
-						# change modified status
-						gobject.idle_add(self.form.project.set_project_modified, True, False)
-						# refresh form
-						gobject.idle_add(self.form.refresh)
-
-				# wait a little
-				time.sleep(1) 
-		
-		else:
-			print "Not the primary instance of OpenShot. Not starting queue watcher thread."
+					# wait a little
+					time.sleep(1)
@@ -19,7 +19,7 @@
 import cPickle as pickle
 import os
 import gtk
-from classes import messagebox, files
+from classes import messagebox
 
 def open_project(project_object, file_path):
    
@@ -28,10 +28,10 @@ def open_project(project_object, file_path):
 		# open the serialized file
 		myFile = file(file_path, "rb")
 		old_form = project_object.form
-		old_play_head = project_object.sequences[0].play_head
-		old_ruler_time = project_object.sequences[0].ruler_time
+		old_play_head = project_object.current_sequence.play_head
+		old_ruler_time = project_object.current_sequence.ruler_time
 		old_thumbnailer = project_object.thumbnailer
-		old_play_head_line = project_object.sequences[0].play_head_line
+		old_play_head_line = project_object.current_sequence.play_head_line
 		old_theme = project_object.theme
 		project_object.mlt_profile = None
 
@@ -40,11 +40,11 @@ def open_project(project_object, file_path):
 
 		# re-attach some variables (that aren't pickleable)
 		project_object.form = old_form
-		project_object.sequences[0].play_head = old_play_head
-		project_object.sequences[0].ruler_time = old_ruler_time
-		project_object.sequences[0].play_head_line = old_play_head_line
+		project_object.current_sequence.play_head = old_play_head
+		project_object.current_sequence.ruler_time = old_ruler_time
+		project_object.current_sequence.play_head_line = old_play_head_line
 		project_object.thumbnailer = old_thumbnailer
-		project_object.sequences[0].play_head_position = 0.0
+		project_object.current_sequence.play_head_position = 0.0
 		project_object.theme = old_theme
 		
 		# update the thumbnailer's project reference
@@ -69,52 +69,19 @@ def open_project(project_object, file_path):
 		project_object.form.mnuPositionSubMenu1.project = project_object.form.project
 		
 		
-		#check project files still exist in the same location
-		missing_files = ""
-		items = project_object.project_folder.items
-				
-		for item in items:
-			if isinstance(item, files.OpenShotFile):
-				if not os.path.exists(item.name) and "%" not in item.name:
-					missing_files += item.name + "\n"
-		
-		if missing_files:
-			messagebox.show("OpenShot", _("The following file(s) no longer exist.") + "\n\n" + missing_files)
-
-		missing_transitions = ""
-		
-		for sequence in project_object.sequences:
-			for track in sequence.tracks:
-				for transition in track.transitions:
-					if transition.resource == "":
-						continue
-					if not os.path.exists(transition.resource):
-						missing_transitions += transition.resource + "\n"
-						transition.resource = "" # default to dissolve
-		
-		if missing_transitions:
-			messagebox.show("OpenShot", _("The following transition(s) no longer exist.") + "\n\n" + missing_transitions)
-		
 		# Recreate the thumbnail folder if it is missing
 		if not os.path.exists(project_object.folder + "/thumbnail"):
 			os.makedirs(project_object.folder + "/thumbnail")
 		
-		# Recreate missing thumbnails for files
-		for item in items:
-			if isinstance(item, files.OpenShotFile):
-				if not os.path.exists(item.thumb_location):
-					item.update_thumbnail()
-		
-		# Recreate missing thumbnails for clips
+		# Code to keep pre 1.4.0 .osp files compatible. May be removed later.
 		for sequence in project_object.sequences:
 			for track in sequence.tracks:
 				for clip in track.clips:
-					# Code to keep pre 1.4.0 .osp files compatible. May be removed later.
 					if not hasattr(clip, "thumb_location"):
 						clip.thumb_location = ""
-				
-					if not os.path.exists(clip.thumb_location) and not clip.file_object.file_type == "audio":
-						clip.update_thumbnail()
+		
+		# The missing files, transitions, and thumbnails are checked in the background
+		# (by validate_project), once the project is shown.
 		
 		# mark XML as refreshable
 		project_object.set_project_modified(is_modified=False, refresh_xml=True)
@@ -23,6 +23,47 @@ try:
 except ImportError:
 	print "*** ERROR: MLT Python bindings failed to import ***"
 	
+# the index of profile descriptions (and the modified times of the profile folders it was built from)
+profile_index = {}
+profile_index_key = None
+
+
+def get_profile_index(project):
+	""" Get a dictionary of profile descriptions (and their file paths).  The profile files are only
+	read again when a profile folder changes, and they are read as text (without MLT), so this is
+	cheap enough to validate a profile name. """
+	global profile_index, profile_index_key
+	
+	folders = [project.PROFILES_DIR, project.USER_PROFILES_DIR]
+	key = [os.path.exists(folder) and os.path.getmtime(folder) for folder in folders]
+	if key == profile_index_key:
+		return profile_index
+	
+	index = {}
+	for folder in folders:
+		if not os.path.exists(folder):
+			continue
+		for file_name in os.listdir(folder):
+			file_path = os.path.join(folder, file_name)
+			try:
+				f = open(file_path, "r")
+				for line in f:
+					if line.startswith("description="):
+						index[line[len("description="):].strip()] = file_path
+						break
+				f.close()
+			except IOError:
+				pass
+	
+	profile_index = index
+	profile_index_key = key
+	return profile_index
+
+
+def profile_exists(project, profile_name):
+	""" Check if a profile exists (using the profile index) """
+	return profile_name in get_profile_index(project)
+
 
 class mlt_profiles:
 	
@@ -16,7 +16,7 @@
 #	You should have received a copy of the GNU General Public License
 #	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
 
-import os, sys, locale
+import os, sys, locale, hashlib
 import gtk, re
 import xml.dom.minidom as xml
 from classes import profiles, files, thumbnail, open_project, save_project, state_project, restore_state, sequences, video, theme
@@ -56,6 +56,7 @@ class project():
 		self.THEMES_DIR = os.path.join(self.BASE_DIR, "openshot", "themes")
 		self.USER_PROFILES_DIR = os.path.join(self.USER_DIR, "user_profiles")
 		self.USER_TRANSITIONS_DIR = os.path.join(self.USER_DIR, "user_transitions")
+		self.USER_EXPORT_PRESETS_DIR = os.path.join(self.USER_DIR, "user_export_presets")
 		
 
 		# only run the following code if we are really using 
@@ -75,6 +76,8 @@ class project():
 			self.is_modified = False
 			self.refresh_xml = True
 			self.mlt_profile = None
+			self.transaction_depth = 0
+			self.generating_sequences = []	  # the sequences being generated (to prevent a sequence from nesting itself)
 			
 			# set theme
 			self.set_theme(preferences.Settings.general["default_theme"])
@@ -87,6 +90,7 @@ class project():
 	
 			# ini the sequences collection
 			self.sequences = [sequences.sequence(_("Default Sequence 1"), self)]		
+			self.sequence_index = 0	  # the sequence shown on the timeline
 	
 			# init the tab collection
 			self.tabs = [self.sequences[0]]	  # holds a refernce to the sequences, and the order of the tabs
@@ -102,7 +106,11 @@ class project():
 	def set_theme(self, folder_name):
 		""" Set the current theme and theme settings """
 
-		# Set the theme, and load the theme settings
+		# nothing to do if this theme is already loaded (and hasn't changed)
+		if getattr(self, "theme", None) == folder_name and getattr(self, "theme_settings", None) and self.theme_settings.is_current():
+			return
+
+		# Set the theme, and load the theme settings (cached by the theme module)
 		self.theme = folder_name
 		self.theme_settings = theme.theme(folder_name=self.theme, project=self)
 		
@@ -204,8 +212,13 @@ class project():
 		state['THEMES_DIR'] = empty_project.THEMES_DIR
 		state['USER_PROFILES_DIR'] = empty_project.USER_PROFILES_DIR
 		state['USER_TRANSITIONS_DIR'] = empty_project.USER_TRANSITIONS_DIR
+		state['USER_EXPORT_PRESETS_DIR'] = empty_project.USER_EXPORT_PRESETS_DIR
 		state['refresh_xml'] = True
 		state['mlt_profile'] = None
+		state['transaction_depth'] = 0
+		state['generating_sequences'] = []
+		if 'sequence_index' not in state:
+			state['sequence_index'] = 0
 
 		empty_project = None
 
@@ -217,15 +230,66 @@ class project():
 	def Render(self):
 		"""This method recursively renders all the tracks and clips on the timeline"""
 		
+		# defer the render until the transaction is committed
+		if self.transaction_depth:
+			self.transaction_render = True
+			return
+		
 		# Render the timeline
-		self.sequences[0].Render()
+		self.current_sequence.Render()
 		
 		# Render Play Head (and position line)
-		self.sequences[0].RenderPlayHead()
+		self.current_sequence.RenderPlayHead()
+		
+		
+	def get_current_sequence(self):
+		""" Get the sequence shown on the timeline """
+		return self.sequences[self.sequence_index]
+	current_sequence = property(get_current_sequence)
+	
+	
+	def AddSequence(self, sequence_name):
+		""" Add a new (empty) sequence to the project """
+		
+		# get a reference to the language translate method
+		_ = self.translate
+		
+		new_sequence = sequences.sequence(sequence_name, self)
+		self.sequences.append(new_sequence)
+		
+		# mark project as modified
+		self.set_project_modified(is_modified=True, refresh_xml=False, type=_("Added sequence"))
+		return new_sequence
+	
+	
+	def FindSequence(self, unique_id):
+		""" Get the sequence with a unique id (or None) """
+		for sequence in self.sequences:
+			if sequence.unique_id == unique_id:
+				return sequence
+		return None
+	
+	
+	def set_current_sequence(self, sequence):
+		""" Show a different sequence on the timeline (and in the video player) """
 		
+		# clear the play head of the old sequence (it is on the canvas of the timeline)
+		self.current_sequence.play_head = None
+		self.current_sequence.ruler_time = None
+		self.current_sequence.play_head_line = None
 		
-	def GenerateXML(self, file_name):
-		"""This method creates the MLT XML used by OpenShot"""
+		self.sequence_index = self.sequences.index(sequence)
+		
+		# the video player needs the XML of this sequence (the caller refreshes the timeline)
+		self.refresh_xml = True
+		
+		
+	def GenerateXML(self, file_name, sequence=None):
+		"""This method creates the MLT XML used by OpenShot (for the current sequence, or any
+		other sequence in the project)"""
+		
+		if not sequence:
+			sequence = self.current_sequence
 		
 		# get locale info
 		lc, encoding = locale.getdefaultlocale()
@@ -255,7 +319,11 @@ class project():
 		westley_root.appendChild(tractor1)
 		
 		# Add all the other timeline objects (such as sequences, clips, filters, and transitions)
-		self.sequences[0].GenerateXML(dom, tractor1)
+		self.generating_sequences.append(sequence.unique_id)
+		try:
+			sequence.GenerateXML(dom, tractor1)
+		finally:
+			self.generating_sequences.remove(sequence.unique_id)
 		
 		# Pretty print using a Regular expression (I am using regex due to a bug in the minidom, with extra 
 		# whitespace in it's pretty print method.  This should fix the pretty print's white space issue.)
@@ -268,9 +336,77 @@ class project():
 		f.close()
 		
 		# reset project as NOT modified
-		self.refresh_xml = False
+		if sequence == self.current_sequence:
+			self.refresh_xml = False
 
 
+	def get_sequence_xml(self, sequence=None):
+		""" Get the path of the MLT XML file of a sequence.  Each sequence has it's own XML file,
+		which is only generated again if the sequence (or the project profile) has changed. """
+		
+		if not sequence:
+			sequence = self.current_sequence
+		
+		# the file name depends on the version of the sequence, and the profile
+		profile_name = self.mlt_profile and self.mlt_profile.description() or ""
+		key = hashlib.md5("%s|%s|%s" % (self.get_sequence_token(sequence), self.project_type, profile_name)).hexdigest()
+		xml_folder = os.path.join(self.USER_DIR, "sequences")
+		xml_path = os.path.join(xml_folder, "%s-%s.mlt" % (sequence.unique_id, key))
+		
+		if not os.path.exists(xml_path):
+			if not os.path.exists(xml_folder):
+				os.mkdir(xml_folder)
+			
+			# remove the old XML files of this sequence
+			for old_file in os.listdir(xml_folder):
+				if old_file.startswith(sequence.unique_id + "-"):
+					os.remove(os.path.join(xml_folder, old_file))
+			
+			# generate a new MLT XML file
+			self.GenerateXML(xml_path, sequence)
+			
+			# update the length of the project files which reference this sequence
+			for item in self.project_folder.items:
+				if isinstance(item, files.OpenShotFile) and item.file_type == "sequence" and item.sequence_id == sequence.unique_id:
+					item.length = sequence.Calculate_Length()
+		
+		elif sequence == self.current_sequence:
+			# the XML file of this sequence is already up to date
+			self.refresh_xml = False
+		
+		return xml_path
+	
+	
+	def get_sequence_token(self, sequence, visited=None):
+		""" Get a token which changes when a sequence, or any sequence nested inside it, is modified """
+		
+		if visited == None:
+			visited = []
+		visited.append(sequence.unique_id)
+		
+		tokens = [sequence.xml_token]
+		for MyTrack in sequence.tracks:
+			for MyClip in MyTrack.clips:
+				if MyClip.file_object.file_type == "sequence" and MyClip.file_object.sequence_id not in visited:
+					nested_sequence = self.FindSequence(MyClip.file_object.sequence_id)
+					if nested_sequence:
+						tokens.append(self.get_sequence_token(nested_sequence, visited))
+		
+		return "|".join(tokens)
+	
+	
+	def get_sequence_resource(self, sequence_id):
+		""" Get the MLT resource of a nested sequence clip.  The sequence is rendered to it's own XML file
+		once, and every clip which uses it references that file. """
+		
+		sequence = self.FindSequence(sequence_id)
+		if not sequence or sequence_id in self.generating_sequences:
+			# missing sequence, or a sequence nested inside itself
+			return "colour:black"
+		
+		return self.get_sequence_xml(sequence)
+	
+	
 	#----------------------------------------------------------------------
 	def RefreshXML(self):
 		""" Generate a new MLT XML file (if needed).  This only creates a
@@ -283,8 +419,8 @@ class project():
 			self.form.timelinewindowRight.window.set_cursor(gtk.gdk.Cursor(150))
 			self.form.timelinewindowRight.window.set_cursor(gtk.gdk.Cursor(150))
 			
-			# generate a new MLT XML file
-			self.GenerateXML(os.path.join(self.USER_DIR, "sequence.mlt"))
+			# get the MLT XML file of the current sequence (only generated if the sequence has changed)
+			xml_path = self.get_sequence_xml()
 
 			# ****************************
 			# re-load the xml
@@ -299,7 +435,7 @@ class project():
 				# store current frame position
 				prev_position = self.form.MyVideo.position()
 
-				self.form.MyVideo.set_project(self, self.form, os.path.join(self.USER_DIR, "sequence.mlt"), mode="preview")
+				self.form.MyVideo.set_project(self, self.form, xml_path, mode="preview")
 				self.form.MyVideo.load_xml()
 
 				# restore position
@@ -315,7 +451,7 @@ class project():
 				gtk.gdk.flush()
 
 				# play the video in it's own thread
-				self.form.MyVideo = video.player(self, self.form, os.path.join(self.USER_DIR, "sequence.mlt"), mode="preview")
+				self.form.MyVideo = video.player(self, self.form, xml_path, mode="preview")
 				self.form.MyVideo.start()
 			# ****************************
 			
@@ -335,9 +471,17 @@ class project():
 		from windows import preferences
 		self.file_type = "ascii"
 		
+		# write the pending autosave snapshots first (so they can't replace this save)
+		if self.form and self.form.autosave_writer:
+			self.form.autosave_writer.flush()
+		
 		# call the save method
 		save_project.save_project(self, file_path)
 		
+		# the journal of edits is not needed anymore
+		if self.form and self.form.autosave_writer:
+			self.form.autosave_writer.clear_journal(file_path)
+		
 	#----------------------------------------------------------------------
 	def Open(self, file_path):
 		"""Call the open method, which will open an existing
@@ -350,8 +494,21 @@ class project():
 		
 	def set_project_modified(self, is_modified=False, refresh_xml=False, type=None):
 		"""Set the modified status and accordingly the save button sensitivity"""
+		
+		# during a transaction, just remember the changes (until commit_transaction)
+		if self.transaction_depth:
+			self.transaction_modified = self.transaction_modified or is_modified
+			self.transaction_refresh_xml = self.transaction_refresh_xml or refresh_xml
+			if type and not self.transaction_type:
+				self.transaction_type = type
+			return
+		
 		self.is_modified = is_modified
 		self.refresh_xml = refresh_xml
+		
+		# the XML of the current sequence is out of date
+		if refresh_xml:
+			self.current_sequence.set_modified()
 
 		if is_modified == True:
 			self.form.tlbSave.set_sensitive(True)
@@ -364,6 +521,43 @@ class project():
 			self.form.tlbSave.set_sensitive(False)
 			
 	
+	def begin_transaction(self):
+		"""Start a batch of changes (i.e. adding an effect to every clip on a track).  Until
+		commit_transaction() is called, Render() and set_project_modified() only record that
+		they were called, so the timeline is rendered, the XML is refreshed, and the undo / redo
+		state is saved only 1 time.  Transactions can be nested."""
+		
+		if not self.transaction_depth:
+			self.transaction_render = False
+			self.transaction_modified = None
+			self.transaction_refresh_xml = False
+			self.transaction_type = None
+		
+		self.transaction_depth += 1
+		
+		
+	def commit_transaction(self, type=None):
+		"""Finish a batch of changes, and apply all the deferred work.  If type is None, the undo / redo
+		history uses the description of the 1st change in the transaction."""
+		
+		self.transaction_depth = max(self.transaction_depth - 1, 0)
+		if self.transaction_depth:
+			# still inside an outer transaction
+			if type and not self.transaction_type:
+				self.transaction_type = type
+			return
+		
+		# render the timeline
+		if self.transaction_render:
+			self.Render()
+		
+		# mark project as modified (and save 1 undo / redo state)
+		if self.transaction_modified != None:
+			if not self.transaction_modified:
+				type = None
+			self.set_project_modified(is_modified=self.transaction_modified, refresh_xml=self.transaction_refresh_xml, type=type or self.transaction_type)
+			
+			
 	def State(self):
 		state = state_project.save_state(self)
 		return state
@@ -0,0 +1,265 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, threading, Queue
+import hashlib
+import gobject, gtk
+from classes import messagebox
+
+# the number of threads used to scan the folders
+SCAN_THREADS = 4
+
+# the number of bytes (from the start and end of a file) used by the partial hash
+HASH_BLOCK = 65536
+
+
+def get_fingerprint(file_path):
+	""" Get the size and partial hash of a file (which identify a media file, even if it's renamed
+	or moved).  Returns a tuple of (size, partial hash), or (None, None) if the file can't be read. """
+
+	try:
+		size = os.path.getsize(file_path)
+		return (size, get_partial_hash(file_path, size))
+	except (IOError, OSError):
+		return (None, None)
+
+
+def get_partial_hash(file_path, size):
+	""" Hash the size, the first block and the last block of a file (so large files are not read) """
+
+	md5 = hashlib.md5(str(size))
+	f = open(file_path, "rb")
+	try:
+		md5.update(f.read(HASH_BLOCK))
+		if size > HASH_BLOCK * 2:
+			f.seek(-HASH_BLOCK, os.SEEK_END)
+			md5.update(f.read(HASH_BLOCK))
+	finally:
+		f.close()
+	return md5.hexdigest()
+
+
+def get_common_suffix(path1, path2):
+	""" Count the trailing path components which are the same in 2 paths """
+
+	parts1 = path1.split(os.sep)
+	parts2 = path2.split(os.sep)
+	count = 0
+	while count < min(len(parts1), len(parts2)) and parts1[-1 - count] == parts2[-1 - count]:
+		count += 1
+	return count
+
+
+class media_index:
+	""" An index of the files under some folders (by name and by size).  The folders are scanned once
+	(with a few threads), and the partial hashes are only calculated for the files which could match. """
+
+	def __init__(self, folders):
+		self.folders = folders
+		self.names = {}
+		self.sizes = {}
+		self.file_sizes = {}
+		self.hashes = {}
+		self.lock = threading.Lock()
+		self.cancelled = False
+
+	def scan(self):
+		""" Walk the folders (1 thread per folder at a time), and index every file """
+
+		jobs = Queue.Queue()
+		for folder in self.folders:
+			jobs.put(folder)
+
+		def scan_worker():
+			while True:
+				folder = jobs.get()
+				if folder == None:
+					return
+				try:
+					if not self.cancelled:
+						self.scan_folder(folder, jobs)
+				finally:
+					jobs.task_done()
+
+		threads = []
+		for i in range(SCAN_THREADS):
+			t = threading.Thread(target=scan_worker)
+			t.setDaemon(True)
+			t.start()
+			threads.append(t)
+
+		# wait for all the folders (and sub-folders), and stop the threads
+		jobs.join()
+		for t in threads:
+			jobs.put(None)
+		for t in threads:
+			t.join()
+
+	def scan_folder(self, folder, jobs):
+		""" Index the files of a folder, and queue its sub-folders """
+
+		try:
+			names = os.listdir(folder)
+		except OSError:
+			return
+
+		found = []
+		for name in names:
+			path = os.path.join(folder, name)
+			try:
+				if os.path.isdir(path):
+					# don't follow links to folders (which could loop)
+					if not os.path.islink(path):
+						jobs.put(path)
+				else:
+					found.append((name, path, os.path.getsize(path)))
+			except OSError:
+				continue
+
+		self.lock.acquire()
+		try:
+			for name, path, size in found:
+				self.names.setdefault(name, []).append(path)
+				self.sizes.setdefault(size, []).append(path)
+				self.file_sizes[path] = size
+		finally:
+			self.lock.release()
+
+	def get_hash(self, path):
+		""" Get the partial hash of an indexed file (calculated once) """
+
+		if path not in self.hashes:
+			try:
+				self.hashes[path] = get_partial_hash(path, self.file_sizes[path])
+			except (IOError, OSError):
+				self.hashes[path] = None
+		return self.hashes[path]
+
+	def find(self, file_object):
+		""" Find the new path of a missing file, or None.  A file with the same name is preferred
+		(checking the size and partial hash, when the project knows them), and then a renamed
+		file with the same size and partial hash. """
+
+		old_path = file_object.name
+		size = file_object.file_size
+		partial_hash = file_object.partial_hash
+
+		candidates = self.names.get(os.path.basename(old_path), [])
+		if size != None:
+			candidates = [path for path in candidates if self.file_sizes[path] == size]
+		if len(candidates) > 1 and partial_hash:
+			candidates = [path for path in candidates if self.get_hash(path) == partial_hash]
+
+		# renamed files (only if the project knows the size and partial hash of the file)
+		if not candidates and size != None and partial_hash:
+			candidates = [path for path in self.sizes.get(size, []) if self.get_hash(path) == partial_hash]
+
+		if not candidates:
+			return None
+
+		# the file with the most similar path wins (i.e. the same sub-folders)
+		candidates.sort()
+		candidates.sort(key=lambda path: get_common_suffix(old_path, path), reverse=True)
+		return candidates[0]
+
+
+class relinker(threading.Thread):
+	""" This class searches some folders for the missing files of a project (in the background), and
+	calls the finished callback (on the GTK thread).  The matches are a list of (file object, new path,
+	size, partial hash) tuples. """
+
+	def __init__(self, project, file_objects, folders, finished_callback=None):
+		threading.Thread.__init__(self)
+		self.setDaemon(True)
+
+		self.project = project
+		self.file_objects = file_objects
+		self.finished_callback = finished_callback
+		self.index = media_index(folders)
+		self.matches = []
+
+	def cancel(self):
+		""" Stop searching (the files found so far are not relinked) """
+		self.index.cancelled = True
+
+	def run(self):
+		# index the folders once, and match all the missing files against the index
+		self.index.scan()
+		for file_object in self.file_objects:
+			if self.index.cancelled:
+				return
+			new_path = self.index.find(file_object)
+			if new_path:
+				# the fingerprint of the new file (from the index, so the file is only read once)
+				self.matches.append((file_object, new_path, self.index.file_sizes[new_path], self.index.get_hash(new_path)))
+
+		if self.finished_callback:
+			gobject.idle_add(self.finished_callback, self)
+
+
+def relink_missing_files(project, file_objects):
+	""" Ask for the folders to search, and relink the missing files in the background """
+	_ = project.translate
+
+	dialog = gtk.FileChooserDialog(_("Choose the folders which contain the missing files"), project.form.frmMain, gtk.FILE_CHOOSER_ACTION_SELECT_FOLDER, (gtk.STOCK_CANCEL, gtk.RESPONSE_CANCEL, gtk.STOCK_OPEN, gtk.RESPONSE_OK))
+	dialog.set_select_multiple(True)
+	if project.folder:
+		dialog.set_current_folder(os.path.dirname(project.folder))
+	response = dialog.run()
+	folders = dialog.get_filenames()
+	dialog.destroy()
+	if response != gtk.RESPONSE_OK or not folders:
+		return
+
+	search = relinker(project, file_objects, folders, relink_finished)
+	search.start()
+
+
+def relink_finished(search):
+	""" Change the paths of the files which were found, all at once (this runs on the GTK thread) """
+
+	project = search.project
+	_ = project.translate
+
+	# a project which is not open anymore is not changed
+	if project.form.project != project:
+		return False
+
+	relinked_files = set()
+	for file_object, new_path, size, partial_hash in search.matches:
+		file_object.name = new_path
+		(file_object.file_size, file_object.partial_hash) = (size, partial_hash)
+		relinked_files.add(file_object.unique_id)
+
+	# the cached XML of every sequence which uses a relinked file is out of date
+	for sequence in project.sequences:
+		for track in sequence.tracks:
+			if [clip for clip in track.clips if clip.file_object.unique_id in relinked_files]:
+				sequence.set_modified()
+				break
+
+	if search.matches:
+		# mark project as modified (only 1 undo / redo history entry)
+		project.set_project_modified(is_modified=True, refresh_xml=True, type=_("Relinked files"))
+		project.form.refresh_files()
+
+		# re-create the thumbnails of the relinked files (in the background)
+		project.form.validate_project(report_missing=False)
+
+	messagebox.show("OpenShot", _("%(found)d of %(total)d missing file(s) were found.") % {"found" : len(search.matches), "total" : len(search.file_objects)})
+	return False
@@ -0,0 +1,230 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, time, platform
+import json
+
+try:
+	import multiprocessing
+	cpu_count = multiprocessing.cpu_count()
+except:
+	cpu_count = 1
+
+
+class render_stats():
+	"""This class samples the progress of an MLT render (frames per second, ETA,
+	encoder queue depth, CPU use and output bitrate).  The samples can be shown
+	in the Export dialog, printed as JSON lines, and a summary of the render is
+	saved next to the exported file."""
+
+	def __init__(self, export_path, fps, total_frames, render_options=None, window=5.0):
+		"""Constructor"""
+
+		self.export_path = export_path
+		self.fps = float(fps)
+		self.total_frames = max(int(total_frames), 1)
+		self.render_options = render_options or {}
+
+		# number of seconds used to calculate the rolling frame rate
+		self.window = window
+
+		self.samples = []
+		self.last_sample = None
+		self.start_time = None
+		self.end_time = None
+		self.start_cpu = None
+		self.peak_fps = 0.0
+		self.max_queue_depth = 0
+
+	def start(self):
+		""" Start the clock for this render """
+
+		self.samples = []
+		self.last_sample = None
+		self.start_time = time.time()
+		self.end_time = None
+		self.start_cpu = self.cpu_time()
+		self.peak_fps = 0.0
+		self.max_queue_depth = 0
+
+	def cpu_time(self):
+		""" Get the CPU seconds (user + system) used by this process """
+		t = os.times()
+		return t[0] + t[1]
+
+	def output_size(self):
+		""" Get the size (in bytes) of the exported file, or None (i.e. image sequences) """
+		try:
+			return os.path.getsize(self.export_path)
+		except OSError:
+			return None
+
+	def queue_depth(self, position, consumer):
+		""" Get the number of frames the producer is ahead of the encoder.  Older
+		versions of MLT don't have a consumer position, so None is returned. """
+		if consumer == None:
+			return None
+		try:
+			return max(int(position) - int(consumer.position()), 0)
+		except:
+			return None
+
+	def sample(self, position, consumer=None):
+		""" Take a new sample of the render, and return a dictionary of the current statistics """
+
+		if self.start_time == None:
+			self.start()
+
+		now = time.time()
+		position = int(position)
+		cpu = self.cpu_time()
+		size = self.output_size()
+
+		# add sample, and remove the samples that are older than the rolling window
+		self.samples.append((now, position, cpu, size))
+		while len(self.samples) > 2 and now - self.samples[0][0] > self.window:
+			self.samples.pop(0)
+
+		first_time, first_position, first_cpu, first_size = self.samples[0]
+		elapsed_window = now - first_time
+
+		# frames per second (rolling)
+		render_fps = 0.0
+		if elapsed_window > 0.0:
+			render_fps = max(position - first_position, 0) / elapsed_window
+		self.peak_fps = max(self.peak_fps, render_fps)
+
+		# estimated time remaining
+		eta = None
+		if render_fps > 0.0:
+			eta = round(max(self.total_frames - position, 0) / render_fps, 1)
+
+		# CPU use (percent of a single core, like 'top')
+		cpu_percent = 0.0
+		if elapsed_window > 0.0:
+			cpu_percent = (cpu - first_cpu) / elapsed_window * 100.0
+
+		# output bitrate (bits per second of rendered video)
+		bitrate = None
+		if size != None and position > 0:
+			bitrate = int(size * 8.0 / (position / self.fps))
+
+		# encoder queue depth
+		depth = self.queue_depth(position, consumer)
+		if depth != None:
+			self.max_queue_depth = max(self.max_queue_depth, depth)
+
+		self.last_sample = {"position" : position,
+							"total_frames" : self.total_frames,
+							"fraction" : min(float(position) / float(self.total_frames), 1.0),
+							"elapsed" : round(now - self.start_time, 3),
+							"fps" : round(render_fps, 2),
+							"eta" : eta,
+							"queue_depth" : depth,
+							"cpu_percent" : round(cpu_percent, 1),
+							"output_bytes" : size,
+							"bitrate" : bitrate}
+
+		return self.last_sample
+
+	def finish(self):
+		""" Stop the clock, and return the summary of this render """
+
+		self.end_time = time.time()
+		return self.summary()
+
+	def summary(self):
+		""" Get a dictionary describing the whole render (and the machine it ran on) """
+
+		end_time = self.end_time or time.time()
+		elapsed = end_time - (self.start_time or end_time)
+		cpu = self.cpu_time() - (self.start_cpu or 0.0)
+		size = self.output_size()
+
+		average_fps = 0.0
+		if elapsed > 0.0:
+			average_fps = self.total_frames / elapsed
+
+		bitrate = None
+		if size != None:
+			bitrate = int(size * 8.0 / (self.total_frames / self.fps))
+
+		return {"export_path" : self.export_path,
+				"started" : time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.start_time or end_time)),
+				"elapsed" : round(elapsed, 3),
+				"total_frames" : self.total_frames,
+				"project_fps" : self.fps,
+				"average_fps" : round(average_fps, 2),
+				"peak_fps" : round(self.peak_fps, 2),
+				"realtime_factor" : round(average_fps / self.fps, 3),
+				"cpu_seconds" : round(cpu, 3),
+				"max_queue_depth" : self.max_queue_depth,
+				"output_bytes" : size,
+				"bitrate" : bitrate,
+				"render_options" : dict((str(k), str(v)) for k, v in self.render_options.items()),
+				"machine" : {"node" : platform.node(),
+							 "platform" : platform.platform(),
+							 "processor" : platform.processor() or platform.machine(),
+							 "cpu_count" : cpu_count}}
+
+	def save(self, file_path=None):
+		""" Save the render summary as JSON next to the exported file (i.e. video.mp4.render.json) """
+
+		if not file_path:
+			file_path = "%s.render.json" % self.export_path.replace("%d", "")
+
+		try:
+			f = open(file_path, "w")
+			json.dump(self.summary(), f, indent=4, sort_keys=True)
+			f.close()
+		except IOError:
+			print "Failed to save render statistics to %s" % file_path
+			return None
+
+		return file_path
+
+	def to_json(self, data=None):
+		""" Get a single line of JSON for the last sample (or any other dictionary) """
+
+		if data == None:
+			data = self.last_sample or {}
+		return json.dumps(data, sort_keys=True)
+
+	def format_status(self, data=None):
+		""" Get a short, human readable description of the last sample """
+
+		if data == None:
+			data = self.last_sample
+		return format_status(data)
+
+
+def format_status(data):
+	""" Get a short, human readable description of a render sample (used by the Export dialog) """
+
+	if not data:
+		return ""
+
+	status = _("%.1f fps") % data["fps"]
+	if data["eta"] != None:
+		minutes, seconds = divmod(int(data["eta"]), 60)
+		hours, minutes = divmod(minutes, 60)
+		status += ", " + _("%d:%02d:%02d remaining") % (hours, minutes, seconds)
+	if data["bitrate"] != None:
+		status += ", %.0f kb/s" % (data["bitrate"] / 1000.0)
+	status += ", " + _("CPU %d%%") % data["cpu_percent"]
+	return status
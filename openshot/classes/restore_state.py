@@ -25,10 +25,10 @@ def restore_project_state(project_object, state):
 
 	# open the serialized file
 	old_form = project_object.form
-	old_play_head = project_object.sequences[0].play_head
-	old_ruler_time = project_object.sequences[0].ruler_time
+	old_play_head = project_object.current_sequence.play_head
+	old_ruler_time = project_object.current_sequence.ruler_time
 	old_thumbnailer = project_object.thumbnailer
-	old_play_head_line = project_object.sequences[0].play_head_line
+	old_play_head_line = project_object.current_sequence.play_head_line
 	old_theme = project_object.theme
 
 	# update the form reference on the new project file
@@ -37,11 +37,11 @@ def restore_project_state(project_object, state):
 
 	# re-attach some variables (that aren't pickleable)
 	project_object.form = old_form
-	project_object.sequences[0].play_head = old_play_head
-	project_object.sequences[0].ruler_time = old_ruler_time
-	project_object.sequences[0].play_head_line = old_play_head_line
+	project_object.current_sequence.play_head = old_play_head
+	project_object.current_sequence.ruler_time = old_ruler_time
+	project_object.current_sequence.play_head_line = old_play_head_line
 	project_object.thumbnailer = old_thumbnailer
-	#project_object.sequences[0].play_head_position = 0.0
+	#project_object.current_sequence.play_head_position = 0.0
 	project_object.theme = old_theme
 	project_object.mlt_profile = None
 	
@@ -73,7 +73,7 @@ def restore_project_state(project_object, state):
 			
 	for item in items:
 		if isinstance(item, files.OpenShotFile):
-			if not os.path.exists(item.name) and "%" not in item.name:
+			if not os.path.exists(item.name) and "%" not in item.name and item.file_type != "sequence":
 				missing_files += item.name + "\n"
 	
 	if missing_files:
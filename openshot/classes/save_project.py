@@ -17,11 +17,27 @@
 #	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
 
 import sys, os
-import shutil
+import shutil, threading, Queue
 import gtk
 import cPickle as pickle
 from classes import files
 
+# fcntl is only available on unix (and is needed for reflinks)
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
+# the manifest of a synced folder (the size and modified time of each file, when it was copied)
+MANIFEST_NAME = ".openshot_sync"
+
+# the number of threads used to copy files, and the number of bytes which are worth copying in parallel
+COPY_THREADS = 4
+PARALLEL_COPY_BYTES = 16 * 1024 * 1024
+
+# the ioctl which clones a file on linux (i.e. cp --reflink)
+FICLONE = 0x40049409
+
 def save_project(project_object, file_path):
 	project = project_object
 
@@ -33,7 +49,7 @@ def save_project(project_object, file_path):
 	# copy all temp thumbnails to this project's folder (if it's different)
 	if project.USER_DIR != project_object.folder:
 		# different path, so copy thumbnails, adjust paths
-		copy_files(os.path.join(project.USER_DIR, "thumbnail"), os.path.join(project_object.folder, "thumbnail"))
+		(synced_files, synced_bytes) = copy_files(os.path.join(project.USER_DIR, "thumbnail"), os.path.join(project_object.folder, "thumbnail"))
 
 		# Loop through the files, and update file path for images and image sequences
 		for item in project_object.project_folder.items:
@@ -59,7 +75,9 @@ def save_project(project_object, file_path):
 						os.mkdir(os.path.join(project_object.folder, blenderFolderName))
 
 					# Copy files to new project folder
-					copy_files(dirName, os.path.join(project_object.folder, blenderFolderName))
+					(files_copied, bytes_copied) = copy_files(dirName, os.path.join(project_object.folder, blenderFolderName))
+					synced_files += files_copied
+					synced_bytes += bytes_copied
 
 					# Update Path to Image Sequence
 					item.name = os.path.join(project_object.folder, blenderFolderName, fname)
@@ -68,20 +86,22 @@ def save_project(project_object, file_path):
 					# UPDATE TITLES... so they move with the project
 					item.name = os.path.join(project_object.folder, "thumbnail", fname)
 
+		print "synced %d file(s) (%d bytes) to the project folder" % (synced_files, synced_bytes)
+
 
 
 	# clear the following temporary properties which can't be pickeled
 	old_form = project_object.form
-	old_play_head = project_object.sequences[0].play_head
-	old_ruler_time = project_object.sequences[0].ruler_time
-	old_play_head_line = project_object.sequences[0].play_head_line
+	old_play_head = project_object.current_sequence.play_head
+	old_ruler_time = project_object.current_sequence.ruler_time
+	old_play_head_line = project_object.current_sequence.play_head_line
 	old_thumbnailer = project_object.thumbnailer
 	old_theme_settings = project_object.theme_settings
 	project_object.mlt_profile = None
 
-	project_object.sequences[0].play_head = None
-	project_object.sequences[0].ruler_time = None
-	project_object.sequences[0].play_head_line = None
+	project_object.current_sequence.play_head = None
+	project_object.current_sequence.ruler_time = None
+	project_object.current_sequence.play_head_line = None
 	project_object.form = None
 	project_object.theme_settings = None
 	project_object.thumbnailer = None
@@ -89,14 +109,17 @@ def save_project(project_object, file_path):
 	
 	# serialize the project object
 	#Force Ascii file type (an old config file could still have binary type set)
-	myFile = file(file_path, "wb")
+	#(write a temp file, and rename it, so a crash never leaves a partial project file)
+	myFile = file(file_path + ".tmp", "wb")
 	pickle.dump(project_object, myFile, False)
+	myFile.close()
+	os.rename(file_path + ".tmp", file_path)
 
 	# re-attach some variables (that aren't pickleable)
 	project_object.form = old_form
-	project_object.sequences[0].play_head = old_play_head
-	project_object.sequences[0].ruler_time = old_ruler_time
-	project_object.sequences[0].play_head_line = old_play_head_line
+	project_object.current_sequence.play_head = old_play_head
+	project_object.current_sequence.ruler_time = old_ruler_time
+	project_object.current_sequence.play_head_line = old_play_head_line
 	project_object.theme_settings = old_theme_settings
 	project_object.thumbnailer = old_thumbnailer
 
@@ -124,34 +147,137 @@ def save_project(project_object, file_path):
 
 
 
-def copy_files(path, target_folder):
+def copy_files(path, target_folder, hard_link=True):
+	""" Sync the files of a folder (and its sub-folders) to a target folder.  Only new or changed
+	files are copied (compared with the manifest of the last sync), using a reflink or a hard link
+	(if hard_link is True) when possible, and copying large batches with a few threads.  Returns a
+	tuple of (number of files, number of bytes) copied. """
 
 	# verify this folder exists
-	if os.path.exists(path):
-
-		# loop through all files in this folder
-		for child_path in os.listdir(path):
-
-			# get full child path
-			source_path = os.path.join(path, child_path)
-			target_path = os.path.join(target_folder, child_path)
-
-			if os.path.isdir(source_path) == True:
-
-				if os.path.exists(target_path) == False:
-					# create the folder in the target folder
-					os.mkdir(target_path)
-
-				# copy all the files in this sub-folder
-				copy_files(source_path, target_path)
-
-			else:
-
-				# copy the thumbnail to the new location (if it doesn't exit)
-				if os.path.exists(target_path) == False:
-					shutil.copyfile(source_path, target_path)
-
-			#except IOError:
-			#	# print error message
-			#	print "*** error saving file ***"
-
+	if not os.path.exists(path):
+		return (0, 0)
+
+	# load the manifest of the last sync (relative path -> (size, modified time))
+	manifest_path = os.path.join(target_folder, MANIFEST_NAME)
+	manifest = {}
+	if os.path.exists(manifest_path):
+		try:
+			f = open(manifest_path, "rb")
+			manifest = pickle.load(f)
+			f.close()
+		except Exception:
+			manifest = {}
+
+	# find the new or changed files
+	jobs = []
+	new_manifest = {}
+	for dir_path, dir_names, file_names in os.walk(path):
+		relative_dir = os.path.relpath(dir_path, path)
+		target_dir = os.path.normpath(os.path.join(target_folder, relative_dir))
+		if not os.path.exists(target_dir):
+			# create the folder in the target folder
+			os.makedirs(target_dir)
+		existing_files = set(os.listdir(target_dir))
+
+		for file_name in file_names:
+			if file_name == MANIFEST_NAME:
+				continue
+			source_path = os.path.join(dir_path, file_name)
+			relative_path = os.path.normpath(os.path.join(relative_dir, file_name))
+			try:
+				stat = os.stat(source_path)
+			except OSError:
+				continue
+			signature = (stat.st_size, stat.st_mtime)
+			new_manifest[relative_path] = signature
+
+			# skip the files which are already in the target folder (and haven't changed)
+			if file_name in existing_files and manifest.get(relative_path, signature) == signature:
+				continue
+			jobs.append((source_path, os.path.join(target_dir, file_name), stat.st_size))
+
+	# copy the files (with a few threads, if there is a lot to copy)
+	total_bytes = sum([job[2] for job in jobs])
+	if len(jobs) > 1 and total_bytes >= PARALLEL_COPY_BYTES:
+		queue = Queue.Queue()
+		for job in jobs:
+			queue.put(job)
+
+		def copy_worker():
+			while True:
+				try:
+					(source_path, target_path, size) = queue.get_nowait()
+				except Queue.Empty:
+					return
+				sync_file(source_path, target_path, hard_link)
+
+		threads = []
+		for i in range(min(COPY_THREADS, len(jobs))):
+			t = threading.Thread(target=copy_worker)
+			t.start()
+			threads.append(t)
+		for t in threads:
+			t.join()
+	else:
+		for (source_path, target_path, size) in jobs:
+			sync_file(source_path, target_path, hard_link)
+
+	# save the manifest (and rename it, so a partial file is never read)
+	if jobs or new_manifest != manifest:
+		try:
+			f = open(manifest_path + ".tmp", "wb")
+			pickle.dump(new_manifest, f, pickle.HIGHEST_PROTOCOL)
+			f.close()
+			os.rename(manifest_path + ".tmp", manifest_path)
+		except (IOError, OSError), ex:
+			print "Failed to save the sync manifest of %s: %s" % (target_folder, ex)
+
+	return (len(jobs), total_bytes)
+
+
+def sync_file(source_path, target_path, hard_link=True):
+	""" Copy a file, using a reflink (a copy-on-write clone) or a hard link (if hard_link is True) if
+	the target folder is on the same file system, and a normal copy if not """
+
+	try:
+		if os.path.exists(target_path):
+			os.remove(target_path)
+
+		# try a reflink (btrfs, xfs, etc...)
+		if fcntl and reflink_file(source_path, target_path):
+			return
+
+		# try a hard link (if on the same file system)
+		if hard_link and hasattr(os, "link") and os.stat(source_path).st_dev == os.stat(os.path.dirname(target_path)).st_dev:
+			try:
+				os.link(source_path, target_path)
+				return
+			except OSError:
+				pass
+
+		shutil.copyfile(source_path, target_path)
+
+	except (IOError, OSError), ex:
+		# print error message
+		print "*** error saving file %s: %s ***" % (target_path, ex)
+
+
+def reflink_file(source_path, target_path):
+	""" Clone a file (only supported by some file systems).  Returns True if the file was cloned. """
+
+	source = open(source_path, "rb")
+	try:
+		target = open(target_path, "wb")
+		try:
+			fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+			return True
+		except (IOError, OSError):
+			pass
+		finally:
+			target.close()
+	finally:
+		source.close()
+
+	# not supported, remove the empty file
+	os.remove(target_path)
+	return False
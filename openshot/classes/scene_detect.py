@@ -0,0 +1,148 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, uuid, tempfile
+
+try:
+	import mlt
+except ImportError:
+	print "*** ERROR: MLT Python bindings failed to import ***"
+
+# NumPy is needed to detect scene cuts (without it, no cuts are detected)
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# the size of the (grayscale) frames which are compared
+FRAME_WIDTH = 32
+FRAME_HEIGHT = 18
+
+# the number of frames compared at once
+BATCH_SIZE = 1024
+
+# a cut is a frame which is very different from the frame before it (the average difference
+# of a pixel, between 0 and 255), and much more different than the frames before it.
+MIN_DIFFERENCE = 30.0
+DIFFERENCE_RATIO = 3.0
+WINDOW_SIZE = 15
+
+# the shortest scene (in seconds)
+MIN_SCENE_LENGTH = 1.0
+
+
+def is_available():
+	""" Can scene cuts be detected? """
+	return numpy != None
+
+
+def detect_scenes(file_path):
+	""" Decode small grayscale frames of a video file once (through MLT), and find the scene cuts
+	by comparing each frame with the frame before it.  Returns a list of the cut times (in seconds). """
+
+	if not numpy:
+		return []
+
+	# decode the frames to a temporary raw video file (1 byte per pixel)
+	raw_path = os.path.join(tempfile.gettempdir(), "openshot-scenes-%s.raw" % uuid.uuid1())
+	profile = mlt.Profile("quarter_ntsc")
+	producer = mlt.Producer(profile, '%s' % file_path)
+	if producer.is_valid() == False:
+		return []
+	fps = float(producer.get_fps())
+
+	consumer = mlt.Consumer(profile, "avformat", raw_path)
+	consumer.set("real_time", 0)
+	consumer.set("an", 1)
+	consumer.set("audio_off", 1)
+	consumer.set("f", "rawvideo")
+	consumer.set("vcodec", "rawvideo")
+	consumer.set("pix_fmt", "gray")
+	consumer.set("s", "%dx%d" % (FRAME_WIDTH, FRAME_HEIGHT))
+	consumer.set("rescale", "nearest")
+	consumer.connect(producer)
+	consumer.run()
+	consumer = None
+	producer = None
+
+	if not os.path.exists(raw_path):
+		return []
+
+	try:
+		differences = get_differences(raw_path)
+	finally:
+		os.remove(raw_path)
+
+	return find_cuts(differences, fps)
+
+
+def get_differences(raw_path):
+	""" Get the average difference of each pixel between each frame and the frame before it
+	(the frames are read and compared in batches). """
+
+	frame_size = FRAME_WIDTH * FRAME_HEIGHT
+	differences = []
+	previous_frame = None
+
+	f = open(raw_path, "rb")
+	try:
+		while True:
+			frames = numpy.fromfile(f, dtype=numpy.uint8, count=BATCH_SIZE * frame_size)
+			frames = frames[:len(frames) - len(frames) % frame_size].reshape(-1, frame_size).astype(numpy.int16)
+			if len(frames) == 0:
+				break
+
+			# compare the first frame of this batch with the last frame of the batch before it
+			if previous_frame is not None:
+				frames = numpy.vstack((previous_frame, frames))
+			previous_frame = frames[-1:]
+
+			differences.append(numpy.abs(numpy.diff(frames, axis=0)).mean(axis=1))
+	finally:
+		f.close()
+
+	if not differences:
+		return numpy.zeros(0)
+	return numpy.concatenate(differences)
+
+
+def find_cuts(differences, fps):
+	""" Find the frames which are much more different than the frames before them.  Returns a
+	list of the cut times (in seconds). """
+
+	if len(differences) == 0:
+		return []
+
+	# the average difference of the frames before each frame
+	window = numpy.ones(WINDOW_SIZE) / WINDOW_SIZE
+	average = numpy.convolve(differences, window, mode="full")[:len(differences)]
+	previous_average = numpy.concatenate(([0.0], average[:-1]))
+
+	candidates = numpy.nonzero((differences > MIN_DIFFERENCE) & (differences > previous_average * DIFFERENCE_RATIO))[0]
+
+	# ignore cuts which are too close together (i.e. flashes, fast motion)
+	cuts = []
+	last_cut = 0.0
+	for index in candidates:
+		# the difference at index is between frame index and index + 1
+		cut_time = round((index + 1) / fps, 3)
+		if cut_time - last_cut >= MIN_SCENE_LENGTH:
+			cuts.append(cut_time)
+			last_cut = cut_time
+
+	return cuts
@@ -16,7 +16,7 @@
 #	You should have received a copy of the GNU General Public License
 #	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
 
-import os, sys
+import os, sys, uuid
 import gtk, goocanvas
 import xml.dom.minidom as xml
 
@@ -59,6 +59,10 @@ class sequence:
 		self.play_head_line = None
 		self.enable_animated_playhead = True
 
+		# each sequence has it's own MLT XML file (which is only generated again after it is modified)
+		self.unique_id = str(uuid.uuid1())
+		self.xml_token = str(uuid.uuid1())
+
 
 	def AddMarker(self, marker_name, position_on_track):
 
@@ -151,6 +155,17 @@ class sequence:
 
 
 	def Render(self):
+		"""Render the timeline.  If the layout of the timeline (zoom, theme, length, tracks and markers)
+		has not changed since the last render, only the clips and transitions which have changed are
+		re-rendered, instead of clearing the canvases and re-building every item."""
+
+		# has only the clips and transitions changed?
+		layout = self.get_render_layout()
+		root_right = self.project.form.MyCanvas.get_root_item()
+		rendered_items = root_right.get_data("rendered_items")
+		if rendered_items != None and root_right.get_data("rendered_layout") == layout:
+			self.RenderChanges(root_right, rendered_items)
+			return
 
 		# Clear the canvases
 		self.project.form.MyCanvas_Left.set_root_item(goocanvas.Group())
@@ -180,6 +195,67 @@ class sequence:
 				# Render track			
 				MyTran.Render()
 
+		# remember what was rendered (so the next render can skip the items that have not changed)
+		root_right = self.project.form.MyCanvas.get_root_item()
+		root_right.set_data("rendered_layout", layout)
+		root_right.set_data("rendered_items", self.get_render_signatures())
+
+
+	def RenderChanges(self, root_right, rendered_items):
+		"""Re-render the canvas groups of the clips and transitions which have changed (or have been
+		added or removed) since the last render."""
+
+		# find the canvas group of each clip and transition
+		groups = {}
+		for index in range(0, root_right.get_n_children()):
+			child = root_right.get_child(index)
+			groups[child.get_data ("id")] = child
+
+		current_items = self.get_render_signatures()
+
+		# remove the canvas groups of changed and deleted items
+		for unique_id, signature in rendered_items.items():
+			if current_items.get(unique_id) != signature and unique_id in groups:
+				group = groups.pop(unique_id)
+				root_right.remove_child(root_right.find_child(group))
+
+		# render the changed and new items (clips first, so transitions stay on top)
+		for MyTrack in self.tracks:
+			for MyClip in MyTrack.clips:
+				if MyClip.unique_id not in groups:
+					MyClip.Render()
+		for MyTrack in self.tracks:
+			for MyTran in MyTrack.transitions:
+				if MyTran.unique_id not in groups:
+					MyTran.Render()
+
+		root_right.set_data("rendered_items", current_items)
+
+		# raise all transitions
+		self.raise_transitions()
+
+
+	def get_render_layout(self):
+		"""Get a tuple describing everything (except clips and transitions) that is drawn on the timeline.  If
+		any of these change, the whole timeline needs to be rendered again."""
+
+		# (the visible and audio buttons of a track are updated in place, so they are not included)
+		tracks = [(id(MyTrack), MyTrack.name) for MyTrack in self.tracks]
+		markers = [(id(MyMarker), MyMarker.position_on_track) for MyMarker in self.markers]
+		return (self.get_pixels_per_second(), self.length, self.project.theme, tuple(tracks), tuple(markers))
+
+
+	def get_render_signatures(self):
+		"""Get a dictionary of the render signature of each clip and transition (by unique id)"""
+
+		signatures = {}
+		for MyTrack in self.tracks:
+			for MyClip in MyTrack.clips:
+				signatures[MyClip.unique_id] = MyClip.get_render_signature()
+			for MyTran in MyTrack.transitions:
+				signatures[MyTran.unique_id] = MyTran.get_render_signature()
+		return signatures
+
 
 
 	def GenerateXML(self, dom, xmlParentNode):
@@ -232,6 +308,11 @@ class sequence:
 			MyTrack.GenerateXML(dom, multitrack, fps=fps)
 
 
+	def set_modified(self):
+		""" Mark the MLT XML of this sequence as out of date """
+		self.xml_token = str(uuid.uuid1())
+
+
 	def Calculate_Length(self):
 		""" Determine the length of this sequence """
 		longest_clip = 0.1
@@ -544,6 +625,12 @@ class sequence:
 		x = x + theme_settings["timeline"]["ruler"]["playhead"]["x"]
 		y_top = theme_settings["timeline"]["ruler"]["playhead"]["y"]
 
+		# remove the old play head (if the canvas was not cleared)
+		for old_item in [self.play_head, self.play_head_line]:
+			if old_item and old_item.get_parent():
+				old_parent = old_item.get_parent()
+				old_parent.remove_child(old_parent.find_child(old_item))
+
 		# get a reference to the 2 main canvas objects & theme
 		theme = self.project.theme
 		canvas_right = self.project.form.TimelineCanvas_Right
@@ -606,8 +693,6 @@ class sequence:
 				                  x = x + (imgTrack_PlayHead_Width / 2) * -1,
 				                  y = imgTrack_Ruler_Height - imgTrack_PlayHead_Height + y_top - 2)
 
-		GroupTrack3 = goocanvas.Group (parent = track_root_right)
-		
 		# Connect signals to play head to allow drag and drop
 		GroupTrack.connect ("motion_notify_event", self.on_motion_notify_x)
 		GroupTrack.connect ("button_press_event", self.on_button_press_x)
@@ -903,6 +988,10 @@ class sequence:
 		# Check for missing DEBUG attribute (which means it's an old project format)
 		if 'enable_animated_playhead' not in state:
 			state['enable_animated_playhead'] = False
+		if 'unique_id' not in state:
+			state['unique_id'] = str(uuid.uuid1())
+		if 'xml_token' not in state:
+			state['xml_token'] = str(uuid.uuid1())
 
 		# update the state object with new schema changes
 		self.__dict__.update(state)
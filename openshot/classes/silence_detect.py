@@ -0,0 +1,113 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, uuid, tempfile, math
+import wave, audioop
+from classes import waveform
+
+# NumPy is optional (without it, the RMS of each block is calculated with audioop)
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# the length (in seconds) of each block of samples
+BLOCK_LENGTH = 0.02
+
+# a block is silent if it's quieter than this (in dB, relative to the loudest possible sample)
+SILENCE_THRESHOLD = -40.0
+
+# the shortest silence which is removed (in seconds)
+MIN_SILENCE_LENGTH = 0.5
+
+# the time (in seconds) kept before and after each silence (so words are not cut off)
+SILENCE_PADDING = 0.15
+
+
+def detect_silences(file_path):
+	""" Decode the audio of a media file once (through MLT), and find the silent parts.
+	Returns a list of (start time, end time) tuples (in seconds). """
+
+	wav_path = os.path.join(tempfile.gettempdir(), "openshot-silence-%s.wav" % uuid.uuid1())
+	if not waveform.decode_audio(file_path, wav_path):
+		return []
+
+	try:
+		levels = get_levels(wav_path)
+	finally:
+		os.remove(wav_path)
+
+	return find_silences(levels)
+
+
+def get_levels(wav_path):
+	""" Get the RMS level (in dB) of each block of a WAV file """
+
+	levels = []
+	wav = wave.open(wav_path, "rb")
+	try:
+		sample_width = wav.getsampwidth()
+		block_size = int(wav.getframerate() * BLOCK_LENGTH)
+		max_level = float(2 ** (8 * sample_width - 1))
+
+		while True:
+			# read about 10 seconds at a time
+			data = wav.readframes(block_size * 500)
+			if not data:
+				break
+
+			if numpy and sample_width == 2:
+				samples = numpy.frombuffer(data[:len(data) - len(data) % (block_size * 2)], dtype="<i2")
+				blocks = samples.astype(numpy.float64).reshape(-1, block_size)
+				rms = numpy.sqrt((blocks ** 2).mean(axis=1))
+				levels.extend((20.0 * numpy.log10(numpy.maximum(rms, 1.0) / max_level)).tolist())
+			else:
+				for index in range(0, len(data) - block_size * sample_width + 1, block_size * sample_width):
+					rms = audioop.rms(data[index:index + block_size * sample_width], sample_width)
+					levels.append(20.0 * math.log10(max(rms, 1) / max_level))
+	finally:
+		wav.close()
+
+	return levels
+
+
+def find_silences(levels):
+	""" Find the runs of silent blocks which are long enough to remove.  Returns a list of
+	(start time, end time) tuples (in seconds), without the padding. """
+
+	silences = []
+	silence_start = None
+	for index, level in enumerate(levels + [0.0]):
+		if level < SILENCE_THRESHOLD:
+			if silence_start == None:
+				silence_start = index
+		elif silence_start != None:
+			start_time = silence_start * BLOCK_LENGTH
+			end_time = index * BLOCK_LENGTH
+
+			# keep the padding (but not at the start or end of the file)
+			if silence_start > 0:
+				start_time += SILENCE_PADDING
+			if index < len(levels):
+				end_time -= SILENCE_PADDING
+
+			if end_time - start_time >= MIN_SILENCE_LENGTH:
+				silences.append((round(start_time, 3), round(end_time, 3)))
+			silence_start = None
+
+	return silences
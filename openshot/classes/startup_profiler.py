@@ -0,0 +1,80 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, sys, time
+
+# the file which tracks the time-to-first-window of each profiled start (1 line per start)
+BENCHMARK_FILE = os.path.join(os.path.expanduser("~"), ".openshot", "startup_benchmark.log")
+
+
+class startup_profiler:
+	""" This class measures how long each phase of the startup takes (when OpenShot is
+	started with --profile-startup), and reports it once the deferred work is done. """
+
+	def __init__(self):
+		self.enabled = "--profile-startup" in sys.argv
+		self.start_time = time.time()
+		self.last_time = self.start_time
+		self.phases = []
+		self.first_window_time = None
+		self.reported = False
+
+	def mark(self, name):
+		""" Record the time since the last mark, as the time of a phase """
+		if not self.enabled:
+			return
+		now = time.time()
+		self.phases.append((name, now - self.last_time))
+		self.last_time = now
+
+	def first_window(self):
+		""" Record the time when the main window is first drawn """
+		if not self.enabled or self.first_window_time != None:
+			return
+		self.mark("show window")
+		self.first_window_time = time.time() - self.start_time
+
+	def report(self):
+		""" Print the time of each phase, and add the time-to-first-window to the benchmark file """
+		if not self.enabled or self.reported:
+			return
+		self.reported = True
+
+		print "\n--------------------------------"
+		print "   Startup profile"
+		print "--------------------------------"
+		for name, seconds in self.phases:
+			print "%-32s %8.1f ms" % (name, seconds * 1000.0)
+		print "%-32s %8.1f ms" % ("total", (self.last_time - self.start_time) * 1000.0)
+		if self.first_window_time != None:
+			print "%-32s %8.1f ms" % ("time to first window", self.first_window_time * 1000.0)
+
+			# track the time-to-first-window (so startup regressions can be spotted)
+			try:
+				if not os.path.exists(os.path.dirname(BENCHMARK_FILE)):
+					os.makedirs(os.path.dirname(BENCHMARK_FILE))
+				f = open(BENCHMARK_FILE, "a")
+				f.write("%s\t%.1f\t%s\n" % (time.strftime("%Y-%m-%d %H:%M:%S"), self.first_window_time * 1000.0,
+											", ".join(["%s=%.1f" % (name, seconds * 1000.0) for name, seconds in self.phases])))
+				f.close()
+			except (IOError, OSError), ex:
+				print "Failed to write the startup benchmark: %s" % ex
+
+
+# the profiler of this process (started when this module is first imported)
+profiler = startup_profiler()
@@ -30,15 +30,15 @@ def save_state(project_object):
 
 		# clear the following temporary properties which can't be pickeled
 		old_form = project_object.form
-		old_play_head = project_object.sequences[0].play_head
-		old_ruler_time = project_object.sequences[0].ruler_time
-		old_play_head_line = project_object.sequences[0].play_head_line
+		old_play_head = project_object.current_sequence.play_head
+		old_ruler_time = project_object.current_sequence.ruler_time
+		old_play_head_line = project_object.current_sequence.play_head_line
 		old_thumbnailer = project_object.thumbnailer
 		project_object.mlt_profile = None
 		
-		project_object.sequences[0].play_head = None
-		project_object.sequences[0].ruler_time = None
-		project_object.sequences[0].play_head_line = None
+		project_object.current_sequence.play_head = None
+		project_object.current_sequence.ruler_time = None
+		project_object.current_sequence.play_head_line = None
 		project_object.form = None
 		project_object.thumbnailer = None
 				
@@ -47,9 +47,9 @@ def save_state(project_object):
 		
 		# re-attach some variables (that aren't pickleable)
 		project_object.form = old_form
-		project_object.sequences[0].play_head = old_play_head
-		project_object.sequences[0].ruler_time = old_ruler_time
-		project_object.sequences[0].play_head_line = old_play_head_line
+		project_object.current_sequence.play_head = old_play_head
+		project_object.current_sequence.ruler_time = old_ruler_time
+		project_object.current_sequence.play_head_line = old_play_head_line
 		project_object.thumbnailer = old_thumbnailer
 		
 		# update the thumbnailer's project reference
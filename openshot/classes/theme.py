@@ -20,9 +20,86 @@ import os, sys
 from xml.dom import minidom
 import messagebox
 
+# init the foreign language
+from language import Language_Init
+
+
+# the types of the theme settings
+def text_value(element):
+	return element.firstChild.toxml()
+
+def int_value(element):
+	return int(element.firstChild.toxml())
+
+def float_value(element):
+	return float(element.firstChild.toxml())
+
+def color_value(element):
+	return int(element.firstChild.toxml(), 16)
+
+
+# the structure (and the types) of the theme.xml settings.  Each element is only looked
+# up once, in the element above it.
+THEME_SCHEMA = {
+	"timeline" : {
+		"playhead_text" : { "font" : text_value, "x" : int_value, "y" : int_value },
+		"ruler" : {
+			"height" : int_value,
+			"x" : int_value,
+			"y" : int_value,
+			"playhead" : { "x" : int_value, "y" : int_value },
+			"playhead_line" : { "stroke_color" : color_value, "line_width" : float_value, "y" : int_value, "length_offset" : int_value },
+			"time_text" : { "font" : text_value, "x" : int_value, "y" : int_value },
+			"small_tick" : { "y" : int_value, "h" : int_value },
+			"medium_tick" : { "y" : int_value, "h" : int_value },
+			"large_tick" : { "y" : int_value, "h" : int_value },
+		},
+	},
+	"track" : {
+		"padding" : int_value,
+		"track_name_text" : { "font" : text_value, "x" : int_value, "y" : int_value, "w" : int_value },
+		"visible" : { "x" : int_value, "y" : int_value },
+		"speaker" : { "x" : int_value, "y" : int_value },
+	},
+	"clip" : {
+		"collapse_pixel_threshold" : int_value,
+		"thumbnail" : { "x" : int_value, "y" : int_value, "w" : int_value, "h" : int_value },
+		"clip_name_text" : { "font" : text_value, "font_resize" : text_value, "x" : int_value, "y" : int_value, "collapsed_x" : int_value },
+		"rectangle" : { "stroke_color_rgba" : color_value, "line_width" : float_value },
+		"visible" : { "x" : int_value, "y" : int_value },
+		"speaker" : { "x" : int_value, "y" : int_value },
+		"effect" : { "x" : int_value, "y" : int_value },
+	},
+	"transition" : {
+		"collapse_pixel_threshold_text" : int_value,
+		"collapse_pixel_threshold_thumbnail" : int_value,
+		"transition_name_text" : { "font" : text_value, "font_resize" : text_value, "x" : int_value, "y" : int_value },
+		"rectangle" : { "line_width" : float_value, "stroke_color_rgba" : color_value, "fill_color_rgba" : color_value, "y" : int_value, "h" : int_value },
+		"thumbnail" : { "x" : int_value, "y" : int_value },
+	},
+}
+
+# the settings of each theme.xml file which has been loaded (by path), with its modified time
+theme_cache = {}
+
+
+def parse_settings(element, schema):
+	""" Read the settings of an element (and the elements below it), using the schema """
+	
+	output = {}
+	for name, value_type in schema.iteritems():
+		child = element.getElementsByTagName(name)[0]
+		if isinstance(value_type, dict):
+			output[name] = parse_settings(child, value_type)
+		else:
+			output[name] = value_type(child)
+	return output
+
+
 ########################################################################
 class theme:
-	"""This class simplifies the reading of a theme.xml file. """
+	"""This class simplifies the reading of a theme.xml file.  Each theme.xml file
+	is only parsed once (until it changes). """
 
 	#----------------------------------------------------------------------
 	def __init__(self, folder_name, project=None):
@@ -36,177 +113,36 @@ class theme:
 		
 		# dictionary to hold theme settings
 		self.settings = {}
+		self.mtime = None
 		
 		try:
-			# Load the Theme XML file
-			self.xmldoc = minidom.parse(self.theme_xml_path)
-			
-			# get timeline settings
-			self.settings["timeline"] = self.get_timeline_settings()
-			
-			# get track settings
-			self.settings["track"] = self.get_track_settings()
+			self.mtime = os.path.getmtime(self.theme_xml_path)
 			
-			# get clip settings
-			self.settings["clip"] = self.get_clip_settings()
+			# use the cached settings (if the theme.xml file hasn't changed)
+			if self.theme_xml_path in theme_cache and theme_cache[self.theme_xml_path][0] == self.mtime:
+				self.settings = theme_cache[self.theme_xml_path][1]
+				return
 			
-			# get transitions settings
-			self.settings["transition"] = self.get_transition_settings()
+			# Load the Theme XML file, and get the timeline, track, clip, and transition settings
+			xmldoc = minidom.parse(self.theme_xml_path)
+			self.settings = parse_settings(xmldoc, THEME_SCHEMA)
+			theme_cache[self.theme_xml_path] = (self.mtime, self.settings)
 			
 		except:
 			# Show friendly error message
+			_ = Language_Init.Translator(self.project).lang.gettext
 			messagebox.show(_("Error!"), _("Unable to load theme XML file: %s.  OpenShot will use the blue_glass XML theme file instead.") % self.theme_xml_path)
 			print "Unable to load theme XML file: %s.  OpenShot will use the blue_glass XML theme file instead." % self.theme_xml_path
 			
 			# clear any half-filled settings dictionary
 			self.settings = {}
-		
-		
-	def get_timeline_settings(self):
-		
-		output = {}
-		output["playhead_text"] = {
-			"font" : self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('playhead_text')[0].getElementsByTagName('font')[0].firstChild.toxml(),
-			"x" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('playhead_text')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('playhead_text')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-
-		output["ruler"] = {
-			"height" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('height')[0].firstChild.toxml()),
-			"x" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-			"playhead" : 
-				{
-					"x" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('playhead')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-					"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('playhead')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-				},
 			
-			"playhead_line" : 
-				{
-					"stroke_color" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('playhead_line')[0].getElementsByTagName('stroke_color')[0].firstChild.toxml(), 16),
-					"line_width" : float(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('playhead_line')[0].getElementsByTagName('line_width')[0].firstChild.toxml()),
-					"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('playhead_line')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-					"length_offset" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('playhead_line')[0].getElementsByTagName('length_offset')[0].firstChild.toxml()),
-				},
-				
-			"time_text" : 
-				{
-					"font" : self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('time_text')[0].getElementsByTagName('font')[0].firstChild.toxml(),
-					"x" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('time_text')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-					"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('time_text')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-				},
-				
-			"small_tick" : 
-				{
-					"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('small_tick')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-					"h" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('small_tick')[0].getElementsByTagName('h')[0].firstChild.toxml()),
-				},
-				
-			"medium_tick" : 
-				{
-					"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('medium_tick')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-					"h" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('medium_tick')[0].getElementsByTagName('h')[0].firstChild.toxml()),
-				},
-				
-			"large_tick" : 
-				{
-					"y" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('large_tick')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-					"h" : int(self.xmldoc.getElementsByTagName('timeline')[0].getElementsByTagName('ruler')[0].getElementsByTagName('large_tick')[0].getElementsByTagName('h')[0].firstChild.toxml()),
-				},
-		}
-		
-		return output
-	
-	def get_track_settings(self):
-		output = {}
-		output["padding"] = int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('padding')[0].firstChild.toxml())
-		
-		output["track_name_text"] = {
-			"font" : self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('track_name_text')[0].getElementsByTagName('font')[0].firstChild.toxml(),
-			"x" : int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('track_name_text')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('track_name_text')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-			"w" : int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('track_name_text')[0].getElementsByTagName('w')[0].firstChild.toxml()),
-		}
-		
-		output["visible"] = {
-			"x" : int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('visible')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('visible')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-		
-		output["speaker"] = {
-			"x" : int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('speaker')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('track')[0].getElementsByTagName('speaker')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-		
-		return output
-	
-	def get_clip_settings(self):
-		output = {}
-		output["collapse_pixel_threshold"] = int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('collapse_pixel_threshold')[0].firstChild.toxml())
-		
-		output["thumbnail"] = {
-			"x" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('thumbnail')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('thumbnail')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-			"w" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('thumbnail')[0].getElementsByTagName('w')[0].firstChild.toxml()),
-			"h" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('thumbnail')[0].getElementsByTagName('h')[0].firstChild.toxml()),
-		}
-		
-		output["clip_name_text"] = {
-			"font" : self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('clip_name_text')[0].getElementsByTagName('font')[0].firstChild.toxml(),
-			"font_resize" : self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('clip_name_text')[0].getElementsByTagName('font_resize')[0].firstChild.toxml(),
-			"x" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('clip_name_text')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('clip_name_text')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-			"collapsed_x" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('clip_name_text')[0].getElementsByTagName('collapsed_x')[0].firstChild.toxml()),
-		}
-		
-		output["rectangle"] = {
-			"stroke_color_rgba" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('rectangle')[0].getElementsByTagName('stroke_color_rgba')[0].firstChild.toxml(), 16),
-			"line_width" : float(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('rectangle')[0].getElementsByTagName('line_width')[0].firstChild.toxml()),
-		}
-		
-		output["visible"] = {
-			"x" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('visible')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('visible')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-		
-		output["speaker"] = {
-			"x" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('speaker')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('speaker')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-		
-		output["effect"] = {
-			"x" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('effect')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('clip')[0].getElementsByTagName('effect')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-		
-		return output
-	
-	def get_transition_settings(self):
-		output = {}
-		output["collapse_pixel_threshold_text"] = int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('collapse_pixel_threshold_text')[0].firstChild.toxml())
-		output["collapse_pixel_threshold_thumbnail"] = int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('collapse_pixel_threshold_thumbnail')[0].firstChild.toxml())
-
-		output["transition_name_text"] = {
-			"font" : self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('transition_name_text')[0].getElementsByTagName('font')[0].firstChild.toxml(),
-			"font_resize" : self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('transition_name_text')[0].getElementsByTagName('font_resize')[0].firstChild.toxml(),
-			"x" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('transition_name_text')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('transition_name_text')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-		
-		output["rectangle"] = {
-			"line_width" : float(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('rectangle')[0].getElementsByTagName('line_width')[0].firstChild.toxml()),
-			"stroke_color_rgba" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('rectangle')[0].getElementsByTagName('stroke_color_rgba')[0].firstChild.toxml(), 16),
-			"fill_color_rgba" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('rectangle')[0].getElementsByTagName('fill_color_rgba')[0].firstChild.toxml(), 16),
-			"y" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('rectangle')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-			"h" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('rectangle')[0].getElementsByTagName('h')[0].firstChild.toxml()),
-		}
-		
-		output["thumbnail"] = {
-			"x" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('thumbnail')[0].getElementsByTagName('x')[0].firstChild.toxml()),
-			"y" : int(self.xmldoc.getElementsByTagName('transition')[0].getElementsByTagName('thumbnail')[0].getElementsByTagName('y')[0].firstChild.toxml()),
-		}
-		
-		return output
+	def is_current(self):
+		""" Are these settings still the settings of the theme.xml file? """
+		try:
+			return bool(self.settings) and os.path.getmtime(self.theme_xml_path) == self.mtime
+		except OSError:
+			return False
 
 
 #def main():
@@ -18,7 +18,7 @@
 
 import os, threading, time, uuid
 from PIL import Image
-from classes import files, profiles, messagebox
+from classes import files, profiles, messagebox, scene_detect, relink
 
 try:
 	import mlt
@@ -34,7 +34,7 @@ class thumbnailer ( threading.Thread ):
 		""" Associate the OpenShot project file with this threaded class. """
 		self.project = project
 		
-	def GetFile(self, file_location, only_thumbnail=True, new_file_base_name=None, start_time=0.00, end_time=None):
+	def GetFile(self, file_location, only_thumbnail=True, new_file_base_name=None, start_time=0.00, end_time=None, detect_scenes=False):
 		""" Use this method to generate an OpenShotFile object based on the URL (or file location)
 		of a video or audio file. Each time you call this method, it will lock this thread (and OpenShot's
 		main thread) until it has finished. """
@@ -44,6 +44,7 @@ class thumbnailer ( threading.Thread ):
 		new_file_base_name: The name of the folder and the base for the image sequence name, not including the path.
 		start_time: The time to start grabbing frames from the file, in seconds.
 		end_time: The time to end grabbing frames from the file, in seconds. None = To the last frame.
+		detect_scenes: True if the scene cuts of a video file should be detected (this decodes the whole file).
 		"""
 
 		try:
@@ -97,7 +98,7 @@ class thumbnailer ( threading.Thread ):
 			# check the 'seekable' property
 			# If it is zero, then MLT is likely to have problems with this file.
 			if self.p.get("seekable") == '0':
-				messagebox.show(_("Warning!"), _("The file %s has properties that may prevent it working properly in OpenShot.\nYou may need to transcode it to another format.") % (self.file_name))
+				self.show_warning(_("Warning!"), _("The file %s has properties that may prevent it working properly in OpenShot.\nYou may need to transcode it to another format.") % (self.file_name))
 				
 			# create the consumer
 			self.c = mlt.Consumer(self.profile, "avformat", self.thumbnail_path)
@@ -219,6 +220,14 @@ class thumbnailer ( threading.Thread ):
 			newFile.audio_frequency = self.audio_frequency
 			newFile.video_codec = self.video_codec
 
+			# remember the size and partial hash of the file (so it can be found if it's moved or renamed)
+			if only_thumbnail:
+				(newFile.file_size, newFile.partial_hash) = relink.get_fingerprint(file_location)
+
+			# detect the scene cuts (if needed)
+			if detect_scenes and self.file_type == "video" and only_thumbnail:
+				newFile.scene_cuts = scene_detect.detect_scenes(file_location)
+
 			# return the OpenShotFile object
 			return newFile
 		
@@ -227,6 +236,11 @@ class thumbnailer ( threading.Thread ):
 
 
 
+	def show_warning(self, title, message):
+		""" Show a warning about the file being inspected """
+		messagebox.show(title, message)
+
+
 	def run ( self ):
 		""" This is the main method on this thread.  This method should not return anything, or the 
 		thread will no longer be active... and thus will no longer be able to inspect media files. """
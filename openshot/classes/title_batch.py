@@ -0,0 +1,170 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, re, csv, json
+import threading, Queue
+from xml.sax.saxutils import escape
+
+# the number of threads used to write the SVG files
+WRITE_THREADS = 4
+
+
+class title_batch():
+	"""This class creates many titles from a single (already styled) SVG template.  The
+	template is serialized once, and split at the text of each tspan node, so each
+	title only needs a string join (instead of editing and serializing the minidom tree)."""
+
+	def __init__(self, xmldoc, tspans):
+		"""Constructor"""
+
+		self.text_fields = len(tspans)
+
+		# replace the text of each tspan with a unique placeholder
+		original_nodes = []
+		for index, tspan in enumerate(tspans):
+			original_nodes.append(list(tspan.childNodes))
+			for child in original_nodes[index]:
+				tspan.removeChild(child)
+			tspan.appendChild(xmldoc.createTextNode("@@OPENSHOT_TEXT_%d@@" % index))
+
+		try:
+			template = xmldoc.toxml("UTF-8")
+		finally:
+			# restore the original text (so the title editor is unchanged)
+			for index, tspan in enumerate(tspans):
+				tspan.removeChild(tspan.childNodes[0])
+				for child in original_nodes[index]:
+					tspan.appendChild(child)
+
+		# split the template into [text, field index, text, field index, ..., text]
+		self.parts = re.split("@@OPENSHOT_TEXT_(\d+)@@", template)
+		for index in range(1, len(self.parts), 2):
+			self.parts[index] = int(self.parts[index])
+
+	def render(self, values):
+		""" Get the SVG (as a UTF-8 string) for a list of text values """
+
+		svg = []
+		for index, part in enumerate(self.parts):
+			if index % 2 == 0:
+				svg.append(part)
+			elif part < len(values):
+				svg.append(escape(values[part]))
+		return "".join(svg)
+
+	def write_files(self, rows, folder, base_name):
+		""" Write 1 SVG file for each row (name, values), using a few threads.  Existing files
+		are never overwritten (a free name is used instead).  Returns a tuple of the file paths
+		written, and a list of (file path, error) tuples. """
+
+		# the name of each row
+		names = []
+		for index, (name, values) in enumerate(rows):
+			if not name:
+				name = "%s %03d" % (base_name, index + 1)
+			name = name.replace(os.sep, "_")
+			if not name.endswith(".svg"):
+				name = name + ".svg"
+			names.append(name)
+
+		# don't let 2 rows write the same file (or a row replace an existing file, or take
+		# the name of a later row)
+		jobs = Queue.Queue()
+		file_paths = []
+		requested_names = set(names)
+		used_names = set()
+		for index, name in enumerate(names):
+			if name in used_names or os.path.exists(os.path.join(folder, name)):
+				number = index + 1
+				while True:
+					name = "%s %03d.svg" % (names[index][:-4], number)
+					if name not in used_names and name not in requested_names and not os.path.exists(os.path.join(folder, name)):
+						break
+					number += 1
+			used_names.add(name)
+
+			file_path = os.path.join(folder, name)
+			file_paths.append(file_path)
+			jobs.put((file_path, rows[index][1]))
+
+		errors = []
+		def write_worker():
+			while True:
+				try:
+					file_path, values = jobs.get_nowait()
+				except Queue.Empty:
+					return
+				try:
+					file = open(file_path, "wb") #wb needed for windows support
+					file.write(self.render(values))
+					file.close()
+				except IOError, inst:
+					errors.append((file_path, inst))
+
+		threads = []
+		for i in range(min(WRITE_THREADS, len(file_paths))):
+			t = threading.Thread(target=write_worker)
+			t.start()
+			threads.append(t)
+		for t in threads:
+			t.join()
+
+		# only return the files that were written
+		failed = set(file_path for file_path, inst in errors)
+		return ([file_path for file_path in file_paths if file_path not in failed], errors)
+
+
+def read_data_file(file_path):
+	""" Read the titles from a CSV file (1 row per title, 1 column per text field), or a JSON
+	file (a list of lists, or a list of objects like {"name" : "...", "text" : ["...", "..."]}).
+	Returns a list of (name, values) tuples, with UTF-8 encoded values. """
+
+	rows = []
+	if file_path.lower().endswith(".json"):
+		f = open(file_path, "r")
+		data = json.load(f)
+		f.close()
+
+		for item in data:
+			name = None
+			if isinstance(item, dict):
+				name = item.get("name")
+				item = item.get("text", [])
+			if isinstance(item, basestring):
+				item = [item]
+			values = [encode_value(value) for value in item]
+			if name:
+				name = encode_value(name)
+			rows.append((name, values))
+	else:
+		f = open(file_path, "rb")
+		for row in csv.reader(f):
+			# skip empty lines
+			if not "".join(row).strip():
+				continue
+			rows.append((None, row))
+		f.close()
+
+	return rows
+
+
+def encode_value(value):
+	""" Convert a JSON value into a UTF-8 string """
+	if isinstance(value, unicode):
+		return value.encode("UTF-8")
+	return str(value)
@@ -62,6 +62,11 @@ class transition:
 		self.__dict__.update(state)
 		
 
+	def get_render_signature(self):
+		"""Get a tuple of everything that changes how this transition is drawn on the timeline"""
+		return (id(self), self.name, self.position_on_track, self.length, self.reverse, self.type, self.parent.unique_id, self.parent.y_top)
+
+
 	def Render(self, exiting_item=None, x_offset = 0):
 
 		# get a reference to the 2 main canvas objects & theme
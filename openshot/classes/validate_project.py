@@ -0,0 +1,228 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, threading, Queue
+import gobject, gtk
+from classes import messagebox, files, bulk_import, relink
+
+try:
+	import mlt
+except ImportError:
+	print "*** ERROR: MLT Python bindings failed to import ***"
+
+# how often (in milliseconds) the results are shown on the form
+FLUSH_INTERVAL = 250
+
+
+class project_validator(threading.Thread):
+	""" This class checks an opened project in the background: missing files, missing transitions,
+	and missing thumbnails (which are re-created).  The project can be edited while it runs, the
+	results are shown as they arrive (even if undo / redo replaces the project object), and it's
+	cancelled when another project is opened. """
+
+	def __init__(self, project, report_missing=True):
+		""" Constructor (this must be called by the GTK thread) """
+		threading.Thread.__init__(self)
+		self.setDaemon(True)
+
+		self.project = project
+		self.form = project.form
+		self.report_missing = report_missing
+		self.cancelled = False
+		self.results = Queue.Queue()
+
+		# the missing files and transitions (shown once the checks are done)
+		self.missing_files = []
+		self.missing_transitions = []
+
+		# copy the lists of files and clips (the GTK thread can change the project while this runs)
+		self.file_items = [item for item in project.project_folder.items if isinstance(item, files.OpenShotFile)]
+		self.clips = []
+		self.transitions = []
+		for sequence in project.sequences:
+			for track in sequence.tracks:
+				self.clips.extend(track.clips)
+				self.transitions.extend(track.transitions)
+
+	def cancel(self):
+		""" Stop checking the project (after the current thumbnail) """
+		self.cancelled = True
+
+	def start(self):
+		""" Start the thread, and show the results every few milliseconds """
+		threading.Thread.start(self)
+		gobject.timeout_add(FLUSH_INTERVAL, self.flush)
+
+	def run(self):
+		""" Check the files and transitions, and then re-create the missing thumbnails """
+
+		# check project files still exist in the same location
+		missing_file_ids = set()
+		for item in self.file_items:
+			if self.cancelled:
+				return
+			if not os.path.exists(item.name) and "%" not in item.name and item.file_type != "sequence":
+				missing_file_ids.add(item.unique_id)
+				self.results.put(("missing file", item))
+
+		for transition in self.transitions:
+			if self.cancelled:
+				return
+			if transition.resource and not os.path.exists(transition.resource):
+				self.results.put(("missing transition", transition))
+
+		# re-init the mlt factory (before this thread uses it)
+		mlt.Factory.init()
+		thumbnailer = bulk_import.import_thumbnailer(self.project)
+
+		# Recreate missing thumbnails for files
+		for item in self.file_items:
+			if self.cancelled:
+				return
+			if item.unique_id not in missing_file_ids and not os.path.exists(item.thumb_location):
+				try:
+					item.update_thumbnail(thumbnailer)
+					self.results.put(("file thumbnail", item))
+				except Exception, ex:
+					print "Failed to create the thumbnail of %s: %s" % (item.name, ex)
+
+		# Recreate missing thumbnails for clips
+		for clip in self.clips:
+			if self.cancelled:
+				return
+			if clip.file_object.unique_id not in missing_file_ids and not os.path.exists(clip.thumb_location) and not clip.file_object.file_type == "audio":
+				try:
+					clip.update_thumbnail(thumbnailer)
+					self.results.put(("clip thumbnail", clip))
+				except Exception, ex:
+					print "Failed to create the thumbnail of %s: %s" % (clip.name, ex)
+
+	def get_project(self):
+		""" Get the open project.  Undo / redo (and recovering the journal) replace the project
+		object, so the results are matched with the open project by unique id. """
+		return self.form.project
+
+	def get_objects(self, project):
+		""" Get the files, clips and transitions of a project by unique id (with the sequence of
+		each clip and transition) """
+
+		objects = {}
+		for item in project.project_folder.items:
+			if isinstance(item, files.OpenShotFile):
+				objects[item.unique_id] = (item, None)
+		for sequence in project.sequences:
+			for track in sequence.tracks:
+				for clip in track.clips:
+					objects[clip.unique_id] = (clip, sequence)
+				for transition in track.transitions:
+					objects[transition.unique_id] = (transition, sequence)
+		return objects
+
+	def flush(self):
+		""" Show the results on the form (this runs on the GTK thread) """
+
+		# another project was opened
+		if self.cancelled:
+			return False
+
+		project = self.get_project()
+		objects = None
+		new_file_thumbnails = 0
+		clips = []
+		while True:
+			try:
+				(result, item) = self.results.get_nowait()
+			except Queue.Empty:
+				break
+
+			if objects == None:
+				objects = self.get_objects(project)
+			(current_item, sequence) = objects.get(item.unique_id, (None, None))
+
+			if result == "missing file":
+				self.missing_files.append(item.unique_id)
+			elif result == "missing transition" and current_item:
+				# default to dissolve (the transition is changed here, since the GTK thread owns the project)
+				self.missing_transitions.append(current_item.resource)
+				current_item.resource = ""
+				sequence.set_modified()
+			elif result == "file thumbnail":
+				new_file_thumbnails += 1
+			elif result == "clip thumbnail" and current_item:
+				current_item.thumb_location = item.thumb_location
+				clips.append(current_item)
+
+		# refresh the tree (once per batch of thumbnails)
+		if new_file_thumbnails:
+			self.form.refresh_files()
+
+		# re-draw the clips with a new thumbnail
+		if clips:
+			self.render_clips(clips)
+
+		if self.isAlive() or not self.results.empty():
+			# keep checking for results
+			return True
+
+		self.finished()
+		return False
+
+	def render_clips(self, clips):
+		""" Re-draw some clips on the timeline """
+
+		root_right = self.form.MyCanvas.get_root_item()
+		groups = {}
+		for index in range(0, root_right.get_n_children()):
+			child = root_right.get_child(index)
+			groups[child.get_data ("id")] = child
+
+		for clip in clips:
+			if clip.unique_id in groups:
+				clip.RenderClip(groups[clip.unique_id])
+
+	def get_missing_files(self):
+		""" Get the missing files of the open project (which haven't been removed) """
+
+		objects = self.get_objects(self.get_project())
+		return [objects[unique_id][0] for unique_id in self.missing_files if unique_id in objects]
+
+	def finished(self):
+		""" Report the missing files and transitions """
+
+		project = self.get_project()
+		if self.missing_transitions:
+			# mark XML as refreshable (without adding an undo / redo history entry)
+			project.set_project_modified(is_modified=project.is_modified, refresh_xml=True)
+			project.RefreshXML()
+
+		if not self.report_missing:
+			return
+
+		missing_files = self.get_missing_files()
+		if missing_files:
+			# offer to search for the missing files (i.e. if the media was moved)
+			messagebox.show("OpenShot", _("The following file(s) no longer exist.") + "\n\n" + "\n".join([item.name for item in missing_files]) + "\n",
+							gtk.BUTTONS_YES_NO, self.relink_missing_files, None, gtk.MESSAGE_QUESTION, _("Do you want to search a folder for the missing file(s)?"))
+
+		if self.missing_transitions:
+			messagebox.show("OpenShot", _("The following transition(s) no longer exist.") + "\n\n" + "\n".join(self.missing_transitions) + "\n")
+
+	def relink_missing_files(self):
+		""" Search some folders for the missing files """
+		if not self.cancelled:
+			relink.relink_missing_files(self.get_project(), self.get_missing_files())
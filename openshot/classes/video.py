@@ -19,7 +19,7 @@
 import os, sys, locale, time
 import threading
 import gobject
-from classes import profiles
+from classes import profiles, render_stats
 from gtk import STOCK_MEDIA_PAUSE
 from gtk import STOCK_MEDIA_PLAY
 import gtk
@@ -134,6 +134,9 @@ class player ( threading.Thread ):
 			# set some RENDER specific options
 			self.c.set("real_time", -1)
 			
+			# init the render statistics (fps, ETA, CPU, bitrate)
+			self.render_stats = render_stats.render_stats(export_path, self.fps, self.p.get_length(), self.render_options)
+			
 			# set render options
 			if self.render_options["export_to"] == _("Image Sequence"):
 				# image seq
@@ -197,6 +200,7 @@ class player ( threading.Thread ):
 		# FIXME: Is this relevant - doesn't seem to be used in this method?
 		self.override_path = None
 		self.alternate_progress_bar = None
+		self.render_stats = None
 
 		# track wheather the thread is playing or not
 		self.isPlaying = False 
@@ -249,10 +253,15 @@ class player ( threading.Thread ):
 					new_time = current_frame / float(self.fps)
 					
 					if self.mode == "render":
+						# sample the render statistics
+						stats = None
+						if self.render_stats:
+							stats = self.render_stats.sample(current_frame, self.c)
+						
 						# update Export Dialog Progress Bar
 						self.fraction_complete = decimal_complete
 						if self.project.form.frmExportVideo:
-							gobject.idle_add(self.project.form.frmExportVideo.update_progress, self.fraction_complete)
+							gobject.idle_add(self.project.form.frmExportVideo.update_progress, self.fraction_complete, stats)
 						
 					elif self.mode == "preview":
 						
@@ -264,8 +273,8 @@ class player ( threading.Thread ):
 							
 						else:
 							# update play-head
-							if self.project.sequences[0]:
-								gobject.idle_add(self.project.sequences[0].move_play_head, new_time)
+							if self.project.current_sequence:
+								gobject.idle_add(self.project.current_sequence.move_play_head, new_time)
 			
 							# update progress bar of video 
 							if self.main_form.hsVideoProgress:
@@ -289,6 +298,12 @@ class player ( threading.Thread ):
 					if self.mode == "render":
 						# update Export Dialog Progress Bar
 						if self.fraction_complete > 0.0:
+							# save the render statistics next to the exported file
+							if self.render_stats:
+								self.render_stats.finish()
+								self.render_stats.save()
+								self.render_stats = None
+							
 							# update progress bar to 100%
 							if self.project.form.frmExportVideo:
 								gobject.idle_add(self.project.form.frmExportVideo.update_progress, 1.0)
@@ -330,7 +345,7 @@ class player ( threading.Thread ):
 
 	def move_play_head(self, new_time):
 		# call this thread move the play_head
-		gobject.idle_add(self.project.sequences[0].move_play_head, new_time)
+		gobject.idle_add(self.project.current_sequence.move_play_head, new_time)
 		
 
 	def pause(self):
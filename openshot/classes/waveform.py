@@ -0,0 +1,315 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os, math, struct, threading, Queue
+import wave, audioop
+from array import array
+
+try:
+	import mlt
+except ImportError:
+	print "*** ERROR: MLT Python bindings failed to import ***"
+
+# NumPy is optional (without it, the peak files are read with seek / read)
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# the audio is decoded to mono, at a low sample rate (which is plenty for drawing)
+SAMPLE_RATE = 8000
+
+# the number of (min, max) peaks per second of the most detailed level.  Each
+# following level has half the peaks of the level before it.
+PEAKS_PER_SECOND = 200
+LEVELS = 11
+
+# the color of the waveform on the timeline (semi-transparent black)
+WAVEFORM_COLOR = 0x00000080
+
+# the header of a peak file: magic, version, peaks per second, number of levels,
+# followed by the number of peaks and the offset of each level.
+HEADER = "<4sIII"
+LEVEL_HEADER = "<II"
+MAGIC = "OSPK"
+VERSION = 1
+
+# the peak files which are memory-mapped (by path), and the maximum number of them
+peak_files = {}
+MAX_PEAK_FILES = 64
+
+
+def get_peak_path(file_object):
+	""" Get the path of the peak file of a media file (stored next to the thumbnails) """
+	return os.path.join(file_object.project.folder, "thumbnail", "%s.peaks" % file_object.unique_id)
+
+
+def decode_audio(file_path, wav_path, sample_rate=SAMPLE_RATE):
+	""" Decode the audio of a media file (through MLT) to a mono, 16 bit WAV file.  Returns
+	True if the WAV file was created. """
+
+	profile = mlt.Profile("quarter_ntsc")
+	producer = mlt.Producer(profile, '%s' % file_path)
+	if producer.is_valid() == False:
+		return False
+
+	consumer = mlt.Consumer(profile, "avformat", wav_path)
+	consumer.set("real_time", 0)
+	consumer.set("vn", 1)
+	consumer.set("video_off", 1)
+	consumer.set("f", "wav")
+	consumer.set("acodec", "pcm_s16le")
+	consumer.set("frequency", sample_rate)
+	consumer.set("channels", 1)
+	consumer.connect(producer)
+	consumer.run()
+
+	return os.path.exists(wav_path)
+
+
+def extract_peaks(file_path, peak_path):
+	""" Decode the audio of a media file once (through MLT), and save the min / max peaks of
+	each level to the peak file.  Returns True if the peak file was created. """
+
+	# decode the audio to a temporary WAV file
+	wav_path = peak_path + ".wav"
+	if not decode_audio(file_path, wav_path):
+		return False
+
+	try:
+		# calculate the peaks of the most detailed level
+		peaks = array("b")
+		wav = wave.open(wav_path, "rb")
+		sample_width = wav.getsampwidth()
+		samples_per_peak = wav.getframerate() / PEAKS_PER_SECOND
+		bytes_per_peak = samples_per_peak * sample_width
+		while True:
+			# read about 1 second at a time
+			block = wav.readframes(samples_per_peak * PEAKS_PER_SECOND)
+			if not block:
+				break
+			for index in range(0, len(block), bytes_per_peak):
+				chunk = block[index:index + bytes_per_peak]
+				if len(chunk) < sample_width:
+					break
+				(minimum, maximum) = audioop.minmax(chunk[:len(chunk) - len(chunk) % sample_width], sample_width)
+				peaks.append(minimum >> (8 * sample_width - 8))
+				peaks.append(maximum >> (8 * sample_width - 8))
+		wav.close()
+	finally:
+		os.remove(wav_path)
+
+	# each level combines 2 peaks of the level before it
+	levels = [peaks]
+	for level in range(1, LEVELS):
+		if numpy:
+			previous = numpy.frombuffer(levels[-1], dtype=numpy.int8).reshape(-1, 2)
+			if len(previous) % 2:
+				previous = numpy.vstack((previous, previous[-1:]))
+			pairs = previous.reshape(-1, 2, 2)
+			current = numpy.empty((len(pairs), 2), dtype=numpy.int8)
+			current[:, 0] = pairs[:, :, 0].min(axis=1)
+			current[:, 1] = pairs[:, :, 1].max(axis=1)
+			levels.append(array("b", current.tostring()))
+			continue
+
+		previous = levels[-1]
+		current = array("b")
+		for index in range(0, len(previous), 4):
+			if index + 2 < len(previous):
+				current.append(min(previous[index], previous[index + 2]))
+				current.append(max(previous[index + 1], previous[index + 3]))
+			else:
+				current.append(previous[index])
+				current.append(previous[index + 1])
+		levels.append(current)
+
+	# write the peak file (and rename it, so a partial file is never read)
+	tmp_path = peak_path + ".tmp"
+	f = open(tmp_path, "wb")
+	offset = struct.calcsize(HEADER) + struct.calcsize(LEVEL_HEADER) * len(levels)
+	f.write(struct.pack(HEADER, MAGIC, VERSION, PEAKS_PER_SECOND, len(levels)))
+	for level_peaks in levels:
+		f.write(struct.pack(LEVEL_HEADER, len(level_peaks) / 2, offset))
+		offset += len(level_peaks)
+	for level_peaks in levels:
+		level_peaks.tofile(f)
+	f.close()
+	os.rename(tmp_path, peak_path)
+
+	return True
+
+
+def choose_level(peaks_per_second, level_count, pixels_per_second):
+	""" Get the level of the pyramid which is closest to the zoom of the timeline """
+
+	if pixels_per_second <= 0:
+		return level_count - 1
+	level = int(round(math.log(peaks_per_second / pixels_per_second, 2)))
+	return max(0, min(level_count - 1, level))
+
+
+def open_peaks(peak_path):
+	""" Memory-map a peak file (once), and return a tuple of (peaks per second, list of
+	levels), where each level is a NumPy array of (min, max) rows. """
+
+	mtime = os.path.getmtime(peak_path)
+	if peak_path in peak_files and peak_files[peak_path][0] == mtime:
+		return peak_files[peak_path][1]
+
+	data = numpy.memmap(peak_path, dtype=numpy.int8, mode="r")
+	header = data[:struct.calcsize(HEADER)].tostring()
+	(magic, version, peaks_per_second, level_count) = struct.unpack(HEADER, header)
+	if magic != MAGIC or version != VERSION:
+		return None
+
+	levels = []
+	level_header_size = struct.calcsize(LEVEL_HEADER)
+	for level in range(level_count):
+		start = struct.calcsize(HEADER) + level * level_header_size
+		(peak_count, offset) = struct.unpack(LEVEL_HEADER, data[start:start + level_header_size].tostring())
+		levels.append(data[offset:offset + peak_count * 2].reshape(-1, 2))
+
+	# don't keep too many files open
+	if len(peak_files) >= MAX_PEAK_FILES:
+		peak_files.clear()
+	peak_files[peak_path] = (mtime, (peaks_per_second, levels))
+	return (peaks_per_second, levels)
+
+
+def read_peaks(peak_path, start_time, end_time, pixels):
+	""" Read the peaks between 2 times (in seconds), from the level of the pyramid which is
+	closest to the number of pixels (so the work depends on the number of pixels, and not on
+	the length of the clip).  Returns a list of (min, max) tuples (between -1.0 and 1.0),
+	1 per pixel (or less, if the level has fewer peaks than pixels). """
+
+	if pixels < 1 or end_time <= start_time or not os.path.exists(peak_path):
+		return []
+	pixels_per_second = float(pixels) / (end_time - start_time)
+
+	if numpy:
+		peak_file = open_peaks(peak_path)
+		if not peak_file:
+			return []
+		(peaks_per_second, levels) = peak_file
+		level = choose_level(peaks_per_second, len(levels), pixels_per_second)
+		level_peaks_per_second = peaks_per_second / float(2 ** level)
+		peak_count = len(levels[level])
+		first_peak = max(0, min(peak_count, int(start_time * level_peaks_per_second)))
+		last_peak = max(first_peak, min(peak_count, int(end_time * level_peaks_per_second) + 1))
+		peaks = levels[level][first_peak:last_peak]
+		if len(peaks) == 0:
+			return []
+
+		# combine the peaks which are drawn on the same pixel
+		if len(peaks) > pixels:
+			buckets = (numpy.arange(pixels) * len(peaks)) // pixels
+			peaks = numpy.column_stack((numpy.minimum.reduceat(peaks[:, 0], buckets),
+										numpy.maximum.reduceat(peaks[:, 1], buckets)))
+		return zip((peaks[:, 0] / 128.0).tolist(), (peaks[:, 1] / 128.0).tolist())
+
+	f = open(peak_path, "rb")
+	try:
+		(magic, version, peaks_per_second, level_count) = struct.unpack(HEADER, f.read(struct.calcsize(HEADER)))
+		if magic != MAGIC or version != VERSION:
+			return []
+		levels = []
+		for level in range(level_count):
+			levels.append(struct.unpack(LEVEL_HEADER, f.read(struct.calcsize(LEVEL_HEADER))))
+
+		level = choose_level(peaks_per_second, level_count, pixels_per_second)
+		(peak_count, offset) = levels[level]
+		level_peaks_per_second = peaks_per_second / float(2 ** level)
+
+		# read the range of peaks
+		first_peak = max(0, min(peak_count, int(start_time * level_peaks_per_second)))
+		last_peak = max(first_peak, min(peak_count, int(end_time * level_peaks_per_second) + 1))
+		f.seek(offset + first_peak * 2)
+		peaks = array("b")
+		peaks.fromstring(f.read((last_peak - first_peak) * 2))
+	finally:
+		f.close()
+
+	# combine the peaks which are drawn on the same pixel
+	count = len(peaks) / 2
+	if count == 0:
+		return []
+	pixels = min(pixels, count)
+	result = []
+	for pixel in range(pixels):
+		first = pixel * count / pixels
+		last = max(first + 1, (pixel + 1) * count / pixels)
+		minimum = min(peaks[first * 2:last * 2:2])
+		maximum = max(peaks[first * 2 + 1:last * 2:2])
+		result.append((minimum / 128.0, maximum / 128.0))
+	return result
+
+
+class peak_extractor(threading.Thread):
+	""" This thread decodes the audio of media files (1 at a time), and creates their peak files.  When
+	a peak file is ready, the clips using the file are re-drawn. """
+
+	def __init__(self, form):
+		threading.Thread.__init__(self)
+		self.setDaemon(True)
+		self.form = form
+		self.jobs = Queue.Queue()
+		self.requested = set()
+
+	def request(self, file_object):
+		""" Create the peak file of a media file (unless it already exists, or has already been requested) """
+
+		peak_path = get_peak_path(file_object)
+		if file_object.unique_id in self.requested or os.path.exists(peak_path):
+			return
+		self.requested.add(file_object.unique_id)
+		self.jobs.put((file_object, peak_path))
+
+	def stop(self):
+		""" Stop the thread (after the current file) """
+		self.jobs.put(None)
+
+	def run(self):
+		import gobject
+
+		while True:
+			job = self.jobs.get()
+			if job == None:
+				break
+
+			(file_object, peak_path) = job
+			try:
+				if extract_peaks(file_object.name, peak_path):
+					gobject.idle_add(self.peaks_ready, file_object)
+			except Exception, ex:
+				print "Failed to create the peak file of %s: %s" % (file_object.name, ex)
+
+	def peaks_ready(self, file_object):
+		""" Re-draw the clips which use this file (this runs on the GTK thread) """
+
+		root_right = self.form.MyCanvas.get_root_item()
+		groups = {}
+		for index in range(0, root_right.get_n_children()):
+			child = root_right.get_child(index)
+			groups[child.get_data ("id")] = child
+
+		for MyTrack in self.form.project.current_sequence.tracks:
+			for MyClip in MyTrack.clips:
+				if MyClip.file_object.unique_id == file_object.unique_id and MyClip.unique_id in groups:
+					MyClip.RenderClip(groups[MyClip.unique_id])
+		return False
@@ -20,6 +20,7 @@
 import os, sys
 import gtk, locale
 from classes import info
+from classes.startup_profiler import profiler
 
 # Ensure GTK minimum version is met (this is a new requirement needed 
 # for using GtkBuilder instead of Glade
@@ -51,6 +52,7 @@ def main():
 	# only allow 1 instance of OpenShot to run
 	from classes import lock
 	lock.check_pid(os.path.join(os.path.expanduser("~"), ".openshot"))
+	profiler.mark("check lock")
 
 	# import the locale, and set the locale. This is used for 
 	# locale-aware number to string formatting
@@ -60,15 +62,18 @@ def main():
 	# multi-threaded architecture of mlt
 	gtk.gdk.threads_init()
 	gtk.gdk.threads_enter()
+	profiler.mark("init locale & threads")
 
 	# Create a default project object
 	from classes import project
 	current_project = project.project()
+	profiler.mark("create project")
 
 	# Create form object & refresh the data
 	from windows.MainGTK import frmMain
 	app = frmMain(project=current_project, version=info.SETUP['version'])
 	app.refresh()
+	profiler.mark("refresh timeline")
 	app.run()
 
 
@@ -49,7 +49,8 @@ class frmAddEffect(SimpleGtkBuilderApp):
 		self.cboEffects.set_model(self.sort_model)
 		
 		# Init List of Effects
-		effect_list = self.form.effect_list
+		effect_list = self.form.get_effect_list()
+		self.form.load_avformats()
 		
 		# Add effects to dropdown
 		sorted_list = []
@@ -63,7 +64,7 @@ class frmAddEffect(SimpleGtkBuilderApp):
 			
 			# does the frei0r installation include this effect?
 			if my_effect.service.startswith("frei0r"):
-				if my_effect.service not in self.form.filters:
+				if not self.form.capabilities.has_filter(my_effect.service):
 					# don't add this effect, skip to the next one
 					continue
 			
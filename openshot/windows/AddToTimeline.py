@@ -48,7 +48,7 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 		self.model = self.treeFiles.get_model()
 		
 		# init the value of start_time with the play-head position
-		self.txtStartTime.set_value(self.project.sequences[0].play_head_position)
+		self.txtStartTime.set_value(self.project.current_sequence.play_head_position)
 
 		# refresh tree
 		self.refresh()
@@ -69,6 +69,14 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 		self.init_tracks()
 		self.init_transitions()
 		
+		# only offer to split the files with scene cuts
+		has_scene_cuts = False
+		for file in self.selected_files:
+			if file.scene_cuts:
+				has_scene_cuts = True
+		self.chkSplitScenes.set_active(has_scene_cuts)
+		self.chkSplitScenes.set_sensitive(has_scene_cuts)
+		
 		
 	def init_transitions(self):
 
@@ -116,14 +124,14 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 		_ = self._
 
 		# validate that 2 tracks are present
-		if len(self.project.sequences[0].tracks) == 0:
+		if len(self.project.current_sequence.tracks) == 0:
 			# no tracks, so add 2
-			self.project.sequences[0].AddTrack(_("New Track 1"))
-			self.project.sequences[0].AddTrack(_("New Track 2"))
+			self.project.current_sequence.AddTrack(_("New Track 1"))
+			self.project.current_sequence.AddTrack(_("New Track 2"))
 			self.form.refresh()	# show new tracks
-		elif len(self.project.sequences[0].tracks) == 1:
+		elif len(self.project.current_sequence.tracks) == 1:
 			# only 1 track, so add another
-			self.project.sequences[0].AddTrack(_("New Track"))
+			self.project.current_sequence.AddTrack(_("New Track"))
 			self.form.refresh()	# show new tracks
 		
 		counter = 0
@@ -132,12 +140,12 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 			model.clear()
 			
 			# loop through export to options
-			for track in self.project.sequences[0].tracks:
+			for track in self.project.current_sequence.tracks:
 				# append profile to list
 				dropdown.append_text(track.name)
 			
 			# set the default value
-			self.set_dropdown_values(self.project.sequences[0].tracks[counter].name, dropdown)
+			self.set_dropdown_values(self.project.current_sequence.tracks[counter].name, dropdown)
 			counter = counter + 1
 			
 	
@@ -327,6 +335,7 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 		transition_name = self.cboTransition.get_active_text()
 		transition_file_path = None
 		transition_length = self.txtTransitionLength.get_value()
+		split_scenes = self.chkSplitScenes.get_active()
 		#animation = self.cboAnimation.get_active_text()
 		use_transitions = True
 		use_random = False
@@ -342,14 +351,14 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 			transition_file_path = self.transitions[transition_name]
 			
 		# get actual track objects
-		for track in self.project.sequences[0].tracks:
+		for track in self.project.current_sequence.tracks:
 			if trackA_name == track.name:
 				trackA_object = track
 			if trackB_name == track.name:
 				trackB_object = track
 		
 		# Validate the the top track is above the bottom track
-		if self.project.sequences[0].tracks.index(trackA_object) >= self.project.sequences[0].tracks.index(trackB_object):
+		if self.project.current_sequence.tracks.index(trackA_object) >= self.project.current_sequence.tracks.index(trackB_object):
 			# Show error message
 			messagebox.show(_("Validation Error!"), _("The top track must be higher than the bottom track."))
 			return
@@ -359,72 +368,71 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 		location = "top"
 		current_track = trackA_object
 		
-		# loop through all files (in tree order)
-		for file in self.selected_files:
+		# add all the clips as 1 change (i.e. 1 undo / redo entry, and 1 render)
+		self.project.begin_transaction()
+		try:
+			# loop through all files (in tree order)
+			for file in self.selected_files:
 			
-			# Get filename
-			(dirName, fileName) = os.path.split(file.name)
+				# Get filename
+				(dirName, fileName) = os.path.split(file.name)
 			
-			# Add clips to track 1
-			new_clip = current_track.AddClip(fileName, "Gold", position, float(0.0), float(file.length), file)
+				# split the file at the scene cuts (if any), and add 1 clip per scene to track 1
+				first_clip = None
+				for (scene_start, scene_end) in self.get_scenes(file, split_scenes):
+					new_clip = current_track.AddClip(fileName, "Gold", position, scene_start, scene_end, file)
+					position = position + new_clip.length()
+					if not first_clip:
+						first_clip = new_clip
 
-			# Apply Fade settings
-			if fade_name == _("Fade In"):
-				new_clip.audio_fade_in = True
-				new_clip.video_fade_in = True
-				new_clip.audio_fade_in_amount = fade_length
-				new_clip.video_fade_in_amount = fade_length
-			elif fade_name == _("Fade Out"):
-				new_clip.audio_fade_out = True
-				new_clip.video_fade_out = True
-				new_clip.audio_fade_out_amount = fade_length
-				new_clip.video_fade_out_amount = fade_length
-			elif fade_name == _("Fade In & Out"):
-				new_clip.audio_fade_in = True
-				new_clip.video_fade_in = True
-				new_clip.audio_fade_out = True
-				new_clip.video_fade_out = True
-				new_clip.audio_fade_in_amount = fade_length
-				new_clip.audio_fade_out_amount = fade_length
-				new_clip.video_fade_in_amount = fade_length
-				new_clip.video_fade_out_amount = fade_length
+				# Apply Fade settings (to the start of the 1st scene, and the end of the last scene)
+				if fade_name in (_("Fade In"), _("Fade In & Out")):
+					first_clip.audio_fade_in = True
+					first_clip.video_fade_in = True
+					first_clip.audio_fade_in_amount = fade_length
+					first_clip.video_fade_in_amount = fade_length
+				if fade_name in (_("Fade Out"), _("Fade In & Out")):
+					new_clip.audio_fade_out = True
+					new_clip.video_fade_out = True
+					new_clip.audio_fade_out_amount = fade_length
+					new_clip.video_fade_out_amount = fade_length
 			
-			# increment position
-			if use_transitions:
-				# adjust the position based on the transition length
-				position = position + new_clip.length() - transition_length
-			else:
-				position = position + new_clip.length()
+				# increment position
+				if use_transitions:
+					# adjust the position based on the transition length
+					position = position - transition_length
 				
-			# Add transition (if needed)
-			if use_transitions:
+				# Add transition (if needed)
+				if use_transitions:
 			
-				# if a random transition, choose a random one
-				if use_random:
-					random_transition = random.choice(self.transitions.items())
-					transition_name = random_transition[0]
-					transition_file_path = random_transition[1]
+					# if a random transition, choose a random one
+					if use_random:
+						random_transition = random.choice(self.transitions.items())
+						transition_name = random_transition[0]
+						transition_file_path = random_transition[1]
 				
-				# add the transition
-				new_trans = trackA_object.AddTransition(transition_name, position, transition_length, transition_file_path)
-				if location == "top":
-					new_trans.reverse = True
+					# add the transition
+					new_trans = trackA_object.AddTransition(transition_name, position, transition_length, transition_file_path)
+					if location == "top":
+						new_trans.reverse = True
 			
-			# change tracks (if needed)
-			if use_transitions:
-				if current_track == trackA_object:
-					location = "bottom"
-					current_track = trackB_object
-				else:
-					current_track = trackA_object
-					location = "top"
+				# change tracks (if needed)
+				if use_transitions:
+					if current_track == trackA_object:
+						location = "bottom"
+						current_track = trackB_object
+					else:
+						current_track = trackA_object
+						location = "top"
 
-		# Does timeline need to be expanded?
-		if new_clip:
-			self.form.expand_timeline(new_clip)
+			# Does timeline need to be expanded?
+			if new_clip:
+				self.form.expand_timeline(new_clip)
 
-		#mark the project as modified
-		self.project.set_project_modified(is_modified=True, refresh_xml=True, type="Added files to timeline")
+			#mark the project as modified
+			self.project.set_project_modified(is_modified=True, refresh_xml=True, type=_("Added files to timeline"))
+		finally:
+			self.project.commit_transaction()
 		
 		# close this window
 		self.frmAddToTimeline.destroy()
@@ -433,6 +441,17 @@ class frmAddToTimeline(SimpleGtkBuilderApp):
 		self.form.refresh()
 		
 			
+	def get_scenes(self, file, split_scenes):
+		""" Get the (start time, end time) of each scene of a file """
+		
+		scene_times = [0.0]
+		if split_scenes:
+			scene_times.extend([cut for cut in file.scene_cuts if 0.0 < cut < file.length])
+		scene_times.append(float(file.length))
+		
+		return zip(scene_times[:-1], scene_times[1:])
+		
+			
 def main():
 	frm_add_files = frmAddToTimeline()
 	frm_add_files.run()
@@ -16,7 +16,7 @@
 #	You should have received a copy of the GNU General Public License
 #	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
 
-import os, time, uuid, shutil
+import os, time, uuid, shutil, hashlib
 import gobject, threading, subprocess, re
 import gtk
 import math
@@ -28,6 +28,33 @@ from classes import project, messagebox, files
 # init the foreign language
 from language import Language_Init
 
+try:
+	import multiprocessing
+	cpu_count = multiprocessing.cpu_count()
+except:
+	cpu_count = 1
+
+# number of frames (on each side of the previewed frame) to render in the background
+PREFETCH_FRAMES = 3
+
+# Blender versions (cached for this session, by the path of the blender executable)
+blender_versions = {}
+blender_versions_lock = threading.Lock()
+
+def get_blender_version(blender_exec_path):
+	""" Get the version of Blender (i.e. ['2.63']).  The 'blender -v' command only runs the 1st
+	time each executable is checked. """
+	blender_versions_lock.acquire()
+	try:
+		if blender_exec_path not in blender_versions:
+			process = subprocess.Popen([blender_exec_path, '-v'], stdout=subprocess.PIPE)
+			blender_versions[blender_exec_path] = re.findall(r"Blender (.*?) ", process.stdout.readline())
+			process.stdout.read()
+			process.wait()
+		return blender_versions[blender_exec_path]
+	finally:
+		blender_versions_lock.release()
+
 
 class frm3dGenerator(SimpleGtkBuilderApp):
 
@@ -45,6 +72,17 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 		self.selected_template = ""
 		self.is_rendering = False
 		self.my_blender = None
+		self.render_workers = []
+		self.window_closed = False
+		self.closing = False
+		
+		# long-lived Blender process (used to render preview frames)
+		self.blender_worker = BlenderWorker(self.form.settings.general["blender_command"], os.path.join(self.project.BLENDER_DIR, "scripts", "worker.py"))
+		
+		# cache of rendered preview frames, keyed by (template, params hash, frame)
+		self.preview_cache = {}
+		self.prefetch_blender = None
+		self.prefetch_ranges = []
 		
 		# init blender tree
 		self.OSTreeBlender = TreeBlender.OpenShotTree(self.treeTemplates, self.project)
@@ -185,6 +223,10 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 			# Assign a new unique id for each template selected
 			self.unique_folder_name = str(uuid.uuid1())
 			
+			# Clear the preview cache (and stop rendering frames in the background)
+			self.preview_cache = {}
+			self.stop_prefetch()
+			
 			# Create a folder (if it does not exist)
 			if not os.path.exists(os.path.join(self.output_dir, self.unique_folder_name)):
 				os.mkdir(os.path.join(self.output_dir, self.unique_folder_name))
@@ -483,7 +525,14 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 			project_params["color_mode"] = "RGBA"
 		project_params["horizon_color"] = (0.57, 0.57, 0.57)
 		project_params["animation"] = True
-		project_params["output_path"] = os.path.join(self.output_dir, self.unique_folder_name, self.params["file_name"])
+		if is_preview:
+			# preview frames are kept in a folder for each set of params (so they can be re-used)
+			preview_folder = os.path.join(self.output_dir, self.unique_folder_name, "preview", self.get_params_hash())
+			if not os.path.exists(preview_folder):
+				os.makedirs(preview_folder)
+			project_params["output_path"] = os.path.join(preview_folder, self.params["file_name"])
+		else:
+			project_params["output_path"] = os.path.join(self.output_dir, self.unique_folder_name, self.params["file_name"])
 
 		# return the dictionary
 		return project_params
@@ -511,13 +560,117 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 			os.mkdir(self.output_dir)
 				
 				
-	def inject_params(self, path, frame=None):
+	def get_animation_length(self):
+		""" Get the length (in frames) of the animation, including the animation speed multiplier """
+		length = int(self.params["end_frame"])
+		
+		# Get the animation speed (if any)
+		if self.params["animation_speed"]:
+			# Adjust length (based on animation speed multiplier)
+			length *= int(self.params["animation_speed"])
+			
+		return length
+	
+	def get_render_workers(self, total_frames):
+		""" Determine how many Blender processes should share the render of an animation.  The
+		'blender_workers' setting overrides the number (0 means automatic). """
+		try:
+			workers = int(self.form.settings.general["blender_workers"])
+		except (KeyError, ValueError):
+			workers = 0
+		
+		if workers < 1:
+			# automatic: 1 Blender process for every 2 CPU cores (but no more than 4)
+			workers = min(max(cpu_count / 2, 1), 4)
+			
+		# don't split very short animations (at least 10 frames per process)
+		return max(min(workers, total_frames / 10), 1)
+	
+	def split_frames(self, start_frame, end_frame, workers):
+		""" Split a range of frames into contiguous (first, last) chunks, 1 per Blender process """
+		total_frames = end_frame - start_frame + 1
+		chunks = []
+		first = start_frame
+		for index in range(workers):
+			# spread the remaining frames over the first chunks
+			size = total_frames / workers
+			if index < total_frames % workers:
+				size += 1
+			chunks.append((first, first + size - 1))
+			first += size
+		return chunks
+		
+	def get_params_hash(self):
+		""" Get a hash of the template and the user entered params (used as the preview cache key) """
+		return hashlib.md5(repr((self.selected_template, sorted(self.params.items())))).hexdigest()
+	
+	def get_cached_preview(self, frame):
+		""" Get the path of an already rendered preview frame (if any) """
+		image_path = self.preview_cache.get((self.selected_template, self.get_params_hash(), frame))
+		if image_path and os.path.exists(image_path):
+			return image_path
+		return None
+		
+	def preview_frame_saved(self, blender, frame, image_path):
+		""" A preview frame has been rendered by Blender.  Add it to the cache, and show it (if
+		it's the frame being previewed). """
+		
+		self.preview_cache[(self.selected_template, blender.params_hash, frame)] = image_path
+		
+		if blender.params_hash == self.get_params_hash() and frame == int(self.sliderPreview.get_value()):
+			self.update_image(image_path)
+	
+	def prefetch(self, frame):
+		""" Render the neighbouring frames of the previewed frame in the background (in a single
+		Blender process), so scrubbing the preview slider does not wait for Blender. """
+		
+		start_frame = int(self.params["start_frame"])
+		end_frame = self.get_animation_length()
+		
+		# find the frames after (and then before) this frame which are not cached
+		self.prefetch_ranges = []
+		for first, last in ((frame + 1, frame + PREFETCH_FRAMES), (frame - PREFETCH_FRAMES, frame - 1)):
+			missing = [f for f in range(max(first, start_frame), min(last, end_frame) + 1) if not self.get_cached_preview(f)]
+			if missing:
+				self.prefetch_ranges.append((missing[0], missing[-1]))
+				
+		self.start_next_prefetch()
+		
+	def start_next_prefetch(self):
+		""" Start a Blender process for the next range of frames to prefetch (if any) """
+		
+		if self.prefetch_blender or self.is_rendering or self.window_closed or not self.prefetch_ranges:
+			return
+		
+		frame_range = self.prefetch_ranges.pop(0)
+		blend_file_path = os.path.join(self.project.BLENDER_DIR, "blend", self.selected_template)
+		source_script = os.path.join(self.project.BLENDER_DIR, "scripts", self.selected_template.replace(".blend", ".py"))
+		target_script = os.path.join(self.output_dir, self.unique_folder_name, self.selected_template.replace(".blend", "_prefetch.py"))
+		
+		# Copy the .py script, and inject the user params (and the range of frames)
+		shutil.copy(source_script, target_script)
+		self.inject_params(target_script, frame_range=frame_range, is_preview=True)
+		
+		# Start blender thread
+		self.prefetch_blender = BlenderCommand(self, blend_file_path, target_script, True)
+		self.prefetch_blender.params_hash = self.get_params_hash()
+		self.prefetch_blender.start()
+		
+	def stop_prefetch(self):
+		""" Stop rendering frames in the background """
+		
+		self.prefetch_ranges = []
+		if self.prefetch_blender and self.prefetch_blender.is_running:
+			self.prefetch_blender.kill()
+			
+	def inject_params(self, path, frame=None, frame_range=None, is_preview=None):
 		# determine if this is 'preview' mode?
-		is_preview = False
-		if frame:
-			# if a frame is passed in, we are in preview mode.
-			# This is used to turn the background color to off-white... instead of transparent
-			is_preview = True
+		if is_preview == None:
+			is_preview = False
+			if frame:
+				# if a frame is passed in, we are in preview mode.
+				# This is used to turn the background color to off-white... instead of transparent
+				is_preview = True
 		
 		# prepare string to inject
 		user_params = "\n#BEGIN INJECTING PARAMS\n"
@@ -540,6 +693,13 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 			user_params += "params['%s'] = %s\n" % ("start_frame", frame)
 			user_params += "params['%s'] = %s\n" % ("end_frame", frame)
 			user_params += "\n\n#END ONLY RENDER 1 FRAME FOR PREVIEW\n"
+			
+		# Only render part of the animation (this Blender process is 1 of many)
+		if frame_range:
+			user_params += "\n\n#ONLY RENDER PART OF THE ANIMATION\n"
+			user_params += "params['%s'] = %s\n" % ("worker_start_frame", frame_range[0])
+			user_params += "params['%s'] = %s\n" % ("worker_end_frame", frame_range[1])
+			user_params += "\n\n#END ONLY RENDER PART OF THE ANIMATION\n"
 		
 		# Open new temp .py file, and inject the user parameters
 		f = open(path, 'r')
@@ -556,20 +716,22 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 		
 	def update_progress_bar(self, current_frame, current_part, max_parts):
 
-		# update label and preview slider
-		self.sliderPreview.set_value(float(current_frame))
-		
 		# determine length of image sequence
-		length = int(self.params["end_frame"])
-		
-		# Get the animation speed (if any)
-		if self.params["animation_speed"]:
-			# Adjust length (based on animation speed multiplier)
-			length *= int(self.params["animation_speed"])
+		length = self.get_animation_length()
 		
-		# calculate the current percentage, and update the progress bar
-		progress = float(float(current_frame) / float(length))
-		self.progressRender.set_fraction(progress)
+		if len(self.render_workers) > 1:
+			# merge the progress of all Blender processes (i.e. the number of saved frames)
+			frames_saved = sum([worker.frames_saved for worker in self.render_workers])
+			progress = float(frames_saved) / float(length - int(self.params["start_frame"]) + 1)
+		else:
+			# update label and preview slider
+			self.sliderPreview.set_value(float(current_frame))
+			
+			# calculate the current percentage
+			progress = float(float(current_frame) / float(length))
+			
+		# update the progress bar
+		self.progressRender.set_fraction(min(progress, 1.0))
 		
 		
 	def on_imgPreview_size_allocate(self, widget, rectangle, *args):
@@ -624,23 +786,96 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 			
 	def request_window_close(self):
 		
-		# stop thread
-		if self.my_blender:
-			if self.my_blender.is_running:
-				# kill any running blender render thread
-				self.my_blender.kill()
-			else:
-				# thread has already stopped... just close window
-				self.close_window()
+		# stop threads
+		self.closing = True
+		self.prefetch_ranges = []
+		running = [blender for blender in self.render_workers + [self.my_blender, self.prefetch_blender] if blender and blender.is_running]
+		if running:
+			# kill any running blender render threads (the window is closed when they finish)
+			for blender in running:
+				blender.kill()
 		else:
-			# thread has already stopped... just close window
+			# threads have already stopped... just close window
 			self.close_window()
 			
 	def close_window(self):
+		
+		# close window (only once)
+		if not self.window_closed:
+			self.window_closed = True
+			self.blender_worker.stop()
+			self.frm3dGenerator.destroy()
+		
+		
+	def blender_finished(self, blender):
+		""" A Blender process has exited.  When a render is split across several Blender
+		processes, wait for all of them before adding the image sequence to the project. """
+		_ = self._
+		
+		# the script of a preview request is not needed anymore
+		if blender.worker and os.path.exists(blender.target_script):
+			os.remove(blender.target_script)
+		
+		if blender.skipped:
+			# this preview frame was replaced by a newer one (before it was rendered)
+			return
+		
+		if blender == self.prefetch_blender:
+			# background (prefetch) render of preview frames
+			self.prefetch_blender = None
 			
-		# close window
-		self.frm3dGenerator.destroy()
+			if blender.was_killed:
+				# close window (if the window is closing, and nothing else is running)
+				if self.closing and not [worker for worker in self.render_workers + [self.my_blender] if worker and worker.is_running]:
+					self.close_window()
+			elif not blender.error_args:
+				# render the next range of frames
+				self.start_next_prefetch()
+			return
 		
+		if blender in self.render_workers:
+			# stop the other processes if this one failed
+			if blender.was_killed or blender.error_args:
+				for worker in self.render_workers:
+					if worker.is_running:
+						worker.kill()
+			
+			# wait for the remaining processes
+			if [worker for worker in self.render_workers if worker.is_running]:
+				return
+			
+			finished = self.render_workers
+			self.render_workers = []
+		else:
+			finished = [blender]
+			
+		# change cursor to "default"
+		self.frm3dGenerator.window.set_cursor(None)
+		
+		killed = [worker for worker in finished if worker.was_killed]
+		errors = [worker.error_args for worker in finished if worker.error_args]
+		
+		if self.closing:
+			# close window (if the user closed it, and nothing else is running)
+			if not [worker for worker in [self.my_blender, self.prefetch_blender] if worker and worker.is_running]:
+				self.close_window()
+			
+		elif errors:
+			# Show Error (wrong version of Blender, bad executable path, or no frames detected)
+			# (the other split processes were killed because of this error)
+			self.error_with_blender(*errors[0])
+			
+		elif killed:
+			# killed by the generator itself (nothing to add)
+			pass
+			
+		elif not blender.preview_mode:
+			# Done with render (i.e. close window)
+			self.render_finished()
+			
+		elif blender == self.my_blender and not self.is_rendering:
+			# render the neighbouring preview frames in the background
+			self.prefetch(blender.frame)
 		
 	def error_with_blender(self, version=None, command_output=None):
 		""" Show a friendly error message regarding the blender executable or version. """
@@ -680,6 +915,10 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 			child_source_full = os.path.join(self.output_dir, self.unique_folder_name, child_path)
 			child_target_full = os.path.join(target_folder, child_path)
 			
+			# skip the preview frames (and any other folders)
+			if os.path.isdir(child_source_full):
+				continue
+			
 			if not first_image and ".png" in child_target_full:
 				# remember first image in the sequence
 				first_image = child_target_full
@@ -721,12 +960,28 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 		""" Render an images sequence of the current template using Blender 2.62+ and the
 		Blender Python API. """
 		
+		if frame:
+			# has this preview frame already been rendered (with the same params)?
+			image_path = self.get_cached_preview(frame)
+			if image_path:
+				self.update_image(image_path)
+				return
+			
+			# stop rendering frames in the background (so this frame is rendered as fast as possible)
+			self.stop_prefetch()
+		else:
+			# stop rendering preview frames (the real render is starting)
+			self.stop_prefetch()
+		
 		# change cursor to "please wait"
 		self.frm3dGenerator.window.set_cursor(gtk.gdk.Cursor(150))
 
 		blend_file_path = os.path.join(self.project.BLENDER_DIR, "blend", self.selected_template)
 		source_script = os.path.join(self.project.BLENDER_DIR, "scripts", self.selected_template.replace(".blend", ".py"))
 		target_script = os.path.join(self.output_dir, self.unique_folder_name, self.selected_template.replace(".blend", ".py"))
+		if frame:
+			# each preview request gets its own script (the Blender worker can still be reading the previous one)
+			target_script = target_script.replace(".py", "_preview_%s.py" % uuid.uuid1())
 
 		# Copy the .py script associated with this template to the temp folder.  This will allow
 		# OpenShot to inject the user-entered params into the Python script.
@@ -735,31 +990,58 @@ class frm3dGenerator(SimpleGtkBuilderApp):
 		# Open new temp .py file, and inject the user parameters
 		self.inject_params(target_script, frame)
 		
+		# Skip the previous preview frame (if it's still waiting for the Blender worker)
+		if self.my_blender and self.my_blender.is_waiting:
+			self.my_blender.skipped = True
+		
 		# Create new thread to launch the Blender executable (and read the output)
 		self.my_blender = None
 		if frame:
-			# preview mode 
-			self.my_blender = BlenderCommand(self, blend_file_path, target_script, True)
+			# preview mode (rendered by the long-lived Blender process)
+			self.my_blender = BlenderCommand(self, blend_file_path, target_script, True, worker=self.blender_worker)
+			self.my_blender.params_hash = self.get_params_hash()
+			self.my_blender.frame = frame
+			
+			# Start blender thread
+			self.my_blender.start()
+			
 		else:
-			# render mode
-			self.my_blender = BlenderCommand(self, blend_file_path, target_script, False)
+			# render mode (split the frames across several Blender processes, each
+			# with its own copy of the script)
+			start_frame = int(self.params["start_frame"])
+			end_frame = self.get_animation_length()
+			workers = self.get_render_workers(end_frame - start_frame + 1)
+			threads = max(cpu_count / workers, 1)
 			
-		# Start blender thread
-		self.my_blender.start()
+			self.render_workers = []
+			for index, frame_range in enumerate(self.split_frames(start_frame, end_frame, workers)):
+				worker_script = target_script
+				if workers > 1:
+					worker_script = target_script.replace(".py", "_%d.py" % index)
+					shutil.copy(source_script, worker_script)
+					self.inject_params(worker_script, frame_range=frame_range)
+					self.render_workers.append(BlenderCommand(self, blend_file_path, worker_script, False, threads))
+				else:
+					self.render_workers.append(BlenderCommand(self, blend_file_path, worker_script, False))
+					
+			# Start blender threads (Blender saves each frame with its frame number, so
+			# the image sequence is assembled in order)
+			for blender in self.render_workers:
+				blender.start()
 		
 		print "Done with Render() method"
 		
 		
 
 class BlenderCommand(threading.Thread):
-	def __init__(self, frm3dGenerator, blend_file_path, target_script, preview_mode=False):
+	def __init__(self, frm3dGenerator, blend_file_path, target_script, preview_mode=False, threads=None, worker=None):
 		# Init regex expression used to determine blender's render progress
 		
 		# get the blender executable path
 		self.blender_exec_path = frm3dGenerator.form.settings.general["blender_command"]
 		self.blender_frame_expression = re.compile(r"Fra:([0-9,]*).*Mem:(.*?) .*Part ([0-9,]*)-([0-9,]*)")
 		self.blender_saved_expression = re.compile(r"Saved: (.*?) Time: (.*)")
-		self.blender_version = re.compile(r"Blender (.*?) ")
+		self.image_frame_expression = re.compile(r"([0-9]+)\.[^./]*$")
 		self.blend_file_path = blend_file_path
 		self.target_script = target_script
 		self.frm3dGenerator = frm3dGenerator
@@ -767,6 +1049,16 @@ class BlenderCommand(threading.Thread):
 		self.frame_detected = False
 		self.version = None
 		self.command_output = ""
+		self.threads = threads
+		self.worker = worker
+		self.is_waiting = worker != None
+		self.skipped = False
+		self.frames_saved = 0
+		self.current_frame = None
+		self.params_hash = None
+		self.frame = None
+		self.error_args = None
+		self.was_killed = False
 		self.process = None
 		self.is_running = True
 		
@@ -777,51 +1069,73 @@ class BlenderCommand(threading.Thread):
 		""" Kill the running process, if any """
 		
 		self.is_running = False
+		self.was_killed = True
 
 		if self.process:
-			# kill
-			self.process.kill()
-		else:
-			# close window if thread was killed
-			gobject.idle_add(self.frm3dGenerator.close_window)
+			# kill (the window is closed when this thread finishes)
+			try:
+				self.process.kill()
+			except OSError:
+				# process has already exited
+				pass
 		
 
 	def run(self):
+		
+		if self.worker:
+			# only 1 request at a time can use the Blender worker
+			self.worker.lock.acquire()
+			try:
+				self.is_waiting = False
+				if self.skipped or self.was_killed:
+					# a newer preview frame was requested (or the window closed) while waiting
+					self.finished()
+				else:
+					self.run_blender()
+			finally:
+				self.worker.lock.release()
+		else:
+			self.run_blender()
+			
+	def run_blender(self):
 
 		try:
 			# Shell the blender command to create the image sequence
-			command_get_version = [self.blender_exec_path, '-v']
 			command_render = [self.blender_exec_path, '-b', self.blend_file_path , '-P', self.target_script]
-			self.process = subprocess.Popen(command_get_version, stdout=subprocess.PIPE)
+			if self.threads:
+				# limit the render threads used by this Blender process
+				command_render[3:3] = ['-t', str(self.threads)]
 			
-			# Check the version of Blender
-			self.version = self.blender_version.findall(self.process.stdout.readline())
+			# Check the version of Blender (only once per session)
+			self.version = get_blender_version(self.blender_exec_path)
 
 			if self.version:
 				if float(self.version[0]) < 2.62:
-					# change cursor to "default" and stop running blender command
-					gobject.idle_add(self.frm3dGenerator.frm3dGenerator.window.set_cursor, None)
-					self.is_running = False
-					
 					# Wrong version of Blender.  Must be 2.62+:
-					gobject.idle_add(self.frm3dGenerator.error_with_blender, float(self.version[0]))
+					self.error_args = (float(self.version[0]), None)
+					self.finished()
 					return
 			
-			# debug info
-			print "Blender command: %s %s '%s' %s '%s'" % (command_render[0], command_render[1], command_render[2], command_render[3], command_render[4])
+			if self.worker:
+				# Send the request to the long-lived Blender process
+				print "Blender worker request: '%s' '%s'" % (self.blend_file_path, self.target_script)
+				self.process = self.worker.request(self.blend_file_path, self.target_script)
+			else:
+				# debug info
+				print "Blender command: %s" % " ".join(["'%s'" % arg for arg in command_render])
+				
+				# Run real command to render Blender project
+				self.process = subprocess.Popen(command_render, stdout=subprocess.PIPE)
 			
-			# Run real command to render Blender project
-			self.process = subprocess.Popen(command_render, stdout=subprocess.PIPE)
+			# was this thread killed while starting the process?
+			if self.was_killed:
+				self.process.kill()
 			
 		except:
 			# Error running command.  Most likely the blender executable path in the settings
 			# is not correct, or is not the correct version of Blender (i.e. 2.62+)
-			
-			# change cursor to "default" and stop running blender command
-			gobject.idle_add(self.frm3dGenerator.frm3dGenerator.window.set_cursor, None)
-			self.is_running = False
-			
-			gobject.idle_add(self.frm3dGenerator.error_with_blender)
+			self.error_args = (None, None)
+			self.finished()
 			return
 
 		while self.is_running:
@@ -829,6 +1143,12 @@ class BlenderCommand(threading.Thread):
 			# Look for progress info in the Blender Output
 			line = self.process.stdout.readline()
 			self.command_output = self.command_output + line + "\n"	# append all output into a variable
+			
+			# Is the Blender worker done with this request?
+			if self.worker and line.startswith(("OPENSHOT_DONE", "OPENSHOT_ERROR")):
+				if line.startswith("OPENSHOT_ERROR"):
+					print "Blender worker error: %s" % line.strip()
+				break
 			output_frame = self.blender_frame_expression.findall(line)
 
 			# Does it have a match?
@@ -836,6 +1156,10 @@ class BlenderCommand(threading.Thread):
 				# Yes, we have a match
 				self.frame_detected = True
 				current_frame = output_frame[0][0]
+				try:
+					self.current_frame = int(current_frame.replace(",", ""))
+				except ValueError:
+					pass
 				memory = output_frame[0][1]
 				current_part = output_frame[0][2]
 				max_parts = output_frame[0][3]
@@ -856,36 +1180,103 @@ class BlenderCommand(threading.Thread):
 				time_saved = output_saved[0][1]
 				
 				# Update preview image
-				gobject.idle_add(self.frm3dGenerator.update_image, image_path)
+				self.frames_saved += 1
+				if self.preview_mode:
+					# get the frame number (from the image file name)
+					saved_frame = self.image_frame_expression.findall(image_path)
+					if saved_frame:
+						saved_frame = int(saved_frame[0])
+					else:
+						saved_frame = self.frame or self.current_frame
+					
+					# add frame to the preview cache (and show it, if it's the frame being previewed)
+					gobject.idle_add(self.frm3dGenerator.preview_frame_saved, self, saved_frame, image_path)
+				else:
+					gobject.idle_add(self.frm3dGenerator.update_image, image_path)
+				
+				# Update (merged) progress bar
+				if not self.preview_mode and len(self.frm3dGenerator.render_workers) > 1:
+					gobject.idle_add(self.frm3dGenerator.update_progress_bar, 0, 0, 0)
 			
 			# Are we done? Should we exit the loop?	
 			if line == '' and self.process.poll() != None:
 				break
 
 				
-		# change cursor to "default"
-		gobject.idle_add(self.frm3dGenerator.frm3dGenerator.window.set_cursor, None)
-
 		# Check if NO FRAMES are detected
-		if not self.frame_detected:
+		if not self.frame_detected and not self.was_killed:
 			# Show Error that no frames are detected.  This is likely caused by
 			# the wrong command being executed... or an error in Blender.
 			print "No frame was found in the output from Blender"
-			gobject.idle_add(self.frm3dGenerator.error_with_blender, None, _("No frame was found in the output from Blender"))
-		
-		# Done with render (i.e. close window)
-		elif not self.preview_mode:
-			# only close window if in 'render' mode
-			gobject.idle_add(self.frm3dGenerator.render_finished)
+			self.error_args = (None, _("No frame was found in the output from Blender"))
 			
 		# Thread finished
 		print "Blender render thread finished"
-		if self.is_running == False:
-			# close window if thread was killed
-			gobject.idle_add(self.frm3dGenerator.close_window)
-			
+		self.finished()
+		
+	def finished(self):
+		""" Mark this thread as finished, and let the generator window know (i.e. to show errors,
+		add the image sequence to the project, or close the window) """
+		
 		# mark thread as finished
 		self.is_running = False
+		gobject.idle_add(self.frm3dGenerator.blender_finished, self)
+
+
+class BlenderWorker():
+	""" A long-lived Blender process, started with the worker.py control script.  Requests
+	(a .blend file and a script with injected params) are sent over stdin, and Blender's
+	output is read from stdout, so each preview frame doesn't need a new Blender process. """
+	
+	def __init__(self, blender_exec_path, worker_script):
+		self.blender_exec_path = blender_exec_path
+		self.worker_script = worker_script
+		self.process = None
+		
+		# only 1 request at a time (held by the BlenderCommand using the worker)
+		self.lock = threading.Lock()
+		
+	def is_alive(self):
+		""" Is the Blender process running? """
+		return self.process != None and self.process.poll() == None
+		
+	def start(self, blend_file_path):
+		""" Start the Blender process, and wait until the worker script is ready """
+		
+		command_worker = [self.blender_exec_path, '-b', blend_file_path, '-P', self.worker_script]
+		print "Blender worker command: %s" % " ".join(["'%s'" % arg for arg in command_worker])
+		self.process = subprocess.Popen(command_worker, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+		
+		# skip Blender's startup output
+		while True:
+			line = self.process.stdout.readline()
+			if line.startswith("OPENSHOT_READY"):
+				break
+			if line == '' and self.process.poll() != None:
+				raise OSError("Blender worker failed to start")
+				
+	def request(self, blend_file_path, script_path):
+		""" Send a render request to the Blender process (starting it if needed), and return
+		the process (whose output is read until OPENSHOT_DONE) """
+		
+		if not self.is_alive():
+			self.start(blend_file_path)
+			
+		self.process.stdin.write("RENDER\t%s\t%s\n" % (blend_file_path, script_path))
+		self.process.stdin.flush()
+		return self.process
+	
+	def stop(self):
+		""" Stop the Blender process (if any) """
+		
+		if self.is_alive():
+			try:
+				self.process.stdin.write("QUIT\n")
+				self.process.stdin.close()
+			except IOError:
+				# process has already exited
+				pass
+		self.process = None
 
 		
 			
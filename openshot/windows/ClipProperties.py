@@ -1019,19 +1019,8 @@ class frmClipProperties(SimpleGtkBuilderApp):
 			# mark project as modified
 			self.project.set_project_modified(is_modified=True, refresh_xml=True, type = self._("Modified clip properties"))
 			
-			# remove from canvas
-			parent = self.current_clip_item.get_parent()
-			child_num = parent.find_child (self.current_clip_item)
-			parent.remove_child (child_num)
-			
-			# re-render just this clip
-			self.current_clip.RenderClip()
-			
-			# raise all transitions
-			self.project.sequences[0].raise_transitions()
-			
-			# raise the play-head
-			self.project.sequences[0].raise_play_head()
+			# re-render just the changed clips (i.e. this clip, or all clips on this track)
+			self.project.Render()
 			
 			# check if the timeline needs to be expanded
 			self.form.expand_timeline(self.current_clip)
@@ -0,0 +1,94 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import gtk
+from classes import consolidate, messagebox
+from windows.SimpleGtkBuilderApp import SimpleGtkBuilderApp
+
+# init the foriegn language
+import language.Language_Init as Language_Init
+
+
+class frmConsolidateProgress(SimpleGtkBuilderApp):
+	""" Consolidate a project in the background, and show the progress (with a cancel button).  This
+	window uses the same layout as the import progress window. """
+
+	def __init__(self, path="ImportProgress.ui", root="frmImportProgress", domain="OpenShot", form=None, project=None, folder=None, trim=False, archive=False, **kwargs):
+		SimpleGtkBuilderApp.__init__(self, os.path.join(project.UI_DIR, path), root, domain, **kwargs)
+
+		# Add language support
+		_ = Language_Init.Translator(project).lang.gettext
+		self._ = _
+
+		self.form = form
+		self.project = project
+		self.closed = False
+		self.frmImportProgress.set_title(_("Consolidating Project"))
+		self.frmImportProgress.set_transient_for(self.form.frmMain)
+		self.lblStatus.set_text(_("Copying files..."))
+
+		# start copying
+		self.consolidator = consolidate.consolidator(project, folder, trim, archive, self.update_progress, self.consolidate_finished)
+		self.consolidator.start()
+
+	def update_progress(self, consolidator):
+		""" Show the number of files copied """
+		_ = self._
+
+		if self.closed:
+			return False
+		self.lblStatus.set_text(_("Copying file %(current)d of %(total)d") % {"current" : consolidator.processed_jobs, "total" : len(consolidator.jobs)})
+		self.progressImport.set_fraction(float(consolidator.processed_jobs) / max(len(consolidator.jobs), 1))
+		return False
+
+	def consolidate_finished(self, consolidator):
+		""" Close the window, and report the results """
+		_ = self._
+
+		# don't cancel the (finished) copy when the window is destroyed
+		self.consolidator = None
+		if not self.closed:
+			self.frmImportProgress.destroy()
+
+		if consolidator.cancelled:
+			return False
+
+		if consolidator.save_error:
+			messagebox.show(_("OpenShot Error"), _("The consolidated project could not be saved: %s") % consolidator.save_error)
+			return False
+
+		message = _("The project was consolidated to %s.") % (consolidator.archive_path or consolidator.project_path)
+		if consolidator.missing_files or consolidator.failed_files:
+			message += "\n\n" + _("The following file(s) could not be copied.") + "\n\n" + "\n".join(consolidator.missing_files + consolidator.failed_files) + "\n"
+		messagebox.show("OpenShot", message)
+		return False
+
+	def on_btnCancel_clicked(self, widget, *args):
+		""" Stop copying files """
+		_ = self._
+
+		if self.consolidator:
+			self.consolidator.cancel()
+			self.lblStatus.set_text(_("Cancelling..."))
+			self.btnCancel.set_sensitive(False)
+
+	def on_frmImportProgress_destroy(self, widget, *args):
+		self.closed = True
+		if self.consolidator:
+			self.consolidator.cancel()
@@ -26,10 +26,9 @@ except:
 		
 import os
 import gtk
-import xml.dom.minidom as xml
 import locale
 
-from classes import messagebox, profiles, project, video
+from classes import messagebox, profiles, project, video, render_stats, export_presets
 from windows.SimpleGtkBuilderApp import SimpleGtkBuilderApp
 from windows import UploadVideo
 from uploads.manager import UploadManager
@@ -60,6 +59,9 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		
 		self.invalid_codecs = []
 		
+		# load the profiles (once, for all the dropdowns)
+		self.mlt_profiles = profiles.mlt_profiles(self.project)
+		
 		# init the project type properties
 		self.init_properties(self.cmbProjectType.get_active_text())
 		
@@ -75,7 +77,7 @@ class frmExportVideo(SimpleGtkBuilderApp):
 			self.fileExportFolder.set_current_folder(self.project.folder)
 		
 		# init the list of possible project types / profiles
-		self.profile_list = profiles.mlt_profiles(self.project).get_profile_list()
+		self.profile_list = self.mlt_profiles.get_profile_list()
 		
 		# loop through each profile, and add it to the dropdown
 		for file_name, p in self.profile_list:
@@ -115,6 +117,8 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		
 
 		#populate the format/codec drop downs 
+		self.form.load_avformats()
+		
 		#formats
 		format_model = self.cboVIdeoFormat.get_model()
 		format_model.clear()
@@ -144,15 +148,16 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		self.set_project_type_dropdown()
 		self.set_export_to_dropdown()
 		
-		#load the simple project type dropdown
-		presets = []
-		for file in os.listdir(self.project.EXPORT_PRESETS_DIR):
-			xmldoc = xml.parse(os.path.join(self.project.EXPORT_PRESETS_DIR,file))
-			type = xmldoc.getElementsByTagName("type")
-			presets.append(_(type[0].childNodes[0].data))
-		#exclude duplicates
-		presets = list(set(presets))
-		for item in sorted(presets):
+		#load the simple project type dropdown (from the catalog of export presets, which
+		#is only parsed once), and index the translated types and targets
+		self.preset_catalog = export_presets.get_catalog(self.project)
+		self.preset_types = {}
+		for type in self.preset_catalog.get_types():
+			self.preset_types[_(type)] = type
+		self.preset_titles = {}
+		for preset in self.preset_catalog.presets:
+			self.preset_titles[_(preset.title)] = preset
+		for item in sorted(self.preset_types.keys()):
 			self.cboSimpleProjectType.append_text(item)
 			
 		#indicate that exporting cancelled
@@ -287,17 +292,11 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		_ = self._
 		
 		
-		#parse the xml files and get targets that match the project type
+		#get the targets that match the project type
 		selected_project = self.cboSimpleProjectType.get_active_text()
 		project_types = []
-		for file in os.listdir(self.project.EXPORT_PRESETS_DIR):
-			xmldoc = xml.parse(os.path.join(self.project.EXPORT_PRESETS_DIR,file))
-			type = xmldoc.getElementsByTagName("type")
-			
-			if _(type[0].childNodes[0].data) == selected_project:
-				titles = xmldoc.getElementsByTagName("title")
-				for title in titles:
-					project_types.append(_(title.childNodes[0].data))
+		for preset in self.preset_catalog.get_presets_by_type(self.preset_types.get(selected_project)):
+			project_types.append(_(preset.title))
 		
 		
 		for item in sorted(project_types):
@@ -337,52 +336,40 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		if self.cboSimpleTarget.get_active_text():
 			selected_target = self.cboSimpleTarget.get_active_text()
 			profiles_list = []
-			
-			#parse the xml to return suggested profiles
-			for file in os.listdir(self.project.EXPORT_PRESETS_DIR):
-				xmldoc = xml.parse(os.path.join(self.project.EXPORT_PRESETS_DIR,file))
-				title = xmldoc.getElementsByTagName("title")
-				if _(title[0].childNodes[0].data) == selected_target:
-					profiles = xmldoc.getElementsByTagName("projectprofile")
-					
-					#get the basic profile
-					if profiles:
-						# if profiles are defined, show them
-						for profile in profiles:
-							profiles_list.append(_(profile.childNodes[0].data))
-					else:
-						# show all profiles
-						for profile_node in self.profile_list:
-							profiles_list.append(_(profile_node[0]))
-					
-					#get the video bit rate(s)
-					videobitrate = xmldoc.getElementsByTagName("videobitrate")
-					for rate in videobitrate:
-						v_l = rate.attributes["low"].value
-						v_m = rate.attributes["med"].value
-						v_h = rate.attributes["high"].value
-						self.vbr = {_("Low"): v_l, _("Med"): v_m, _("High"): v_h}
-
-					#get the audio bit rates
-					audiobitrate = xmldoc.getElementsByTagName("audiobitrate")
-					for audiorate in audiobitrate:
-						a_l = audiorate.attributes["low"].value
-						a_m = audiorate.attributes["med"].value
-						a_h = audiorate.attributes["high"].value
-						self.abr = {_("Low"): a_l, _("Med"): a_m, _("High"): a_h}
-					
-					#get the remaining values
-					vf = xmldoc.getElementsByTagName("videoformat")
-					self.videoformat = vf[0].childNodes[0].data
-					vc = xmldoc.getElementsByTagName("videocodec")
-					self.videocodec = vc[0].childNodes[0].data
-					ac = xmldoc.getElementsByTagName("audiocodec")
-					self.audiocodec = ac[0].childNodes[0].data
-					sr = xmldoc.getElementsByTagName("samplerate")
-					self.samplerate = sr[0].childNodes[0].data
-					c = xmldoc.getElementsByTagName("audiochannels")
-					self.audiochannels = c[0].childNodes[0].data
-					
+			v_l = v_m = v_h = a_l = a_m = a_h = ""
+			
+			#get the preset of the target, and its suggested profiles
+			preset = self.preset_titles.get(selected_target)
+			if preset:
+				#get the basic profile
+				if preset.profiles:
+					# if profiles are defined, show them
+					for profile in preset.profiles:
+						profiles_list.append(_(profile))
+				else:
+					# show all profiles
+					for profile_node in self.profile_list:
+						profiles_list.append(_(profile_node[0]))
+				
+				#get the video bit rate(s)
+				v_l = preset.videobitrate["low"]
+				v_m = preset.videobitrate["med"]
+				v_h = preset.videobitrate["high"]
+				self.vbr = {_("Low"): v_l, _("Med"): v_m, _("High"): v_h}
+
+				#get the audio bit rates
+				a_l = preset.audiobitrate["low"]
+				a_m = preset.audiobitrate["med"]
+				a_h = preset.audiobitrate["high"]
+				self.abr = {_("Low"): a_l, _("Med"): a_m, _("High"): a_h}
+				
+				#get the remaining values
+				self.videoformat = preset.videoformat
+				self.videocodec = preset.videocodec
+				self.audiocodec = preset.audiocodec
+				self.samplerate = preset.samplerate
+				self.audiochannels = preset.audiochannels
+				
 			# init the profiles combo
 			for item in sorted(profiles_list):
 				self.cboSimpleVideoProfile.append_text(item)
@@ -420,7 +407,7 @@ class frmExportVideo(SimpleGtkBuilderApp):
 			profile = str(self.cboSimpleVideoProfile.get_active_text())
 			
 			#does this profile exist?
-			p = profiles.mlt_profiles(self.project).get_profile(profile)
+			p = self.mlt_profiles.get_profile(profile)
 			
 			if str(p.description()) != profile:
 				messagebox.show(_("Error!"), _("%s is not a valid OpenShot profile. Profile settings will not be applied." % profile))
@@ -523,7 +510,7 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		
 		# get the mlt profile
 		localType = profile 
-		p = profiles.mlt_profiles(self.project).get_profile(localType)
+		p = self.mlt_profiles.get_profile(localType)
 
 		# populate the labels with values
 		self.lblHeightValue.set_text(str(p.height()))
@@ -781,7 +768,7 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		#user agrees to overwrite the file
 		self.do_export()
 		
-	def update_progress(self, new_percentage):
+	def update_progress(self, new_percentage, stats=None):
 		
 		# get correct gettext method
 		_ = self._
@@ -789,6 +776,12 @@ class frmExportVideo(SimpleGtkBuilderApp):
 		# update the percentage complete
 		self.progressExportVideo.set_fraction(new_percentage)
 		
+		# show the render statistics (fps, time remaining, bitrate, CPU)
+		if stats:
+			self.progressExportVideo.set_text(render_stats.format_status(stats))
+		elif new_percentage == 1:
+			self.progressExportVideo.set_text("")
+		
 		# if progress bar is 100%, close window
 		if new_percentage == 1 and self.export_in_progress:
 			# show message
@@ -0,0 +1,82 @@
+#	OpenShot Video Editor is a program that creates, modifies, and edits video files.
+#   Copyright (C) 2009  Jonathan Thomas
+#
+#	This file is part of OpenShot Video Editor (http://launchpad.net/openshot/).
+#
+#	OpenShot Video Editor is free software: you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation, either version 3 of the License, or
+#	(at your option) any later version.
+#
+#	OpenShot Video Editor is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with OpenShot Video Editor.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import gtk
+from classes import bulk_import
+from windows.SimpleGtkBuilderApp import SimpleGtkBuilderApp
+
+# init the foriegn language
+import language.Language_Init as Language_Init
+
+
+class frmImportProgress(SimpleGtkBuilderApp):
+	""" Import files and folders in the background, and show the progress (with a cancel button) """
+
+	def __init__(self, path="ImportProgress.ui", root="frmImportProgress", domain="OpenShot", form=None, project=None, paths=[], recursive=True, detect_scenes=False, finished_callback=None, **kwargs):
+		SimpleGtkBuilderApp.__init__(self, os.path.join(project.UI_DIR, path), root, domain, **kwargs)
+
+		# Add language support
+		self._ = Language_Init.Translator(project).lang.gettext
+
+		self.form = form
+		self.project = project
+		self.finished_callback = finished_callback
+		self.closed = False
+		self.frmImportProgress.set_transient_for(self.form.frmMain)
+
+		# start the import
+		self.importer = bulk_import.bulk_import(project, paths, recursive, self.update_progress, self.import_finished, detect_scenes)
+		self.importer.start()
+
+	def update_progress(self, importer):
+		""" Show the number of files inspected """
+		_ = self._
+
+		if self.closed:
+			return
+		if importer.scanning:
+			self.progressImport.pulse()
+		elif importer.total_files:
+			self.lblStatus.set_text(_("Importing file %(current)d of %(total)d") % {"current" : importer.processed_files, "total" : importer.total_files})
+			self.progressImport.set_fraction(float(importer.processed_files) / importer.total_files)
+
+	def import_finished(self, importer):
+		""" Close the window, and report the results """
+
+		# don't cancel the (finished) import when the window is destroyed
+		self.importer = None
+		if not self.closed:
+			self.frmImportProgress.destroy()
+
+		if self.finished_callback:
+			self.finished_callback(importer)
+
+	def on_btnCancel_clicked(self, widget, *args):
+		""" Stop inspecting files (the files already inspected are still imported) """
+		_ = self._
+
+		if self.importer:
+			self.importer.cancel()
+			self.lblStatus.set_text(_("Cancelling..."))
+			self.btnCancel.set_sensitive(False)
+
+	def on_frmImportProgress_destroy(self, widget, *args):
+		self.closed = True
+		if self.importer:
+			self.importer.cancel()
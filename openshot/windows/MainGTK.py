@@ -28,12 +28,15 @@ import pango
 import webbrowser
 import subprocess
 import shutil
+import threading
+from cStringIO import StringIO
 
 import classes.effect as effect
-from classes import files, lock, messagebox, open_project, project, timeline, tree, video, inputbox, av_formats, clip
+from classes import files, lock, messagebox, open_project, project, timeline, tree, video, inputbox, av_formats, clip, waveform, silence_detect, autosave, validate_project, consolidate
+from classes.startup_profiler import profiler
 from windows import About, FileProperties, NewProject, OpenProject, preferences, Profiles
 from windows.SimpleGtkBuilderApp import SimpleGtkBuilderApp
-from windows import AddFiles, ClipProperties, ExportVideo, UploadVideo, ImportImageSeq, Titles, TransitionProperties, TreeFiles, IcvTransitions, TreeEffects, TreeHistory, BlenderGenerator, AddToTimeline, ImportTransitions, ExportXML
+from windows import AddFiles, ClipProperties, ExportVideo, UploadVideo, ImportImageSeq, Titles, TransitionProperties, TreeFiles, IcvTransitions, TreeEffects, TreeHistory, BlenderGenerator, AddToTimeline, ImportTransitions, ExportXML, ImportProgress, ConsolidateProgress
 
 # init the foreign language
 from language import Language_Init
@@ -50,6 +53,7 @@ class frmMain(SimpleGtkBuilderApp):
 
         # Load the Glade form using the SimpleGtkBuilderApp module
         SimpleGtkBuilderApp.__init__(self, os.path.join(project.UI_DIR, path), root, domain, **kwargs)
+        profiler.mark("load main window ui")
 
         # Add language support
         _ = Language_Init.Translator(project).lang.gettext
@@ -65,6 +69,17 @@ class frmMain(SimpleGtkBuilderApp):
         self.is_maximized = False
         self.import_files_dialog = None
         self.import_image_seq_dialog = None
+        
+        # Start the thread which creates the audio peak files (for waveforms)
+        self.peak_extractor = waveform.peak_extractor(self)
+        self.peak_extractor.start()
+        
+        # Start the thread which writes the autosave snapshots (and the journal of edits)
+        self.autosave_writer = autosave.autosave_writer()
+        self.autosave_writer.start()
+        
+        # the thread which checks the media and thumbnails of the opened project
+        self.project_validator = None
         self._SHIFT = False
         self._ALT = False
         self._CTRL = False
@@ -89,9 +104,10 @@ class frmMain(SimpleGtkBuilderApp):
         self.timeline_scroll_start_x = 0
         self.timeline_scroll_start_y = 0
         
-        # Init Effects List
-        self.effect_list = effect.get_effects(self.project)
-        self.blender_list = effect.get_effects(self.project, self.project.BLENDER_DIR)
+        # Init Effects List (these are loaded the first time they are needed, or
+        # when the main window is idle after it's first shown)
+        self.effect_list = None
+        self.blender_list = None
         
         # Init track variables
         self.AllTracks = []
@@ -184,6 +200,7 @@ class frmMain(SimpleGtkBuilderApp):
 
         mnurecent = self.mnuRecent
         mnurecent.set_submenu(recent_menu_chooser)
+        profiler.mark("create canvases & trees")
 
         ###################
         
@@ -226,11 +243,19 @@ class frmMain(SimpleGtkBuilderApp):
         # Load Autosave settings
         self.load_autosave_settings()
         
-        #get the formats/codecs
-        melt_command = self.settings.general["melt_command"]
-        self.get_avformats(melt_command)
+        profiler.mark("load settings")
+        
+        #the formats/codecs are detected the first time they are needed (or
+        #when the main window is idle after it's first shown)
+        self.vcodecs = None
+        self.acodecs = None
+        self.vformats = None
+        self.filters = None
+        self.has_frei0r_installed = None
+        self.capabilities = None
         
         # Show Window
+        self.first_expose_handler = self.frmMain.connect("expose-event", self.on_frmMain_first_expose_event)
         self.frmMain.show()
 
         # init the track menu
@@ -256,6 +281,7 @@ class frmMain(SimpleGtkBuilderApp):
         self.mnuClip1.mnuRotate.set_submenu(self.mnuRotateSubMenu1.mnuRotateSubMenuPopup)
         self.mnuClip1.mnuAnimate.set_submenu(self.mnuAnimateSubMenu1.mnuAnimateSubMenuPopup)
         self.mnuClip1.mnuPosition.set_submenu(self.mnuPositionSubMenu1.mnuPositionSubMenuPopup)
+        profiler.mark("create menus")
         
         ###################
 
@@ -333,6 +359,7 @@ class frmMain(SimpleGtkBuilderApp):
         self.new_clip_object = None
         self.new_trans_object = None
         self.new_transition = None
+        profiler.mark("init drag n drop")
         
         # Init modified status
         self.project.set_project_modified(is_modified=False, refresh_xml=True)
@@ -340,9 +367,11 @@ class frmMain(SimpleGtkBuilderApp):
         # Refresh the MLT XML file
         # and INIT the video thread
         self.project.RefreshXML()
+        profiler.mark("refresh mlt xml")
         
         # Check for files being passed into OpenShot
         self.check_args()
+        profiler.mark("check args")
         
         # put initial event on history stack
         history_state = (_("Session started"), self.project.state)
@@ -358,6 +387,44 @@ class frmMain(SimpleGtkBuilderApp):
         self.treeFiles.grab_focus()
 
         self.frmMain.maximize()
+        profiler.mark("init main window")
+        
+    def on_frmMain_first_expose_event(self, widget, *args):
+        """ The main window has been drawn for the first time, so load the things which
+        were not needed to show it (when the main loop is idle) """
+        
+        self.frmMain.disconnect(self.first_expose_handler)
+        profiler.first_window()
+        gobject.idle_add(self.load_deferred)
+        
+    def load_deferred(self):
+        """ Load the formats / codecs and the effects (unless they have already been loaded) """
+        
+        self.load_avformats()
+        profiler.mark("detect formats & codecs")
+        self.get_effect_list()
+        profiler.mark("load effects")
+        self.get_blender_list()
+        profiler.mark("load blender effects")
+        profiler.report()
+        return False
+        
+    def get_effect_list(self):
+        """ Get the list of effects (which are loaded the first time they are needed) """
+        if self.effect_list == None:
+            self.effect_list = effect.get_effects(self.project)
+        return self.effect_list
+        
+    def get_blender_list(self):
+        """ Get the list of blender effects (which are loaded the first time they are needed) """
+        if self.blender_list == None:
+            self.blender_list = effect.get_effects(self.project, self.project.BLENDER_DIR)
+        return self.blender_list
+        
+    def load_avformats(self):
+        """ Detect the formats, codecs, and filters (unless they have already been detected) """
+        if self.vcodecs == None:
+            self.get_avformats(self.settings.general["melt_command"])
 
     def load_autosave_settings(self):
         #autosave settings
@@ -376,26 +443,24 @@ class frmMain(SimpleGtkBuilderApp):
         return self._(text)
 
 
-    def get_avformats(self, melt_command):
+    def get_avformats(self, melt_command, refresh=False):
+        """ Get the formats, codecs, and filters from the capability cache (and detect them
+        if the cache is missing, or refresh them in the background if it's stale) """
         
         # get translation object
         _ = self._
         
-        # output message
-        print "\nDetecting formats, codecs, and filters..."
+        self.capabilities = av_formats.capabilities(melt_command, os.path.join(self.project.USER_DIR, "capabilities.cache"))
+        if refresh or not self.capabilities.load():
+            # output message
+            print "\nDetecting formats, codecs, and filters..."
+            self.capabilities.detect()
+        elif self.capabilities.is_stale:
+            # MLT (or a plugin) has changed, use the old lists until the new ones are detected
+            print "\nRefreshing formats, codecs, and filters in the background..."
+            self.capabilities.detect_in_background(self.set_avformats)
         
-        #populate the codecs
-        formats = av_formats.formats(melt_command)
-        #video codecs
-        self.vcodecs = formats.get_vcodecs()
-        #audio codecs
-        self.acodecs = formats.get_acodecs()
-        #formats
-        self.vformats = formats.get_formats()
-        #mlt filters
-        self.filters = formats.get_filters()
-        #check for frei0r effect library
-        self.has_frei0r_installed = formats.has_frei0r_installed()
+        self.set_avformats(self.capabilities)
         
         # show warning about frei0r effects
         if self.has_frei0r_installed == False:
@@ -403,6 +468,22 @@ class frmMain(SimpleGtkBuilderApp):
             messagebox.show(_("Error"), _("Not all effects can be loaded. OpenShot can not find the frei0r effect library installed. Please install the frei0r-plugins package from your package manager.\n\nOpenShot will still continue to work, but will have less effects to choose from."))
         
 
+    def set_avformats(self, capabilities):
+        """ Use the formats, codecs, and filters of a capability cache """
+        
+        self.capabilities = capabilities
+        #video codecs
+        self.vcodecs = capabilities.vcodecs
+        #audio codecs
+        self.acodecs = capabilities.acodecs
+        #formats
+        self.vformats = capabilities.vformats
+        #mlt filters
+        self.filters = capabilities.filters
+        #check for frei0r effect library
+        self.has_frei0r_installed = capabilities.has_frei0r_installed
+        return False
+
     def	save_project_state(self, type):
         print "project state modified"
             
@@ -423,6 +504,9 @@ class frmMain(SimpleGtkBuilderApp):
         # retrieves project state property (returns a StringIO object)
         state = self.project.state
         
+        # add this edit to the journal (for crash recovery)
+        self.journal_state(type, state)
+        
         # builds a tuple with action description string and StringIO object
         history_state = (type, state)
         
@@ -438,6 +522,50 @@ class frmMain(SimpleGtkBuilderApp):
         self.refresh_history()
 
     
+    def get_project_path(self):
+        """ Get the path of the project file (or None if the project has never been saved) """
+        if self.project.folder == self.project.USER_DIR:
+            return None
+        return "%s/%s.osp" % (self.project.folder, self.project.name)
+        
+        
+    def journal_state(self, type, state):
+        """ Append the state of the project to its journal (written by the autosave thread), so
+        the edits made since the last save can be recovered after a crash """
+        
+        file_path = self.get_project_path()
+        if file_path and self.autosave_enabled:
+            self.autosave_writer.append_journal(file_path, type, state.getvalue())
+        
+        
+    def check_journal(self, file_path, records):
+        """ Offer to recover the edits in the journal of a project (i.e. if OpenShot crashed
+        before they were saved) """
+        
+        # get translation object
+        _ = self._
+        
+        if not records:
+            return
+        
+        (edit_time, description, state_data) = records[-1]
+        messagebox.show(_("Recover Project"), _("This project has %(count)d unsaved change(s), from when OpenShot last closed unexpectedly (the last change was '%(description)s'). Would you like to recover them?") % {"count" : len(records), "description" : description}, gtk.BUTTONS_YES_NO, self.recover_journal, None, gtk.MESSAGE_QUESTION, None, {"file_path" : file_path, "state_data" : state_data})
+        
+        
+    def recover_journal(self, parameters):
+        """ Restore the project to the last state in its journal """
+        
+        # get translation object
+        _ = self._
+        
+        self.project.restore(StringIO(parameters["state_data"]))
+        self.project.set_project_modified(is_modified=True, refresh_xml=True, type=_("Recovered unsaved changes"))
+        self.refresh()
+        
+        # check the recovered files, transitions and thumbnails again
+        self.validate_project()
+        
+        
     def refresh_history(self):
         # Tree History refresh
         
@@ -461,6 +589,7 @@ class frmMain(SimpleGtkBuilderApp):
 
             # restores project to previous state
             self.project.restore(previous_state[1])
+            self.journal_state(previous_state[0], previous_state[1])
             
             # refreshes history tree in main window and renders project
             self.refresh_history()
@@ -480,6 +609,7 @@ class frmMain(SimpleGtkBuilderApp):
             
             # restores project to previous state
             self.project.restore(next_state[1])
+            self.journal_state(next_state[0], next_state[1])
             
             # refreshes history tree in main window and renders project
             self.refresh_history()
@@ -883,12 +1013,25 @@ class frmMain(SimpleGtkBuilderApp):
 
         
     def open_project(self, file_to_open):
-        # Open the project file
+        # stop checking the current project
+        if self.project_validator:
+            self.project_validator.cancel()
+            self.project_validator = None
+        
+        # the edits of the current project are not needed anymore
+        if self.get_project_path():
+            self.autosave_writer.clear_journal(self.get_project_path())
+        
+        # read the unsaved edits of the project (if OpenShot crashed)
+        journal_records = autosave.read_journal(file_to_open)
+        
+        # Open the project file (and start a new journal)
         self.project.Open(file_to_open)
+        self.autosave_writer.clear_journal(file_to_open)
 
         # set the profile settings in the video thread
         self.project.form.MyVideo.set_profile(self.project.project_type, load_xml=False)
-        self.project.form.MyVideo.set_project(self.project, self.project.form, os.path.join(self.project.USER_DIR, "sequence.mlt"), mode="preview")
+        self.project.form.MyVideo.set_project(self.project, self.project.form, self.project.get_sequence_xml(), mode="preview")
         self.project.form.MyVideo.load_xml()
         
         #setup autosave
@@ -900,6 +1043,19 @@ class frmMain(SimpleGtkBuilderApp):
         # Update the main form
         self.refresh()
         
+        # check the media and thumbnails in the background (the project can be edited meanwhile)
+        self.validate_project()
+        
+        # offer to recover the unsaved edits (if OpenShot crashed)
+        self.check_journal(file_to_open, journal_records)
+        
+
+    def validate_project(self, report_missing=True):
+        """ Check the missing files and thumbnails of the project (in the background) """
+        if self.project_validator:
+            self.project_validator.cancel()
+        self.project_validator = validate_project.project_validator(self.project, report_missing)
+        self.project_validator.start()
 
     def new(self):
         print "A new %s has been created" % self.__class__.__name__
@@ -980,7 +1136,7 @@ class frmMain(SimpleGtkBuilderApp):
         self.OSTreeFiles.set_project(self.project)
         
         # Set the zoom scale
-        self.hsZoom.set_value(self.project.sequences[0].scale)
+        self.hsZoom.set_value(self.project.current_sequence.scale)
 
         # render timeline
         self.project.Render()
@@ -1261,7 +1417,7 @@ class frmMain(SimpleGtkBuilderApp):
                     return
 
             # get a new track object
-            self.new_clip_object = self.project.sequences[0].tracks[0].AddClip(file_name, "Gold", 0, float(0.0), float(file_length), file_object)
+            self.new_clip_object = self.project.current_sequence.tracks[0].AddClip(file_name, "Gold", 0, float(0.0), float(file_length), file_object)
 
             # get pixels per second
             pixels_per_second = self.new_clip_object.parent.parent.get_pixels_per_second()
@@ -1271,9 +1427,9 @@ class frmMain(SimpleGtkBuilderApp):
             self.new_clip = self.new_clip_object.RenderClip()
             
             # Arrange canvas items
-            self.project.sequences[0].raise_transitions()
-            self.project.sequences[0].play_head.raise_(None)
-            self.project.sequences[0].play_head_line.raise_(None)
+            self.project.current_sequence.raise_transitions()
+            self.project.current_sequence.play_head.raise_(None)
+            self.project.current_sequence.play_head_line.raise_(None)
 
         try:
             # get the x and y coordinate of the clip boundry
@@ -1304,7 +1460,7 @@ class frmMain(SimpleGtkBuilderApp):
         horizontal_scroll_value = self.hscrollbar2.get_value()
         
         # get pixels per second
-        pixels_per_second = self.project.sequences[0].get_pixels_per_second()
+        pixels_per_second = self.project.current_sequence.get_pixels_per_second()
         
         transition_name = ""
         transition_desc = ""
@@ -1323,7 +1479,7 @@ class frmMain(SimpleGtkBuilderApp):
             transition_path = model[i][2]
 
             # get a new transition object
-            self.new_trans_object = self.project.sequences[0].tracks[0].AddTransition(transition_name, float(0.0), float(6.0), transition_path)
+            self.new_trans_object = self.project.current_sequence.tracks[0].AddTransition(transition_name, float(0.0), float(6.0), transition_path)
 
             # update the position as the user drags the transition around
             self.new_trans_object.position_on_track = x / pixels_per_second
@@ -1332,9 +1488,9 @@ class frmMain(SimpleGtkBuilderApp):
             self.new_transition = self.new_trans_object.Render()
             
             # Arrange canvas items
-            self.project.sequences[0].raise_transitions()
-            self.project.sequences[0].play_head.raise_(None)
-            self.project.sequences[0].play_head_line.raise_(None)
+            self.project.current_sequence.raise_transitions()
+            self.project.current_sequence.play_head.raise_(None)
+            self.project.current_sequence.play_head_line.raise_(None)
     
         try:
             # get the x and y coordinate of the clip boundry
@@ -1375,12 +1531,12 @@ class frmMain(SimpleGtkBuilderApp):
             adjusted_x = x + horizontal_value
 
             # get new parent track
-            drop_track = self.project.sequences[0].get_valid_track(adjusted_x, adjusted_y)
+            drop_track = self.project.current_sequence.get_valid_track(adjusted_x, adjusted_y)
             
             if drop_track:
 
                 # get pixel settings
-                pixels_per_second = self.project.sequences[0].get_pixels_per_second()
+                pixels_per_second = self.project.current_sequence.get_pixels_per_second()
                 
                 # Get Effect service name
                 selected = self.icvEffects.get_selected_items()
@@ -1400,11 +1556,15 @@ class frmMain(SimpleGtkBuilderApp):
                             clip.Add_Effect(Effect_Service)
                             self.project.Render()
                 else:
-                    # APPLY EFFECT TO ALL CLIPS ON THIS TRACK
-                    for clip in drop_track.clips:
-                        # Add Effect to all Clips
-                        clip.Add_Effect(Effect_Service)
-                        self.project.Render()
+                    # APPLY EFFECT TO ALL CLIPS ON THIS TRACK (and only render once)
+                    self.project.begin_transaction()
+                    try:
+                        for clip in drop_track.clips:
+                            # Add Effect to all Clips
+                            clip.Add_Effect(Effect_Service)
+                            self.project.Render()
+                    finally:
+                        self.project.commit_transaction()
 
 
         # Drop TRANSITION
@@ -1496,12 +1656,12 @@ class frmMain(SimpleGtkBuilderApp):
         end_of_clip = position + length
         
         # get length of timeline
-        timeline_length = self.project.sequences[0].length
+        timeline_length = self.project.current_sequence.length
         
         # does timeline need to be extended?
         if end_of_clip > timeline_length:
             # update length of timeline
-            self.project.sequences[0].length = end_of_clip
+            self.project.current_sequence.length = end_of_clip
             
             # refresh timeline, but not the treeview/iconview
             self.refresh(False)
@@ -1577,7 +1737,20 @@ class frmMain(SimpleGtkBuilderApp):
             self.project.thumbnailer.amAlive = False
             
         if self.queue_watcher:
-            self.queue_watcher.amAlive = False
+            self.queue_watcher.stop()
+            
+        if self.peak_extractor:
+            self.peak_extractor.stop()
+            
+        if self.project_validator:
+            self.project_validator.cancel()
+            
+        # OpenShot is closing normally, so the journal isn't needed (and wait
+        # for the autosave thread to finish writing)
+        if self.get_project_path():
+            self.autosave_writer.clear_journal(self.get_project_path())
+        self.autosave_writer.stop()
+        self.autosave_writer.join(5.0)
             
         # wait 1/2 second (for threads to stop)
         import time
@@ -1592,8 +1765,8 @@ class frmMain(SimpleGtkBuilderApp):
         self.settings.app_state["vpane_position"] = self.vpaned2.get_position()
         self.settings.app_state["hpane_position"] = self.hpaned2.get_position()
                 
-        #save the settings
-        self.settings.save_settings_to_xml()
+        #save the settings (now, since the main loop is about to quit)
+        self.settings.write_settings()
         
         # Quit the main loop, and exit the program
         self.frmMain.destroy()
@@ -1678,6 +1851,35 @@ class frmMain(SimpleGtkBuilderApp):
         
         # open the export XML window
         ExportXML.frmExportXML(project=self.project)
+        
+    def on_mnuConsolidate_activate(self, widget, *args):
+        print "on_mnuConsolidate_activate called with self.%s" % widget.get_name()
+        _ = self._
+        
+        # choose the folder (and the options)
+        dialog = gtk.FileChooserDialog(_("Choose the folder for the consolidated project"), self.frmMain, gtk.FILE_CHOOSER_ACTION_SELECT_FOLDER, (gtk.STOCK_CANCEL, gtk.RESPONSE_CANCEL, gtk.STOCK_OK, gtk.RESPONSE_OK))
+        chkTrim = gtk.CheckButton(_("Trim unused parts of long media (keeping %d seconds before and after)") % consolidate.HANDLE_LENGTH)
+        chkArchive = gtk.CheckButton(_("Create an archive (.tar)"))
+        vbox = gtk.VBox()
+        vbox.pack_start(chkTrim, False, False)
+        vbox.pack_start(chkArchive, False, False)
+        vbox.show_all()
+        dialog.set_extra_widget(vbox)
+        response = dialog.run()
+        parent_folder = dialog.get_filename()
+        trim = chkTrim.get_active()
+        archive = chkArchive.get_active()
+        dialog.destroy()
+        if response != gtk.RESPONSE_OK or not parent_folder:
+            return
+        
+        # the project is copied to a new folder (named after the project)
+        folder = os.path.join(parent_folder, self.project.name)
+        if os.path.exists(folder) or (archive and os.path.exists(folder + ".tar")):
+            messagebox.show(_("OpenShot Error"), _("The folder '%s' already exists.") % folder)
+            return
+        
+        ConsolidateProgress.frmConsolidateProgress(form=self, project=self.project, folder=folder, trim=trim, archive=archive)
             
     def on_mnuQuit1_activate(self, widget, *args):
         print "on_mnuQuit1_activate called with self.%s" % widget.get_name()
@@ -1701,6 +1903,76 @@ class frmMain(SimpleGtkBuilderApp):
         Titles.frmTitles(form=self, project=self.project)
 
 
+    def on_mnuSequences_activate(self, widget, *args):
+        """Fill the Sequence menu with the sequences in this project"""
+        
+        # get correct gettext method
+        _ = self._
+        
+        # remove the old menu items
+        for child in self.mnuSequencesMenu.get_children():
+            self.mnuSequencesMenu.remove(child)
+        
+        # add 1 menu item per sequence (the current sequence is selected)
+        group = None
+        for sequence in self.project.sequences:
+            mnuSequence = gtk.RadioMenuItem(group, sequence.name, use_underline=False)
+            mnuSequence.set_active(sequence == self.project.current_sequence)
+            mnuSequence.connect("activate", self.on_mnuSequence_activate, sequence)
+            self.mnuSequencesMenu.append(mnuSequence)
+            group = mnuSequence
+        
+        mnuNewSequence = gtk.MenuItem(_("New Sequence..."))
+        mnuNewSequence.connect("activate", self.on_mnuNewSequence_activate)
+        mnuAddSequenceFile = gtk.MenuItem(_("Add Current Sequence to Project Files"))
+        mnuAddSequenceFile.connect("activate", self.on_mnuAddSequenceFile_activate)
+        self.mnuSequencesMenu.append(gtk.SeparatorMenuItem())
+        self.mnuSequencesMenu.append(mnuNewSequence)
+        self.mnuSequencesMenu.append(mnuAddSequenceFile)
+        self.mnuSequencesMenu.show_all()
+        
+        
+    def on_mnuSequence_activate(self, widget, sequence):
+        print "on_mnuSequence_activate"
+        
+        if widget.get_active() and sequence != self.project.current_sequence:
+            self.show_sequence(sequence)
+        
+        
+    def on_mnuNewSequence_activate(self, widget, *args):
+        print "on_mnuNewSequence_activate"
+        
+        # get correct gettext method
+        _ = self._
+        
+        text = inputbox.input_box(title="OpenShot", message=_("Please enter a sequence name."), default_text=_("Sequence %d") % (len(self.project.sequences) + 1))
+        if text:
+            # add the sequence, and show it on the timeline
+            new_sequence = self.project.AddSequence(text)
+            self.show_sequence(new_sequence)
+        
+        
+    def on_mnuAddSequenceFile_activate(self, widget, *args):
+        print "on_mnuAddSequenceFile_activate"
+        
+        # add the sequence to the project files (so it can be added to the other sequences, like any other clip)
+        self.project.project_folder.AddSequence(self.project.current_sequence)
+        self.refresh_files()
+        
+        
+    def show_sequence(self, sequence):
+        """ Show a different sequence on the timeline and in the video player """
+        
+        # stop video
+        if self.MyVideo:
+            self.MyVideo.pause()
+        
+        # switch sequence, and re-load the timeline and the XML of this sequence
+        self.project.set_current_sequence(sequence)
+        self.refresh(refresh_files=False)
+        self.project.RefreshXML()
+        
+        
     def on_mnu3dTitle_activate(self, widget, *args):
         print "on_mnu3dTitle_activate called with self.%s" % widget.get_name()
         
@@ -1852,8 +2124,13 @@ class frmMain(SimpleGtkBuilderApp):
             # save file exists... so just save again
             print "Autosaving..."
 
-            #normal save
-            self.project.Save("%s/%s.osp" % (project_folder, project_name))
+            # take a snapshot of the project (the same pickled state used by undo / redo), and
+            # let the autosave thread write it (to a temp file, renamed into place)
+            self.autosave_writer.save_snapshot("%s/%s.osp" % (project_folder, project_name), self.project.state.getvalue())
+            
+            # disable save button on form (without refreshing the XML)
+            self.project.is_modified = False
+            self.tlbSave.set_sensitive(False)
 
 
     def on_tlbMakeMovie_clicked(self, widget, *args):
@@ -1862,7 +2139,7 @@ class frmMain(SimpleGtkBuilderApp):
         # get translation object
         _ = self._
         
-        for track in self.project.sequences[0].tracks:
+        for track in self.project.current_sequence.tracks:
             # Loop through all clips on this track
             if len(track.clips) == 0:
                 emptytimeline = True
@@ -1959,8 +2236,8 @@ class frmMain(SimpleGtkBuilderApp):
         print "on_tlbPreviousMarker_clicked"
         
         # get the previous marker object (if any)
-        playhead_position = self.project.sequences[0].play_head_position
-        marker = self.project.sequences[0].get_marker("left", playhead_position)
+        playhead_position = self.project.current_sequence.play_head_position
+        marker = self.project.current_sequence.get_marker("left", playhead_position)
         is_playing = False
         if self.MyVideo:
             is_playing = self.MyVideo.isPlaying
@@ -1982,7 +2259,7 @@ class frmMain(SimpleGtkBuilderApp):
                     self.MyVideo.pause()
                 
             # move play-head
-            self.project.sequences[0].move_play_head(marker.position_on_track)
+            self.project.current_sequence.move_play_head(marker.position_on_track)
         
     def on_tlbSeekBackward_clicked(self, widget, single_frame=False, *args):
         print "on_tlbSeekBackward_clicked"
@@ -2066,8 +2343,8 @@ class frmMain(SimpleGtkBuilderApp):
         print "on_tlbNextMarker_clicked"
         
         # get the previous marker object (if any)
-        playhead_position = self.project.sequences[0].play_head_position
-        marker = self.project.sequences[0].get_marker("right", playhead_position)
+        playhead_position = self.project.current_sequence.play_head_position
+        marker = self.project.current_sequence.get_marker("right", playhead_position)
         is_playing = False
         if self.MyVideo:
             is_playing = self.MyVideo.isPlaying
@@ -2087,24 +2364,24 @@ class frmMain(SimpleGtkBuilderApp):
                 self.MyVideo.pause()
                 
             # move play-head
-            self.project.sequences[0].move_play_head(marker.position_on_track)
+            self.project.current_sequence.move_play_head(marker.position_on_track)
             
     
     def on_tlbAddMarker_clicked(self, widget, *args):
         print "on_tlbAddMarker_clicked"
         
         # get the current play_head position
-        playhead_position = self.project.sequences[0].play_head_position
+        playhead_position = self.project.current_sequence.play_head_position
         
         # add a marker
-        m = self.project.sequences[0].AddMarker("marker name", playhead_position)
+        m = self.project.current_sequence.AddMarker("marker name", playhead_position)
         
         # refresh the screen
         if m:
             m.Render()
             
             # raise-play head
-            self.project.sequences[0].raise_play_head()
+            self.project.current_sequence.raise_play_head()
         
         
     def on_tlbPrevious_clicked(self, widget, *args):
@@ -2311,31 +2588,36 @@ class frmMain(SimpleGtkBuilderApp):
         root_right = canvas_right.get_root_item()
         
         # Get playhead position
-        current_position = self.project.sequences[0].play_head_position
-        pixels_per_second = self.project.sequences[0].get_pixels_per_second()
+        current_position = self.project.current_sequence.play_head_position
+        pixels_per_second = self.project.current_sequence.get_pixels_per_second()
         x = current_position * pixels_per_second
 
-        # Loop through all tracks
-        for track in self.project.sequences[0].tracks:
-            # Loop through all clips on this track
-            for clip in list(track.clips):
-                # is playhead overlapping this clip
-                if current_position > clip.position_on_track and current_position < (clip.position_on_track + clip.length()):
-                    # get the canvas object
-                    canvas_item = clip.get_canvas_child(root_right, clip.unique_id)
-                    # divide clip
-                    clip.divide_clip(x, canvas_item)
+        # slice all the clips as 1 change (i.e. 1 undo / redo entry)
+        self.project.begin_transaction()
+        try:
+            # Loop through all tracks
+            for track in self.project.current_sequence.tracks:
+                # Loop through all clips on this track
+                for clip in list(track.clips):
+                    # is playhead overlapping this clip
+                    if current_position > clip.position_on_track and current_position < (clip.position_on_track + clip.length()):
+                        # get the canvas object
+                        canvas_item = clip.get_canvas_child(root_right, clip.unique_id)
+                        # divide clip
+                        clip.divide_clip(x, canvas_item)
+        finally:
+            self.project.commit_transaction()
                     
     
     def get_frame_snapshot(self):
         '''Extracts a frame from each (non-audio) clip at the current
            playhead position'''
         # Get playhead position
-        current_position = self.project.sequences[0].play_head_position
+        current_position = self.project.current_sequence.play_head_position
         # get frames per second
         fps = self.project.fps()
         # Loop through all tracks
-        for track in self.project.sequences[0].tracks:
+        for track in self.project.current_sequence.tracks:
             # Loop through all clips on this track
             for clip in track.clips:
                 # is playhead overlapping this clip
@@ -2386,7 +2668,7 @@ class frmMain(SimpleGtkBuilderApp):
         _ = self._
 
         # Add a new track to the timeline
-        self.project.sequences[0].AddTrack(_("Track %s") % str(len(self.project.sequences[0].tracks) + 1))
+        self.project.current_sequence.AddTrack(_("Track %s") % str(len(self.project.current_sequence.tracks) + 1))
         self.project.Render()
 
 
@@ -2445,8 +2727,8 @@ class frmMain(SimpleGtkBuilderApp):
         # get current scroll position
         current_scroll_pixels = self.hscrollbar2.get_value()
         # get playhead position
-        pixels_per_second = self.project.sequences[0].get_pixels_per_second()
-        playhead_time = self.project.sequences[0].play_head_position
+        pixels_per_second = self.project.current_sequence.get_pixels_per_second()
+        playhead_time = self.project.current_sequence.play_head_position
         playhead_pixels = playhead_time * pixels_per_second
             
         # get the middle of the window
@@ -2491,7 +2773,7 @@ class frmMain(SimpleGtkBuilderApp):
         _ = self._
         
         # get current horizontal scroll position & time
-        pixels_per_second = self.project.sequences[0].get_pixels_per_second()
+        pixels_per_second = self.project.current_sequence.get_pixels_per_second()
         current_scroll_pixels = self.hscrollbar2.get_value()
         current_scroll_time = current_scroll_pixels / pixels_per_second
 
@@ -2500,7 +2782,7 @@ class frmMain(SimpleGtkBuilderApp):
         new_zoom_value = widget.get_value()
 
         # set the scale
-        self.project.sequences[0].scale = int(new_zoom_value)
+        self.project.current_sequence.scale = int(new_zoom_value)
         
         # update zoom label
         self.lblZoomDetail.set_text(_("%s seconds") % int(new_zoom_value))
@@ -2527,7 +2809,7 @@ class frmMain(SimpleGtkBuilderApp):
         
     def scroll_to_last(self, current_scroll_time):
         # get position of play-head
-        pixels_per_second = self.project.sequences[0].get_pixels_per_second()
+        pixels_per_second = self.project.current_sequence.get_pixels_per_second()
         goto_pixel = current_scroll_time * pixels_per_second
 
         # scroll to last scroll position
@@ -2575,6 +2857,7 @@ class frmMain(SimpleGtkBuilderApp):
         uri = selection.data.strip()
         uri_splitted = uri.split() # we may have more than one file dropped
         
+        paths = []
         for uri in uri_splitted:
             # track which files have been added (and the time they were added)
             history_key = "%s-%s" % (uri, timestamp)
@@ -2584,69 +2867,70 @@ class frmMain(SimpleGtkBuilderApp):
                 # duplicate file, skip to next file
                 continue
             
-            # change cursor to "please wait"
-            self.myTree.window.set_cursor(gtk.gdk.Cursor(150))
-            
             # get the file path
             path = self.project.project_folder.get_file_path_from_dnd_dropped_uri(uri)
             
-            # The total number of ok files selected (not folders)
-            total_ok_files = 0
-            # The total number of broken files selected (could not be imported)
-            total_broken_files = 0
-            # The total number of files already imported selected
-            total_duplicate_files = 0
-            # The total number of folders selected
-            total_folders = 0
-            # add file to current project
-            result = self.project.project_folder.AddFile(path, session=timestamp)
-            
-            # parse the results and add to the total
-            total_ok_files += result[0]
-            total_broken_files += result[1]
-            total_duplicate_files += result[2]
-            total_folders += result[3]
-        
-            # The number of total selected files, not including folders
-            total_files = total_ok_files + total_broken_files + total_duplicate_files
-        
-            # print error messages (if needed)
-        
-            if total_files == 0:
-                if total_folders == 1:
-                    messagebox.show(_("Empty Folder "), _("The selected folder was empty."))
-                else:
-                    messagebox.show(_("Empty Folders"), _("The selected folders were empty."))
-            else:
-                if total_files == total_broken_files:
-                    if total_files == 1:
-                        messagebox.show(_("Unsupported File Type"), _("OpenShot does not support this file type."))
-                    else:
-                        messagebox.show(_("Unsupported File Types"), _("OpenShot supports none of the file types of the selected files."))
-            
-                elif total_files == total_duplicate_files:
-                    if total_files == 1:
-                        messagebox.show(_("Already Imported File"), _("The selected file has already been imported to the project."))
-                    else:
-                        messagebox.show(_("Already Imported Files"), _("All of the selected files have already been imported to the project."))
-            
-                elif total_ok_files == 0:
-                    messagebox.show(_("File Import Error"), _("The selected files either have an unsupported file type or have already been imported to the project."))
-                
-                elif total_ok_files > 0:
-                    #update the last used folder setting
-                    (dirName, fileName) = os.path.split(path)
-                    self.settings.app_state["import_folder"] = dirName
+            # dropped images might be part of an image sequence (the user is prompted)
+            if os.path.isfile(path) and not self.project.project_folder.file_exists_in_project(path):
+                if self.project.project_folder.GetImageSequenceDetails(path, timestamp):
+                    continue
             
-        # refresh the form (i.e. add new items to the treeview)
-        self.refresh_files()
+            paths.append(path)
         
-        # set cursor to normal
-        self.myTree.window.set_cursor(None)
+        if paths:
+            # inspect the files (and the files in the folders) in the background
+            detect_scenes = self.settings.general["detect_scenes"] == "True"
+            ImportProgress.frmImportProgress(form=self, project=self.project, paths=paths, detect_scenes=detect_scenes, finished_callback=self.on_import_finished)
 
         return False
 
 
+    def on_import_finished(self, importer):
+        """ Report the results of a drag n drop import """
+
+        # get correct gettext method
+        _ = self._
+
+        # The number of total selected files, not including folders
+        total_files = importer.ok_files + importer.broken_files + importer.duplicate_files
+
+        # print error messages (if needed)
+        if importer.cancelled:
+            # the user stopped the import (no need for a message)
+            pass
+        
+        elif total_files == 0:
+            if importer.folders == 1:
+                messagebox.show(_("Empty Folder "), _("The selected folder was empty."))
+            else:
+                messagebox.show(_("Empty Folders"), _("The selected folders were empty."))
+        else:
+            if total_files == importer.broken_files:
+                if total_files == 1:
+                    messagebox.show(_("Unsupported File Type"), _("OpenShot does not support this file type."))
+                else:
+                    messagebox.show(_("Unsupported File Types"), _("OpenShot supports none of the file types of the selected files."))
+        
+            elif total_files == importer.duplicate_files:
+                if total_files == 1:
+                    messagebox.show(_("Already Imported File"), _("The selected file has already been imported to the project."))
+                else:
+                    messagebox.show(_("Already Imported Files"), _("All of the selected files have already been imported to the project."))
+        
+            elif importer.ok_files == 0:
+                messagebox.show(_("File Import Error"), _("The selected files either have an unsupported file type or have already been imported to the project."))
+        
+        if importer.ok_files > 0:
+            #update the last used folder setting
+            path = importer.paths[-1]
+            if not os.path.isdir(path):
+                (path, fileName) = os.path.split(path)
+            self.settings.app_state["import_folder"] = path
+        
+        # refresh the form (i.e. add new items to the treeview)
+        self.refresh_files()
+
+
     def on_scrolledwindow_Left_scroll_event(self, widget, *args):
         # Don't bubble up the scroll event.  This prevents the scroll wheel from
         # scrolling the individual canvas.
@@ -2869,7 +3153,7 @@ class mnuTrack(SimpleGtkBuilderApp):
         _ = self._
         
         # Add track
-        self.project.sequences[0].AddTrack(_("Track %s") % str(len(self.project.sequences[0].tracks) + 1), position="above", existing_track=self.selected_track)
+        self.project.current_sequence.AddTrack(_("Track %s") % str(len(self.project.current_sequence.tracks) + 1), position="above", existing_track=self.selected_track)
         
         # refresh the interface
         self.project.Render()
@@ -2882,7 +3166,7 @@ class mnuTrack(SimpleGtkBuilderApp):
         _ = self._
         
         # Add Track
-        self.project.sequences[0].AddTrack(_("Track %s") % str(len(self.project.sequences[0].tracks) + 1), position="below", existing_track=self.selected_track)
+        self.project.current_sequence.AddTrack(_("Track %s") % str(len(self.project.current_sequence.tracks) + 1), position="below", existing_track=self.selected_track)
         
         # refresh the interface
         self.project.Render()
@@ -2905,7 +3189,7 @@ class mnuTrack(SimpleGtkBuilderApp):
             text = text.replace("&", "&amp;")
             
             # rename track
-            self.project.sequences[0].rename_track(self.selected_track, text)
+            self.project.current_sequence.rename_track(self.selected_track, text)
             
             #refresh the interface
             self.project.Render()
@@ -3644,7 +3928,7 @@ class mnuPositionSubMenu(SimpleGtkBuilderApp):
         available_clips = []
         
         # Get the number of clips that start near the start of this clip (on any track)
-        for track in self.project.sequences[0].tracks:
+        for track in self.project.current_sequence.tracks:
             # loop through clips
             for clip in track.clips:
                 # only look at images, videos, and image sequences
@@ -3921,17 +4205,95 @@ class mnuClip(SimpleGtkBuilderApp):
                 shift = 0.0
                 
         if shift:
-            # loop through clips, and shift
-            for cl in self.selected_clip.parent.clips:
-                start = float(cl.position_on_track)
-                if start >= start_of_selected:
-                    cl.position_on_track = start + shift
+            # shift all the clips as 1 change (and only render once)
+            self.project.begin_transaction()
+            try:
+                # loop through clips, and shift
+                for cl in self.selected_clip.parent.clips:
+                    start = float(cl.position_on_track)
+                    if start >= start_of_selected:
+                        cl.position_on_track = start + shift
 
-            # mark project as modified
-            self.project.set_project_modified(is_modified=True, refresh_xml=True, type = _("Shifted clips"))
+                # mark project as modified
+                self.project.set_project_modified(is_modified=True, refresh_xml=True, type = _("Shifted clips"))
 
-            # render timeline
-            self.form.refresh()
+                # render timeline
+                self.form.refresh()
+            finally:
+                self.project.commit_transaction()
+
+
+    def on_mnuRemoveSilence_activate(self, event, *args):
+        print "on_mnuRemoveSilence_activate clicked"
+        
+        # get correct gettext method
+        _ = self._
+        
+        selected_clip = self.selected_clip
+        if not selected_clip.has_audio() or selected_clip.file_object.file_type == "sequence":
+            messagebox.show(_("OpenShot"), _("This clip has no audio."))
+            return
+        
+        if selected_clip.file_object.silences == None:
+            # detect the silences of the file in the background (only once per file)
+            self.form.frmMain.window.set_cursor(gtk.gdk.Cursor(150))
+            threading.Thread(target=self.detect_silences, args=(selected_clip,)).start()
+        else:
+            self.remove_silences(selected_clip)
+            
+    def detect_silences(self, selected_clip):
+        """ Decode the audio of the clip's file, and find the silences (this runs on a separate thread) """
+        
+        try:
+            silences = silence_detect.detect_silences(selected_clip.file_object.name)
+        except Exception, ex:
+            print "Failed to detect the silences of %s: %s" % (selected_clip.file_object.name, ex)
+            silences = None
+        
+        # always hand control back to the GTK thread (which resets the cursor)
+        gobject.idle_add(self.silences_detected, selected_clip, silences)
+        
+    def silences_detected(self, selected_clip, silences):
+        """ Store the silences on the file, and remove them from the clip """
+        
+        # get correct gettext method
+        _ = self._
+        
+        self.form.frmMain.window.set_cursor(None)
+        if silences == None:
+            messagebox.show(_("OpenShot"), _("The audio of this clip could not be decoded."))
+            return False
+        
+        selected_clip.file_object.silences = silences
+        self.remove_silences(selected_clip)
+        return False
+        
+    def remove_silences(self, selected_clip):
+        """ Split the clip, remove the silent parts, and close the gaps (as 1 change) """
+        
+        # get correct gettext method
+        _ = self._
+        
+        # the clip might have been removed while the silences were detected
+        if selected_clip not in selected_clip.parent.clips:
+            return
+        
+        self.project.begin_transaction()
+        try:
+            removed_length = selected_clip.remove_silences(selected_clip.file_object.silences)
+            if removed_length:
+                # mark project as modified
+                self.project.set_project_modified(is_modified=True, refresh_xml=True, type = _("Removed silence"))
+                
+                # render timeline
+                self.form.refresh()
+        finally:
+            self.project.commit_transaction()
+            
+        if removed_length == None:
+            messagebox.show(_("OpenShot"), _("This whole clip is silent, so it was not changed."))
+        elif not removed_length:
+            messagebox.show(_("OpenShot"), _("No silence was found in this clip."))
 
 
     def on_mnuDuplicate_activate(self, event, *args):
@@ -4374,7 +4736,7 @@ class mnuTree(SimpleGtkBuilderApp):
                                 calculate_length = f.max_frames / f.fps
                             
                             # create temp clip object
-                            temp_clip = clip.clip("temp clip", "gold", 0.0, 0.0, calculate_length, self.project.sequences[0].tracks[0], f)
+                            temp_clip = clip.clip("temp clip", "gold", 0.0, 0.0, calculate_length, self.project.current_sequence.tracks[0], f)
                             
                             # generate the preview xml for this clip
                             temp_clip.GeneratePreviewXML(os.path.join(self.project.USER_DIR, "preview.mlt"))
@@ -4418,7 +4780,7 @@ class mnuTree(SimpleGtkBuilderApp):
                         # re-load the xml
                         if self.form.MyVideo:
                             # create temp clip object
-                            temp_clip = clip.clip("temp clip", "gold", 0.0, 0.0, 9000.0, self.project.sequences[0].tracks[0], f)
+                            temp_clip = clip.clip("temp clip", "gold", 0.0, 0.0, 9000.0, self.project.current_sequence.tracks[0], f)
                             
                             # generate the preview xml for this clip
                             temp_clip.GeneratePreviewXML(os.path.join(self.project.USER_DIR, "preview.mlt"))
@@ -4544,41 +4906,47 @@ class mnuTree(SimpleGtkBuilderApp):
     def on_mnuRemoveFile_activate(self, event, *args):
         """Removes a file from the treeview & project"""
         frm = self.form
-        detail_view = frm.scrFileTree.get_property('visible')
-        if detail_view == True:
-            iters = [self.model.get_iter(path) for path in self.selected]
-            for iter in iters:
-                #remove from the file object
+        
+        # remove all the selected files as 1 change (i.e. 1 undo / redo entry)
+        self.project.begin_transaction()
+        try:
+            detail_view = frm.scrFileTree.get_property('visible')
+            if detail_view == True:
+                iters = [self.model.get_iter(path) for path in self.selected]
+                for iter in iters:
+                    #remove from the file object
                 
-                length = self.model.get_value(iter, 2)
-                unique_id = self.model.get_value(iter, 4)
+                    length = self.model.get_value(iter, 2)
+                    unique_id = self.model.get_value(iter, 4)
                 
-                if unique_id and length:
+                    if unique_id and length:
+                        file_item = self.project.project_folder.FindFileByID(unique_id)
+                        self.model.remove(iter)
+                        self.project.project_folder.RemoveFile(file_item.name)
+                    else:
+                        #folders don't have a unique id, so use the name field.
+                        filename = self.remove_markup(self.model.get_value(iter, 1))
+                        self.model.remove(iter)
+                        self.project.project_folder.RemoveFile(filename)
+                                
+                frm.refresh()
+            else:
+                #iconview is active
+                selected = frm.icvFileIcons.get_selected_items()
+                for item in selected:
+                    i = item[0]
+                    model = frm.icvFileIcons.get_model()
+                    unique_id = model[i][3]
                     file_item = self.project.project_folder.FindFileByID(unique_id)
-                    self.model.remove(iter)
+                    #remove the item from the project items list
                     self.project.project_folder.RemoveFile(file_item.name)
-                else:
-                    #folders don't have a unique id, so use the name field.
-                    filename = self.remove_markup(self.model.get_value(iter, 1))
-                    self.model.remove(iter)
-                    self.project.project_folder.RemoveFile(filename)
-                                
-            frm.refresh()
-        else:
-            #iconview is active
-            selected = frm.icvFileIcons.get_selected_items()
-            for item in selected:
-                i = item[0]
-                model = frm.icvFileIcons.get_model()
-                unique_id = model[i][3]
-                file_item = self.project.project_folder.FindFileByID(unique_id)
-                #remove the item from the project items list
-                self.project.project_folder.RemoveFile(file_item.name)
                 
-            frm.refresh_thumb_view()
-            
-        #mark the project as modified
-        self.project.set_project_modified(is_modified=True, refresh_xml=True)
+                frm.refresh_thumb_view()
+                
+            #mark the project as modified
+            self.project.set_project_modified(is_modified=True, refresh_xml=True)
+        finally:
+            self.project.commit_transaction()
 
     def remove_markup(self,data):
         p = re.compile(r'<[^<]*?/?>')
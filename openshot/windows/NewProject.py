@@ -229,7 +229,7 @@ class frmNewProject(SimpleGtkBuilderApp):
 		self.project.form.MyVideo.pause()
 
 		# set the profile settings in the video thread
-		self.project.form.MyVideo.set_project(self.project, self.project.form, os.path.join(self.project.USER_DIR, "sequence.mlt"), mode="preview")
+		self.project.form.MyVideo.set_project(self.project, self.project.form, self.project.get_sequence_xml(), mode="preview")
 		self.project.form.MyVideo.set_profile(localType, load_xml=True)
 		self.project.form.MyVideo.seek(0)
 
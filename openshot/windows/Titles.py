@@ -32,7 +32,7 @@ import fnmatch
 import gtk
 
 from xml.dom import minidom
-from classes import files, messagebox, project, profiles
+from classes import files, messagebox, project, profiles, title_batch
 from windows.SimpleGtkBuilderApp import SimpleGtkBuilderApp
 from windows import fontselector
 
@@ -120,6 +120,7 @@ class frmTitles(SimpleGtkBuilderApp):
 			self.btnFontColor.set_sensitive(True)
 			self.btnBackgroundColor.set_sensitive(True)
 			self.btnAdvanced.set_sensitive(True)
+			self.btnBatch.set_sensitive(True)
 			self.writeToFile(self.xmldoc)
 			#preview the file
 			self.set_img_pixbuf(self.filename)
@@ -136,6 +137,7 @@ class frmTitles(SimpleGtkBuilderApp):
 				self.btnEditText.set_sensitive(False)
 				self.btnFont.set_sensitive(False)
 				self.btnFontColor.set_sensitive(False)
+				self.btnBatch.set_sensitive(False)
 		
 		
 	def set_template_dropdown(self):
@@ -193,6 +195,7 @@ class frmTitles(SimpleGtkBuilderApp):
 		self.btnFontColor.set_sensitive(True)
 		self.btnBackgroundColor.set_sensitive(True)
 		self.btnAdvanced.set_sensitive(True)
+		self.btnBatch.set_sensitive(True)
 		#preview the file
 		self.set_img_pixbuf(self.filename)
 		
@@ -204,6 +207,7 @@ class frmTitles(SimpleGtkBuilderApp):
 			self.btnEditText.set_sensitive(False)
 			self.btnFont.set_sensitive(False)
 			self.btnFontColor.set_sensitive(False)
+			self.btnBatch.set_sensitive(False)
 
 	def on_cmbTemplate_changed(self, widget):
 
@@ -365,6 +369,52 @@ class frmTitles(SimpleGtkBuilderApp):
 		self.form.refresh_files()
 		
 
+	def on_btnBatch_clicked(self, widget):
+		# get translation method
+		_ = self._
+		
+		# choose the CSV or JSON file
+		dialog = gtk.FileChooserDialog(_("Choose a CSV or JSON file"), self.frmTitles, gtk.FILE_CHOOSER_ACTION_OPEN, (gtk.STOCK_CANCEL, gtk.RESPONSE_CANCEL, gtk.STOCK_OPEN, gtk.RESPONSE_OK))
+		data_filter = gtk.FileFilter()
+		data_filter.set_name(_("CSV or JSON files"))
+		for pattern in ["*.csv", "*.CSV", "*.json", "*.JSON"]:
+			data_filter.add_pattern(pattern)
+		dialog.add_filter(data_filter)
+		response = dialog.run()
+		data_path = dialog.get_filename()
+		dialog.destroy()
+		if response != gtk.RESPONSE_OK or not data_path:
+			return
+		
+		try:
+			rows = title_batch.read_data_file(data_path)
+		except Exception, inst:
+			messagebox.show(_("OpenShot Error"), _("Unexpected Error '%s' while reading '%s'.") % (inst, data_path))
+			return
+		
+		if not rows:
+			messagebox.show(_("OpenShot Error"), _("No titles were found in '%s'.") % data_path)
+			return
+		
+		# write the titles (existing titles are not overwritten) (using the current template and style)
+		project_path = os.path.join(self.project.folder, "thumbnail")
+		base_name = os.path.splitext(os.path.basename(self.filename))[0]
+		batch = title_batch.title_batch(self.xmldoc, self.tspan_node)
+		file_paths, errors = batch.write_files(rows, project_path, base_name)
+		
+		# import all the titles to the project at once (i.e. 1 undo / redo history entry)
+		self.project.project_folder.AddFiles(file_paths)
+		
+		# refresh the main form
+		self.form.refresh_files()
+		
+		if errors:
+			file_path, inst = errors[0]
+			messagebox.show(_("OpenShot Error"), _("Unexpected Error '%s' while writing to '%s'.") % (inst, file_path))
+		else:
+			messagebox.show(_("Titles"), _("%d titles were created.") % len(file_paths))
+		
+
 	def find_in_list(self, l, value):
 		'''when passed a partial value, function will return the list index'''
 		for item in l:
@@ -167,7 +167,7 @@ class frmTransitionProperties(SimpleGtkBuilderApp):
 		start = self.spinbtnStart.get_value()
 		length = self.spinbtnLength.get_value()
 		end = start + length
-		timeline_length = self.project.sequences[0].length
+		timeline_length = self.project.current_sequence.length
 		
 		if end > timeline_length:
 			self.spinbtnStart.set_value(timeline_length - length)
@@ -179,7 +179,7 @@ class frmTransitionProperties(SimpleGtkBuilderApp):
 		start = self.spinbtnStart.get_value()
 		length = self.spinbtnLength.get_value()
 		end = start + length
-		timeline_length = self.project.sequences[0].length
+		timeline_length = self.project.current_sequence.length
 		
 		if end > timeline_length:
 			self.spinbtnLength.set_value(timeline_length - start)
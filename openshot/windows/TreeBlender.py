@@ -65,7 +65,7 @@ class OpenShotTree:
 		BLENDER_DIR = self.project.BLENDER_DIR
 		my_effects = []
 		unique_ids = []
-		my_effects = self.project.form.blender_list
+		my_effects = self.project.form.get_blender_list()
 		
 		
 		# Add effects to dropdown
@@ -109,7 +109,7 @@ class OpenShotTree:
 		_ = self._
 		
 		# loop through the effects
-		for my_effect in self.project.form.blender_list:
+		for my_effect in self.project.form.get_blender_list():
 
 			if service:
 				# find matching effect
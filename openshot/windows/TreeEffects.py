@@ -98,7 +98,7 @@ class OpenShotTree:
 				my_effects.append(real_effect)
 				unique_ids.append(clip_effect1.unique_id)
 		else:	
-			my_effects = self.project.form.effect_list
+			my_effects = self.project.form.get_effect_list()
 		
 		# Get icon size from settings
 		icon_size = self.project.form.settings.general["icon_size"]
@@ -110,6 +110,9 @@ class OpenShotTree:
 				self.treeview.set_item_width(130)
 		
 		
+		# the filters are needed to hide the effects which are not installed
+		self.project.form.load_avformats()
+		
 		# Add effects to dropdown
 		counter = 0
 		for my_effect in my_effects:
@@ -134,7 +137,7 @@ class OpenShotTree:
 			
 			# does the frei0r installation include this effect?
 			if my_effect.service.startswith("frei0r"):
-				if my_effect.service not in self.project.form.filters:
+				if not self.project.form.capabilities.has_filter(my_effect.service):
 					# don't add this effect, skip to the next one
 					print "Warning: effect not found in your version of Frei0r: %s" % my_effect.service
 					continue
@@ -148,7 +151,7 @@ class OpenShotTree:
 				if self.project.form.MyVideo.check_version(0, 7, 4):
 					# does the sox installation include this effect?
 					if my_effect.service.startswith("sox"):
-						if ("sox.%s" % my_effect.audio_effect) not in self.project.form.filters:
+						if not self.project.form.capabilities.has_filter("sox.%s" % my_effect.audio_effect):
 							# don't add this effect, skip to the next one
 							print "Warning: effect not found in your version of Sox: %s" % ("sox:%s" % my_effect.audio_effect)
 							continue
@@ -229,7 +232,7 @@ class OpenShotTree:
 		_ = self._
 		
 		# loop through the effects
-		for my_effect in self.project.form.effect_list:
+		for my_effect in self.project.form.get_effect_list():
 
 			if service:
 				# find matching effect
@@ -18,16 +18,19 @@
 
 
 import os
-import gtk
+import gtk, gobject
 import xml.dom.minidom as xml
 
-from classes import profiles, project, messagebox, tree
+from classes import profiles, project, messagebox, tree, scene_detect
 from windows.SimpleGtkBuilderApp import SimpleGtkBuilderApp
 from xdg.IconTheme import *
 
 # init the foriegn language
 import language.Language_Init as Language_Init
 
+# how long (in milliseconds) after the settings are saved they are written to the config file
+FLUSH_DELAY = 1000
+
 class PreferencesMgr(SimpleGtkBuilderApp):
 	
 	
@@ -135,6 +138,10 @@ class PreferencesMgr(SimpleGtkBuilderApp):
 		
 		self.valSaveInterval.set_value(int(self.form.settings.general["save_interval"]))
 		
+		# scene detection (only available with NumPy)
+		self.chkDetectScenes.set_active(self.form.settings.general["detect_scenes"] == "True")
+		self.chkDetectScenes.set_sensitive(scene_detect.is_available())
+		
 		#show the form
 		self.frmPreferences.show_all()
 		
@@ -162,7 +169,8 @@ class PreferencesMgr(SimpleGtkBuilderApp):
 		
 	def populate_codecs(self):
 		
-		#populate the codecs
+		#populate the codecs (detect them first, if needed)
+		self.form.load_avformats()
 		
 		#video codecs		
 		for codec in self.form.vcodecs:
@@ -186,12 +194,8 @@ class PreferencesMgr(SimpleGtkBuilderApp):
 		self.ACodecList.clear()
 		self.FormatsList.clear()
 		
-		self.form.vcodecs[:] = []
-		self.form.acodecs[:] = []
-		self.form.vformats[:] = []
-		
 		melt_command = self.form.settings.general["melt_command"]
-		self.form.get_avformats(melt_command)
+		self.form.get_avformats(melt_command, refresh=True)
 
 		self.populate_codecs()
 		
@@ -321,6 +325,9 @@ class PreferencesMgr(SimpleGtkBuilderApp):
 		self.form.load_autosave_settings()
 			
 	
+	def on_chkDetectScenes_toggled(self, widget, *args):
+		self.form.settings.general["detect_scenes"] = str(self.chkDetectScenes.get_active())
+		
 	def set_dropdown_values(self, value_to_set, combobox):
 		
 		model = combobox.get_model()
@@ -360,6 +367,7 @@ class Settings:
 		"max_history_size" : "20",
 		"melt_command" : "melt",
 		"blender_command" : "blender",
+		"blender_workers" : "0",
 		"output_mode" : "sdl",
 		"use_stock_icons" : "Yes",
 		"use_affine" : "No",
@@ -367,6 +375,7 @@ class Settings:
 		"autosave_enabled" : False,
 		"save_before_playback" : False,
 		"icon_size" : "medium",
+		"detect_scenes" : "False",
 		}
 	
 	app_state = {
@@ -395,6 +404,13 @@ class Settings:
 		
 		}
 	
+	# the settings in the config file which are not in the dictionaries above
+	unknown = {}
+	
+	# the settings are loaded once, and written a moment after they are saved
+	loaded = False
+	flush_timer = None
+	
 	def __init__(self, project):
 		"""Constructor"""
 		
@@ -406,6 +422,13 @@ class Settings:
 		self.project = project
 	
 	def load_settings_from_xml(self):
+		""" Load the settings from the config file (in a single pass).  The settings are kept
+		in memory, so they are only loaded once (later calls keep the unsaved values). """
+		
+		if Settings.loaded:
+			return
+		Settings.loaded = True
+		
 		settings_path = os.path.join(self.project.USER_DIR, "config.xml")
 		
 		#Load the settings from the config file, if it exists
@@ -415,110 +438,98 @@ class Settings:
 				xmldoc = xml.parse(settings_path)
 			except xml.xml.parsers.expat.ExpatError:
 				# Invalid or empty config file
-				self.save_settings_to_xml()
+				messagebox.show(self._("OpenShot Warning"), self._("Invalid or empty preferences file found, loaded default values"))
+				self.write_settings()
 				return
-			#loop through each settings section and load the values
+			
+			#loop through each element of each section, and load the values
 			#into the relevant dictionary
-			for section, section_dict in self.sections.iteritems():
-				for key, value in section_dict.iteritems():
-					try:
-						element = xmldoc.getElementsByTagName(key)
-						section_dict[key] = element[0].childNodes[0].data
-						
-						# be sure theme exists
-						if key == "default_theme":
-							if os.path.exists(os.path.join(self.project.THEMES_DIR, section_dict[key])) == False:
-								# DOES NOT EXIST, change to default
-								section_dict[key] = "blue_glass"
-								
-						# be sure profile exists
-						if key == "default_profile":
-							if profiles.mlt_profiles(self.project).profile_exists(section_dict[key]) == False:
-								# DOES NOT EXIST, change to default
-								print "Default profile does not exist: %s. Changing default profile to %s." % (section_dict[key], "DV/DVD NTSC")
-								section_dict[key] = "DV/DVD NTSC"
-						
-					except IndexError:
-						#the list index will go out of range if there is
-						#an extra item in the dictionary which is
-						#not in the config file.
-						pass
+			for section_node in xmldoc.documentElement.childNodes:
+				if section_node.nodeType != section_node.ELEMENT_NODE:
+					continue
+				section_dict = self.sections.get(section_node.tagName)
+				for element in section_node.childNodes:
+					if element.nodeType != element.ELEMENT_NODE or not element.childNodes:
+						continue
+					key = element.tagName
+					if section_dict != None and key in section_dict:
+						section_dict[key] = element.childNodes[0].data
+					else:
+						# keep the settings we don't know about (i.e. from a newer version)
+						Settings.unknown.setdefault(section_node.tagName, {})[key] = element.childNodes[0].data
+			
+			# be sure theme exists
+			if os.path.exists(os.path.join(self.project.THEMES_DIR, self.general["default_theme"])) == False:
+				# DOES NOT EXIST, change to default
+				self.general["default_theme"] = "blue_glass"
+			
+			# be sure profile exists
+			if profiles.profile_exists(self.project, self.general["default_profile"]) == False:
+				# DOES NOT EXIST, change to default
+				print "Default profile does not exist: %s. Changing default profile to %s." % (self.general["default_profile"], "DV/DVD NTSC")
+				self.general["default_profile"] = "DV/DVD NTSC"
 		
 		else:
 			# no config file found, create one
-			self.save_settings_to_xml()
+			self.write_settings()
 			
 	def save_settings_to_xml(self):
-		settings_path = os.path.join(self.project.USER_DIR, "config.xml")
+		""" Save the settings to the config file.  Settings are saved from many dialogs, so they are
+		written a moment later (once, for all the changes made until then). """
 		
-		#update each xml element with the current dictionary values
-		if os.path.exists(settings_path):
-			try:
-				xmldoc = xml.parse(settings_path)
-			except xml.xml.parsers.expat.ExpatError:
-				# Invalid or empty config file, create new blank dom
-				messagebox.show(_("OpenShot Warning"), _("Invalid or empty preferences file found, loaded default values"))
-				xmldoc = xml.Document()
-				root_node = xmldoc.createElement("settings")
-				xmldoc.appendChild(root_node)
-				
-				# create a node for each section
-				for section, section_dict in self.sections.iteritems():
-					section_node = xmldoc.createElement(section)
-					root_node.appendChild(section_node)
-		else:
-			# missing config file, create new blank dom
-			xmldoc = xml.Document()
-			root_node = xmldoc.createElement("settings")
-			xmldoc.appendChild(root_node)
+		if Settings.flush_timer == None:
+			Settings.flush_timer = gobject.timeout_add(FLUSH_DELAY, self.flush_settings)
 			
-			# create a node for each section
-			for section, section_dict in self.sections.iteritems():
-				section_node = xmldoc.createElement(section)
-				root_node.appendChild(section_node)
-				
-		
-		for section, section_dict in self.sections.iteritems():
-			for key, value in section_dict.iteritems():
-				try:
-					element = xmldoc.getElementsByTagName(key)
-					if element:
-						# does text node exist?
-						if not element[0].childNodes:
-							txt = xmldoc.createTextNode(str(value))
-							element[0].appendChild(txt)
-						else:
-							# update existing text node
-							element[0].childNodes[0].data = str(section_dict[key])
-					else:
-						#there is no matching element in the xml, 
-						#we need to add one
-						new_element = xmldoc.createElement(key)
-						parent = xmldoc.getElementsByTagName(section)
-						parent[0].appendChild(new_element)
-						txt = xmldoc.createTextNode(str(value))
-						new_element.appendChild(txt)
-						
-				except IndexError:
-					pass
+	def flush_settings(self):
+		""" Write the pending settings (called by the timer) """
+		Settings.flush_timer = None
+		self.write_settings()
+		return False
 	
+	def write_settings(self):
+		""" Write the settings to the config file now (i.e. when OpenShot exits) """
+		
+		# cancel the pending write (if any)
+		if Settings.flush_timer != None:
+			gobject.source_remove(Settings.flush_timer)
+			Settings.flush_timer = None
+		
+		# build the document from the dictionaries (no need to parse the old file)
+		xmldoc = xml.Document()
+		root_node = xmldoc.createElement("settings")
+		xmldoc.appendChild(root_node)
+		
+		section_names = sorted(set(self.sections.keys() + Settings.unknown.keys()))
+		for section in section_names:
+			section_node = xmldoc.createElement(section)
+			root_node.appendChild(section_node)
+			
+			values = dict(Settings.unknown.get(section, {}))
+			values.update(self.sections.get(section, {}))
+			for key in sorted(values.keys()):
+				value = values[key]
+				if not isinstance(value, unicode):
+					value = str(value).decode("utf-8", "replace")
+				element = xmldoc.createElement(key)
+				element.appendChild(xmldoc.createTextNode(value))
+				section_node.appendChild(element)
+		
 		# save settings
 		self.write_to_settings_file(xmldoc)
-			
-			
-			
-			
 					
 	def write_to_settings_file(self, xmldoc):
-		#write the updated xml document to the config file
+		#write the updated xml document to the config file (and rename
+		#it, so a partial file is never read)
+		_ = self._
 		filename = os.path.join(self.project.USER_DIR, "config.xml")
 		
 		try:
-			file = open(filename, "wb") 
+			file = open(filename + ".tmp", "wb") 
 			file.write(xmldoc.toxml("UTF-8"))
 			#xmldoc.writexml(file, indent='', addindent='    ', newl='', encoding='UTF-8')
 			file.close()
-		except IOError, inst:
+			os.rename(filename + ".tmp", filename)
+		except (IOError, OSError), inst:
 			messagebox.show(_("OpenShot Error"), _("Unexpected Error '%s' while writing to '%s'." % (inst, filename)))
 		
 		